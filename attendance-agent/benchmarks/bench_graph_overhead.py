@@ -0,0 +1,196 @@
+"""1回のチェックにかかるオーバーヘッドをグラフ実行方式ごとに比較する
+
+以前の main.py と同じくノードを手で順に呼ぶ方式（manual）、チェックごとに
+グラフをコンパイルし直す方式（compile/check）、起動時にコンパイルした
+グラフを日付の thread_id で使い回す方式（compiled）を、非稼働（working_state
+で終了）と打刻あり（退勤打刻まで実行）の2通りで計測する。打刻・通知・
+カレンダーはすべてメモリ上のスタブで、グラフ実行そのものの差だけを見る。
+
+    cd attendance-agent
+    python benchmarks/bench_graph_overhead.py
+"""
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import graph.nodes.state_update_node as state_update_module  # noqa: E402
+import graph.nodes.time_gate_node as time_gate_module  # noqa: E402
+from graph.checkpointer import LatestCheckpointSaver  # noqa: E402
+from graph.graph import build_graph  # noqa: E402
+from graph.nodes.calendar_check_node import calendar_check_node  # noqa: E402
+from graph.nodes.slack_notify_node import slack_notify_node  # noqa: E402
+from graph.nodes.stamp_node import stamp_node  # noqa: E402
+from graph.nodes.state_update_node import state_update_node  # noqa: E402
+from graph.nodes.time_gate_node import time_gate_node  # noqa: E402
+from graph.nodes.working_state_node import working_state_node  # noqa: E402
+from services.async_runner import AsyncRunner  # noqa: E402
+from services.config_loader import ConfigSnapshot  # noqa: E402
+from services.google_calendar import LocalCalendarService  # noqa: E402
+from services.stamper_interface import StamperInterface, StampResult  # noqa: E402
+
+ROUNDS = 500
+TODAY = "2026-02-24"
+EVENTS = 900  # 15分窓に操作が詰まっている場合のイベント数
+
+
+class _Monitor:
+    def __init__(self, working: bool):
+        self._working = working
+        self._events = [datetime(2026, 2, 24, 18, 30)] * EVENTS if working else []
+
+    def is_working(self, threshold_minutes, min_count):
+        return self._working
+
+    def get_recent_events(self, minutes):
+        return list(self._events)
+
+    def last_activity_time(self):
+        return self._events[-1] if self._events else None
+
+
+class _Stamper(StamperInterface):
+    async def clock_in(self):
+        return StampResult(success=True, timestamp="09:00", error=None)
+
+    async def clock_out(self):
+        return StampResult(success=True, timestamp="18:30", error=None)
+
+    async def close(self):
+        pass
+
+
+class _Notifier:
+    def send(self, message, coalesce_key=None):
+        pass
+
+    def send_error(self, message):
+        pass
+
+
+class _Store:
+    def load(self, day):
+        return {"clock_in_done": True, "clock_in_time": "09:00", "last_clock_out_time": None}
+
+    def save(self, day, state):
+        pass
+
+
+# main.py と同じく起動時に1回だけ検証したスナップショットを渡す
+CONFIG = ConfigSnapshot.from_dict({
+    "working_state": {"window_minutes": 15, "min_event_count": 2},
+    "time_rules": {"clock_out_time": "18:00", "cutoff_time": "22:00"},
+})
+
+
+def _initial_state(saved: dict) -> dict:
+    return {
+        "today": TODAY,
+        "is_holiday": False,
+        "holiday_reason": None,
+        "leave_intervals": [],
+        "clock_in_done": saved["clock_in_done"],
+        "clock_in_time": saved["clock_in_time"],
+        "last_clock_out_time": saved["last_clock_out_time"],
+        "is_working": False,
+        "last_activity_time": None,
+        "clock_out_pending": False,
+        "operation_log": [],
+        "action_taken": None,
+        "error_message": None,
+        "extra": {},
+    }
+
+
+def _manual_check(services, runner):
+    """以前の run_check と同じ手書きのノード連鎖"""
+    monitor, calendar, stamper, notifier, store = services
+    state = _initial_state(store.load(TODAY))
+    state.update(working_state_node(state, monitor=monitor, config=CONFIG))
+    if not state["is_working"] and not state["clock_out_pending"]:
+        return
+    state.update(calendar_check_node(state, calendar_service=calendar))
+    if state["is_holiday"]:
+        return
+    state.update(time_gate_node(state, config=CONFIG))
+    if state["action_taken"] == "skipped":
+        return
+    state.update(runner.run(stamp_node(state, browser=stamper)))
+    slack_notify_node(state, notifier=notifier)
+    state.update(state_update_node(state, state_store=store))
+
+
+def _build(services, checkpointer=None):
+    monitor, calendar, stamper, notifier, store = services
+    return build_graph(
+        monitor=monitor,
+        calendar_service=calendar,
+        browser=stamper,
+        notifier=notifier,
+        config=CONFIG,
+        store=store,
+        checkpointer=checkpointer,
+    )
+
+
+def _measure(check) -> list[float]:
+    check()  # 初回の import・キャッシュ生成を除外
+    samples = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        check()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _scenario(label: str, working: bool, runner: AsyncRunner):
+    services = (
+        _Monitor(working), LocalCalendarService(), _Stamper(), _Notifier(), _Store()
+    )
+
+    def compile_per_check():
+        graph = _build(services)
+        runner.run(graph.ainvoke(_initial_state(services[4].load(TODAY))))
+
+    graph = _build(services, checkpointer=LatestCheckpointSaver())
+    thread = {"configurable": {"thread_id": TODAY}}
+    runner.run(graph.ainvoke(_initial_state(services[4].load(TODAY)), thread))
+
+    def compiled():
+        state = {"today": TODAY, "action_taken": None, "error_message": None}
+        runner.run(graph.ainvoke(state, thread, durability="exit"))
+
+    print(f"[{label}]")
+    for name, check in (
+        ("manual", lambda: _manual_check(services, runner)),
+        ("compile/check", compile_per_check),
+        ("compiled", compiled),
+    ):
+        samples = _measure(check)
+        print(
+            f"  {name:<14} median {statistics.median(samples):7.3f} ms  "
+            f"p95 {sorted(samples)[int(len(samples) * 0.95)]:7.3f} ms"
+        )
+
+
+def main():
+    time_gate_module._now = lambda: datetime(2026, 2, 24, 18, 30)
+    state_update_module._today_str = lambda: TODAY
+    runner = AsyncRunner()
+    runner.start()
+    try:
+        print(f"{ROUNDS} checks each, {EVENTS} events in window when working")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # config 引数の型注釈に関する警告
+            _scenario("idle", working=False, runner=runner)
+            _scenario("stamp clock_out", working=True, runner=runner)
+    finally:
+        runner.stop()
+
+
+if __name__ == "__main__":
+    main()
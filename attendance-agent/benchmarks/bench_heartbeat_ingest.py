@@ -0,0 +1,137 @@
+"""ハートビートのパケットサイズ・取り込み速度・コレクタのメモリ使用量を計測する
+
+1. 直近15分を載せたパケットのサイズ（署名なし/あり）
+2. RemoteMonitor.ingest() の処理速度（ユーザー数 USERS、署名なし/あり）
+3. ループバックUDPで HeartbeatReceiver に送ったときの受信速度と取りこぼし
+4. コレクタ（collector.py 相当の import と監視開始）と、従来の1台完結構成
+   （グラフ・LangGraph を読み込む main.py 相当）のプロセスRSS
+   RSS は /proc を読むため Linux 専用。
+
+    cd attendance-agent
+    python benchmarks/bench_heartbeat_ingest.py
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from services.heartbeat import (  # noqa: E402
+    HeartbeatReceiver,
+    RemoteMonitor,
+    encode_heartbeat,
+)
+
+USERS = 5000
+MINUTES = 15
+ROUNDS = 4
+UDP_PACKETS = 50_000
+NOW = int(time.time()) // 60
+
+COLLECTOR_SNIPPET = """
+from services.heartbeat import HeartbeatSender
+from services.config_loader import load_config
+from services.pc_monitor import PCMonitor
+monitor = PCMonitor(retention_minutes=15)
+monitor.start()
+sender = HeartbeatSender(monitor, "bench", ("127.0.0.1", 9), redundancy_minutes=15)
+"""
+
+AGENT_SNIPPET = """
+import main
+from services.pc_monitor import PCMonitor
+from graph.graph import build_graph
+from langgraph.checkpoint.memory import InMemorySaver
+monitor = PCMonitor(retention_minutes=15)
+monitor.start()
+graph = build_graph(monitor=monitor, checkpointer=InMemorySaver())
+"""
+
+
+def _packets(secret):
+    counts = [(i * 7) % 61 for i in range(MINUTES)]
+    return [
+        encode_heartbeat(f"user{u:05d}", r, NOW - ROUNDS + r + 1, counts, secret)
+        for r in range(ROUNDS)
+        for u in range(USERS)
+    ]
+
+
+def _bench_ingest(label: str, secret):
+    packets = _packets(secret)
+    remote = RemoteMonitor(secret=secret)
+    started = time.perf_counter()
+    for packet in packets:
+        remote.ingest(packet)
+    elapsed = time.perf_counter() - started
+    print(
+        f"  {label:<9} {len(packets) / elapsed:10,.0f} packets/s  "
+        f"({elapsed / len(packets) * 1e6:5.1f} us/packet, {len(packets[0])} bytes)"
+    )
+
+
+def _bench_udp():
+    remote = RemoteMonitor()
+    ingested = 0
+    original = remote.ingest
+
+    def counting_ingest(data):
+        nonlocal ingested
+        ingested += 1
+        return original(data)
+
+    remote.ingest = counting_ingest
+    receiver = HeartbeatReceiver(remote, host="127.0.0.1", port=0)
+    receiver.start()
+    packets = _packets(None)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    started = time.perf_counter()
+    for i in range(UDP_PACKETS):
+        sock.sendto(packets[i % len(packets)], receiver.address)
+        if i % 500 == 499:
+            time.sleep(0.001)  # 送信側がバッファを溢れさせないよう少し間を空ける
+    deadline = time.monotonic() + 2
+    while ingested < UDP_PACKETS and time.monotonic() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    sock.close()
+    receiver.stop()
+    print(
+        f"  sent {UDP_PACKETS:,} / ingested {ingested:,} "
+        f"({ingested / elapsed:,.0f} packets/s incl. send pacing)"
+    )
+
+
+def _rss_mb(snippet: str) -> float:
+    code = snippet + (
+        "\nimport time; time.sleep(0.5)\n"
+        "print(next(l for l in open('/proc/self/status') if l.startswith('VmRSS')).split()[1])\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env={**os.environ, "PYNPUT_BACKEND": os.environ.get("PYNPUT_BACKEND", "dummy")},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(out.stdout.strip().splitlines()[-1]) / 1024
+
+
+def main():
+    print(f"ingest: {USERS:,} users x {ROUNDS} rounds, {MINUTES} minutes per packet")
+    _bench_ingest("unsigned", None)
+    _bench_ingest("signed", b"bench-secret")
+    print("udp loopback:")
+    _bench_udp()
+    print("process RSS:")
+    print(f"  collector {_rss_mb(COLLECTOR_SNIPPET):6.1f} MB")
+    print(f"  agent     {_rss_mb(AGENT_SNIPPET):6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""休暇キーワード照合を素朴な実装と Aho–Corasick 法で比較する
+
+数百語の休暇分類と数千件の合成イベント（件名・説明・場所）を生成し、
+「全キーワード × 全項目で keyword in text」を行う従来方式と
+KeywordMatcher.match_event の所要時間を比較する。結果が一致することも確認する。
+
+    cd attendance-agent
+    python benchmarks/bench_keyword_matcher.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.keyword_matcher import DEFAULT_MATCH_FIELDS, KeywordMatcher, _normalize  # noqa: E402
+
+EVENTS = 5000
+SEED = 1
+
+BASE_TAXONOMY = {
+    "full_day": ["有給", "年休", "休暇", "特別休暇", "慶弔", "振休", "代休", "夏季休暇",
+                 "リフレッシュ休暇", "看護休暇", "介護休暇", "産休", "育休", "忌引"],
+    "am_off": ["午前休", "午前半休", "AM休", "午前有給"],
+    "pm_off": ["午後休", "午後半休", "PM休", "午後有給"],
+    "half_day": ["半休", "半日休", "時間休"],
+}
+
+WORDS = ["定例", "会議", "レビュー", "打ち合わせ", "顧客", "訪問", "移動", "出張", "研修",
+         "1on1", "面談", "締め", "報告", "資料", "作成", "リリース", "障害", "対応",
+         "本社", "会議室A", "Zoom", "品川", "大阪", "オンライン", "ランチ"]
+
+
+def _taxonomy(size: int) -> dict[str, list[str]]:
+    """基本分類に社内独自の休暇名を足して size 語程度にする"""
+    rng = random.Random(SEED)
+    taxonomy = {k: list(v) for k, v in BASE_TAXONOMY.items()}
+    prefixes = ["社内", "特別", "記念", "地域", "ボランティア", "自己啓発", "結婚", "転勤", "災害", "裁判員"]
+    suffixes = ["休暇", "休", "特休", "休業"]
+    while sum(len(v) for v in taxonomy.values()) < size:
+        word = rng.choice(prefixes) + rng.choice(WORDS[:12]) + rng.choice(suffixes)
+        taxonomy["full_day"].append(word)
+    return taxonomy
+
+
+def _events(count: int, taxonomy: dict[str, list[str]]) -> list[dict]:
+    rng = random.Random(SEED)
+    keywords = [k for v in taxonomy.values() for k in v]
+
+    def text(words: int, leave_rate: float) -> str:
+        parts = [rng.choice(WORDS) for _ in range(words)]
+        if rng.random() < leave_rate:
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(keywords))
+        return " ".join(parts)
+
+    return [
+        {
+            "summary": text(3, 0.05),
+            "description": text(30, 0.02),
+            "location": text(2, 0.01),
+        }
+        for _ in range(count)
+    ]
+
+
+def _naive(taxonomy: dict[str, list[str]]):
+    """従来方式: 項目ごとに全キーワードを in で照合し、最長一致を選ぶ"""
+    keywords = []
+    seen = set()
+    for category, words in taxonomy.items():
+        for word in words:
+            normalized = _normalize(word)
+            if normalized not in seen:
+                seen.add(normalized)
+                keywords.append((normalized, category))
+
+    def match(event: dict):
+        for field in DEFAULT_MATCH_FIELDS:
+            text = _normalize(event.get(field) or "")
+            best = None
+            for keyword, category in keywords:
+                pos = text.find(keyword)
+                if pos >= 0:
+                    key = (-len(keyword), pos)
+                    if best is None or key < best[0]:
+                        best = (key, category)
+            if best is not None:
+                return best[1]
+        return None
+
+    return match
+
+
+def _run(label: str, match, events: list[dict]) -> list:
+    started = time.perf_counter()
+    results = [match(e) for e in events]
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{label:<14} {elapsed:8.1f} ms  ({elapsed * 1000 / len(events):6.1f} µs/event)")
+    return results
+
+
+def main():
+    for size in (3, 50, 300, 1000):
+        taxonomy = _taxonomy(size) if size > 3 else {"full_day": ["有給", "年休", "休暇"]}
+        events = _events(EVENTS, taxonomy)
+        print(f"keywords {sum(len(v) for v in taxonomy.values())}, events {EVENTS}")
+
+        started = time.perf_counter()
+        matcher = KeywordMatcher(taxonomy)
+        print(f"{'build':<14} {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+        naive = _run("naive", _naive(taxonomy), events)
+        compiled = _run("aho-corasick", lambda e: getattr(matcher.match_event(e), "category", None), events)
+        assert naive == compiled, "照合結果が一致しません"
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""軽量プロファイル（browser.lean_profile）の効果を計測する
+
+スタンドインの勤怠サイト（画像・動画・フォント・サードパーティスクリプト付き）
+に対して、打刻画面の表示完了までの時間と Chromium プロセス群の RSS 合計を
+プロファイル有効/無効で比較する。RSS は /proc を読むため Linux 専用。
+
+    cd attendance-agent
+    python -m playwright install chromium   # 初回のみ
+    python benchmarks/bench_lean_profile.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from services.attendance_browser import AttendanceBrowser  # noqa: E402
+from stand_in_site import start_site  # noqa: E402
+
+ROUNDS = 10
+
+
+def _config(session_path: str, lean: bool) -> dict:
+    return {
+        "browser": {
+            "headless": True,
+            "retry_count": 1,
+            "session_storage_path": session_path,
+            "lean_profile": {"enabled": lean},
+            "selectors": {
+                "login_url": "",
+                "username_field": "#username",
+                "password_field": "#password",
+                "login_button": "#login-btn",
+                "clock_in_button": "#clock-in",
+                "clock_out_button": "#clock-out",
+                "success_message": ".success-msg",
+            },
+        }
+    }
+
+
+def _descendant_rss_mb() -> float:
+    """このプロセス配下（Chromium 等）の RSS 合計を MB で返す"""
+    children: dict[int, list[int]] = {}
+    rss_kb: dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as f:
+                fields = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            continue
+        pid = int(entry)
+        children.setdefault(int(fields["PPid"]), []).append(pid)
+        rss_kb[pid] = int(fields.get("VmRSS", "0 kB").split()[0])
+
+    total = 0
+    stack = list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        total += rss_kb.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total / 1024
+
+
+async def _measure(base_url: str, lean: bool) -> tuple[list[float], float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        browser = AttendanceBrowser(
+            url=base_url + "/",
+            user="bench",
+            password="bench",
+            config=_config(str(Path(tmp) / "session.json"), lean),
+        )
+        samples = []
+        try:
+            page = await browser._get_page()
+            await browser.ensure_logged_in(page)  # 初回ログインを除外
+            await page.close()
+            for _ in range(ROUNDS):
+                page = await browser._get_page()
+                started = time.perf_counter()
+                if not await browser.ensure_logged_in(page):
+                    raise RuntimeError("打刻画面の表示に失敗しました")
+                samples.append((time.perf_counter() - started) * 1000)
+                await page.close()
+            page = await browser._get_page()
+            await browser.ensure_logged_in(page)
+            rss = _descendant_rss_mb()
+        finally:
+            await browser.close()
+        return samples, rss
+
+
+def main():
+    server, base_url = start_site(latency_ms=20)
+    try:
+        print(f"打刻画面の表示完了まで x {ROUNDS}")
+        for label, lean in (("default", False), ("lean", True)):
+            samples, rss = asyncio.run(_measure(base_url, lean))
+            print(
+                f"{label:<8} median {statistics.median(samples):7.1f} ms  "
+                f"max {max(samples):7.1f} ms  RSS {rss:7.1f} MB"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
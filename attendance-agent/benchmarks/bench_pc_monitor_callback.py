@@ -0,0 +1,58 @@
+"""PCMonitor のマウス/キーボードコールバックのコストを計測する
+
+旧実装（datetime.now() + Lock + timedelta 比較）と、現行の高速パス
+（単調増加の整数秒によるロックなし判定）を同条件で比較する。
+
+    cd attendance-agent
+    python benchmarks/bench_pc_monitor_callback.py
+
+X サーバーのない環境では PYNPUT_BACKEND=dummy を指定する。
+"""
+import sys
+import threading
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.pc_monitor import PCMonitor  # noqa: E402
+
+CALLS = 200_000
+
+
+class LegacyMonitor:
+    """変更前の _record_event_dedup を再現した比較用実装"""
+
+    def __init__(self):
+        self._events: list[datetime] = []
+        self._lock = threading.Lock()
+
+    def _record_event_dedup(self):
+        now = datetime.now()
+        with self._lock:
+            if self._events and (now - self._events[-1]).total_seconds() < 1:
+                return
+            self._events.append(now)
+
+    def _on_mouse_move(self, x, y):
+        self._record_event_dedup()
+
+
+def _bench(label: str, callback) -> float:
+    callback(0, 0)  # 最初の1件は記録される
+    best = min(timeit.repeat(lambda: callback(1, 1), number=CALLS, repeat=5))
+    per_call_ns = best / CALLS * 1e9
+    print(f"{label:<28} {per_call_ns:8.1f} ns/call")
+    return per_call_ns
+
+
+def main():
+    print(f"on_move x {CALLS:,} (dedup ウィンドウ内、best of 5)")
+    legacy = _bench("legacy (datetime + Lock)", LegacyMonitor()._on_mouse_move)
+    current = _bench("fast path (monotonic int)", PCMonitor()._on_mouse_move)
+    print(f"speedup: {legacy / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""打刻のエンドツーエンド所要時間をコールド/ウォームで比較する
+
+スタンドインの勤怠サイト（stand_in_site.py）に対して AttendanceBrowser で
+打刻し、StampResult.elapsed_ms を集計する。
+
+    cd attendance-agent
+    python -m playwright install chromium   # 初回のみ
+    python benchmarks/bench_stamp_latency.py
+"""
+import asyncio
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from services.attendance_browser import AttendanceBrowser  # noqa: E402
+from stand_in_site import start_site  # noqa: E402
+
+ROUNDS = 10
+LATENCY_MS = 50
+
+
+def _config(session_path: str, warm: bool) -> dict:
+    return {
+        "browser": {
+            "headless": True,
+            "retry_count": 1,
+            "session_storage_path": session_path,
+            "warm_page": {"enabled": warm, "refresh_times": []},
+            "selectors": {
+                "login_url": "",
+                "username_field": "#username",
+                "password_field": "#password",
+                "login_button": "#login-btn",
+                "clock_in_button": "#clock-in",
+                "clock_out_button": "#clock-out",
+                "success_message": ".success-msg",
+            },
+        }
+    }
+
+
+async def _measure(base_url: str, warm: bool) -> list[float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        browser = AttendanceBrowser(
+            url=base_url + "/",
+            user="bench",
+            password="bench",
+            config=_config(str(Path(tmp) / "session.json"), warm),
+        )
+        samples = []
+        try:
+            await browser.clock_in()  # ブラウザ起動・初回ログインを除外
+            for _ in range(ROUNDS):
+                if warm:
+                    await browser.warm_up()
+                result = await browser.clock_in()
+                if not result.success:
+                    raise RuntimeError(result.error)
+                samples.append(result.elapsed_ms)
+        finally:
+            await browser.close()
+        return samples
+
+
+def _report(label: str, samples: list[float]):
+    print(
+        f"{label:<6} median {statistics.median(samples):7.1f} ms  "
+        f"min {min(samples):7.1f} ms  max {max(samples):7.1f} ms"
+    )
+
+
+def main():
+    server, base_url = start_site(latency_ms=LATENCY_MS)
+    try:
+        print(f"stand-in latency {LATENCY_MS}ms/request, {ROUNDS} stamps each")
+        _report("cold", asyncio.run(_measure(base_url, warm=False)))
+        _report("warm", asyncio.run(_measure(base_url, warm=True)))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""ベンチマーク用のローカル勤怠システム（スタンドイン）
+
+社内勤怠システムの代わりに、ログイン画面・打刻画面・打刻APIだけを持つ
+最小限のHTTPサーバーを起動する。latency_ms で各レスポンスに遅延を入れ、
+イントラネット越しの応答時間を模擬する。打刻画面は実システム同様に
+画像・動画・フォント・スタイルシート・サードパーティスクリプト
+（127.0.0.1 に対する localhost を別ホストとして扱う）を読み込む。
+
+    server, base_url = start_site(latency_ms=50)
+    ...
+    server.shutdown()
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SESSION_COOKIE = "kintai_session=ok"
+
+LOGIN_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>ログイン</title></head>
+<body>
+<form method="post" action="/login">
+  <input id="username" name="username">
+  <input id="password" name="password" type="password">
+  <button id="login-btn" type="submit">ログイン</button>
+</form>
+</body></html>
+"""
+
+ATTENDANCE_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>勤怠</title>
+<link rel="stylesheet" href="/static/app.css">
+<style>@font-face { font-family: corp; src: url(/static/corp.woff2); }</style>
+<script src="{third_party}/thirdparty/analytics.js"></script>
+</head>
+<body>
+<img src="/static/hero.png" alt="">
+<video src="/static/intro.mp4" autoplay muted></video>
+<button id="clock-in" onclick="stamp('in')">出勤</button>
+<button id="clock-out" onclick="stamp('out')">退勤</button>
+<div id="result"></div>
+<script>
+// 解析ビーコン相当のポーリング（networkidle が成立しない状況を再現）
+setInterval(() => fetch('/beacon', {method: 'POST'}), 300);
+function stamp(kind) {
+  fetch('/stamp?kind=' + kind, {method: 'POST'})
+    .then(r => r.json())
+    .then(d => {
+      document.getElementById('result').innerHTML =
+        '<div class="success-msg">打刻しました ' + d.time + '</div>';
+    });
+}
+</script>
+</body></html>
+"""
+
+
+# 静的リソース: パス -> (Content-Type, 本文)
+STATIC_RESOURCES = {
+    "/static/app.css": ("text/css", ("body { font-family: corp; }\n" * 2000).encode()),
+    "/static/corp.woff2": ("font/woff2", bytes(300 * 1024)),
+    "/static/hero.png": ("image/png", bytes(2 * 1024 * 1024)),
+    "/static/intro.mp4": ("video/mp4", bytes(3 * 1024 * 1024)),
+    "/thirdparty/analytics.js": (
+        "application/javascript",
+        (
+            "var t = Date.now(); while (Date.now() - t < 150) {}\n"
+            + "// padding\n" * 20000
+        ).encode(),
+    ),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    latency_ms = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def _send(self, status: int, body: str, content_type: str = "text/html", headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _logged_in(self) -> bool:
+        return SESSION_COOKIE in self.headers.get("Cookie", "")
+
+    def do_GET(self):
+        self._delay()
+        path = self.path.split("?", 1)[0]
+        if path == "/login":
+            self._send(200, LOGIN_PAGE)
+        elif path == "/":
+            if not self._logged_in():
+                self._send(302, "", headers={"Location": "/login"})
+            else:
+                port = self.server.server_address[1]
+                page = ATTENDANCE_PAGE.replace(
+                    "{third_party}", f"http://localhost:{port}"
+                )
+                self._send(200, page)
+        elif path in STATIC_RESOURCES:
+            content_type, data = STATIC_RESOURCES[path]
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send(404, "not found", "text/plain")
+
+    def do_POST(self):
+        self._delay()
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        path = self.path.split("?", 1)[0]
+        if path == "/login":
+            self._send(
+                302,
+                "",
+                headers={"Location": "/", "Set-Cookie": f"{SESSION_COOKIE}; Path=/"},
+            )
+        elif path == "/beacon":
+            self._send(204, "")
+        elif path == "/stamp" and self._logged_in():
+            now = time.strftime("%H:%M")
+            self._send(200, f'{{"time": "{now}"}}', "application/json")
+        else:
+            self._send(403, "forbidden", "text/plain")
+
+
+def start_site(latency_ms: int = 0, handler_cls=None):
+    """スタンドインサーバーを別スレッドで起動し (server, base_url) を返す"""
+    handler = type("Handler", (handler_cls or _Handler,), {"latency_ms": latency_ms})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
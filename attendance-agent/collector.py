@@ -0,0 +1,65 @@
+"""勤怠管理エージェント - コレクタ（分離構成のPC側）
+
+PC操作を PCMonitor で数え、1分ごとの件数をハートビートとして server.py
+へ送るだけの常駐プロセス。グラフ・ブラウザ・Slack・カレンダーは
+読み込まないため、PC側のメモリ使用量は pynput のリスナー分で済む。
+
+    ATTENDANCE_USER=tanaka python collector.py
+"""
+import os
+import signal
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from services.config_loader import load_config
+from services.heartbeat import HeartbeatSender
+from services.pc_monitor import PCMonitor
+
+
+def main():
+    load_dotenv()
+    config = load_config("config.yaml")
+    hb_config = config["heartbeat"]
+    user_id = os.getenv("ATTENDANCE_USER")
+    if not user_id:
+        print("[コレクタ] ATTENDANCE_USER を設定してください")
+        sys.exit(1)
+
+    monitor = PCMonitor(
+        bucket_seconds=config["working_state"].get("bucket_seconds", 1),
+        retention_minutes=hb_config["redundancy_minutes"],
+    )
+    monitor.start()
+    secret = os.getenv("HEARTBEAT_SECRET", "").encode() or None
+    sender = HeartbeatSender(
+        monitor,
+        user_id=user_id,
+        address=(hb_config["server"], hb_config["port"]),
+        redundancy_minutes=hb_config["redundancy_minutes"],
+        interval_seconds=hb_config["interval_seconds"],
+        secret=secret,
+    )
+    sender.start()
+    print(
+        f"[コレクタ] {hb_config['server']}:{hb_config['port']} へ"
+        f"{hb_config['interval_seconds']}秒ごとに送信します"
+    )
+
+    def shutdown(signum, frame):
+        sender.stop()
+        monitor.stop()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        shutdown(None, None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# graph/check.py
+
+
+def initial_state(today_str: str, saved: dict) -> dict:
+    """その日の最初のチェックで使う初期状態"""
+    return {
+        "today": today_str,
+        "is_holiday": False,
+        "holiday_reason": None,
+        "leave_intervals": [],
+        "clock_in_done": saved["clock_in_done"],
+        "clock_in_time": saved["clock_in_time"],
+        "last_clock_out_time": saved["last_clock_out_time"],
+        "is_working": False,
+        "last_activity_time": None,
+        "clock_out_pending": False,
+        "operation_log": [],
+        "action_taken": None,
+        "error_message": None,
+        "extra": {},
+    }
+
+
+def drop_old_threads(checkpointer, today_str: str):
+    """前日以前のチェックポイントを破棄する（保持するのは当日分のみ）"""
+    thread_ids = {
+        checkpoint.config["configurable"]["thread_id"]
+        for checkpoint in checkpointer.list(None)
+    }
+    for thread_id in thread_ids - {today_str}:
+        checkpointer.delete_thread(thread_id)
+
+
+async def run_graph_check(graph, store, today_str: str) -> dict:
+    """コンパイル済みグラフで1回分のチェックを実行し、実行後の状態を返す
+
+    当日の最初のチェックでは store から打刻状態を読み出して初期状態とし、
+    以降はチェックポイントの状態にチェックごとの項目だけを上書きして実行する。
+    """
+    thread = {"configurable": {"thread_id": today_str}}
+
+    if graph.checkpointer.get_tuple(thread) is None:
+        drop_old_threads(graph.checkpointer, today_str)
+        state = initial_state(today_str, store.load(today_str))
+    else:
+        state = {"today": today_str, "action_taken": None, "error_message": None}
+
+    # チェックポイントは実行完了時にだけ書き込む
+    return await graph.ainvoke(state, thread, durability="exit")
@@ -0,0 +1,32 @@
+# graph/checkpointer.py
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+class LatestCheckpointSaver(InMemorySaver):
+    """スレッドごとに最新のチェックポイントだけを保持するメモリ上のセーバー
+
+    チェックの度に直近の操作ログを含む状態が書き込まれるため、InMemorySaver
+    のまま履歴を残すと1日分のチェック回数に比例してメモリが増える。
+    次のチェックに必要なのは最新の状態だけなので、書き込みの度に古い
+    チェックポイントと参照されなくなったチャネル値を捨てる。
+    """
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = saved["configurable"]["thread_id"]
+        checkpoint_ns = saved["configurable"]["checkpoint_ns"]
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+
+        for checkpoint_id in [c for c in checkpoints if c != checkpoint["id"]]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        live = {
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in checkpoint["channel_versions"].items()
+        }
+        for key in [
+            k for k in self.blobs if k[:2] == (thread_id, checkpoint_ns) and k not in live
+        ]:
+            del self.blobs[key]
+        return saved
@@ -4,7 +4,8 @@ from graph.state import AttendanceState
 
 
 def route_after_working_check(state: AttendanceState) -> str:
-    if not state["is_working"]:
+    # 非稼働でも退勤打刻待ち（final_idle）なら打刻判定へ進む
+    if not state["is_working"] and not state.get("clock_out_pending"):
         return "end"
     return "calendar_check"
 
@@ -27,12 +28,16 @@ def build_graph(
     browser=None,
     notifier=None,
     config=None,
+    store=None,
+    checkpointer=None,
 ):
     """LangGraphのグラフを構築して返す
 
     各ノード関数はサービス依存を持つため、functools.partialでラップして
     LangGraphが期待する (state) -> dict シグネチャに合わせる。
     引数を省略した場合はプレースホルダーラッパーを使用する（テスト用）。
+    stamp ノードは非同期関数のため、グラフは ainvoke で実行する。
+    checkpointer を渡すと thread_id ごとに状態を引き継ぐ。
     """
     from functools import partial
     from graph.nodes.working_state_node import working_state_node
@@ -41,6 +46,12 @@ def build_graph(
     from graph.nodes.stamp_node import stamp_node
     from graph.nodes.slack_notify_node import slack_notify_node
     from graph.nodes.state_update_node import state_update_node
+    from services.config_loader import as_snapshot
+
+    # dict の設定はここで1回だけ検証してスナップショットにする
+    # （ConfigWatcher はそのまま渡し、チェックの度に最新の設定を引かせる）
+    if isinstance(config, dict):
+        config = as_snapshot(config)
 
     # ノード関数をLangGraph互換の (state) -> dict にラップ
     working_state_wrapped = partial(
@@ -52,6 +63,7 @@ def build_graph(
     time_gate_wrapped = partial(time_gate_node, config=config)
     stamp_wrapped = partial(stamp_node, browser=browser)
     slack_notify_wrapped = partial(slack_notify_node, notifier=notifier)
+    state_update_wrapped = partial(state_update_node, state_store=store)
 
     workflow = StateGraph(AttendanceState)
 
@@ -60,7 +72,7 @@ def build_graph(
     workflow.add_node("time_gate", time_gate_wrapped)
     workflow.add_node("stamp", stamp_wrapped)
     workflow.add_node("slack_notify", slack_notify_wrapped)
-    workflow.add_node("state_update", state_update_node)
+    workflow.add_node("state_update", state_update_wrapped)
 
     workflow.set_entry_point("working_state")
 
@@ -84,4 +96,4 @@ def build_graph(
     workflow.add_edge("slack_notify", "state_update")
     workflow.add_edge("state_update", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
@@ -7,11 +7,15 @@ def calendar_check_node(
     state: AttendanceState,
     calendar_service=None,
 ) -> dict:
-    """今日が打刻対象日かをカレンダーで確認するノード"""
+    """今日が打刻対象日かをカレンダーで確認するノード
+
+    打刻対象日であれば、半休など時間帯のある休暇も返す。
+    """
     today = date.fromisoformat(state["today"])
     is_holiday, reason = calendar_service.is_holiday(today)
 
     return {
         "is_holiday": is_holiday,
         "holiday_reason": reason if is_holiday else None,
+        "leave_intervals": [] if is_holiday else calendar_service.get_leave_intervals(today),
     }
@@ -23,8 +23,9 @@ def slack_notify_node(state: AttendanceState, notifier=None) -> dict:
         msg = MESSAGES["clock_in"].format(time=state["clock_in_time"])
         notifier.send(msg)
     elif action == "clock_out":
+        # 退勤時刻の更新は同じメッセージの書き換え（またはダイジェスト）にまとめる
         msg = MESSAGES["clock_out"].format(time=state["last_clock_out_time"])
-        notifier.send(msg)
+        notifier.send(msg, coalesce_key=f"clock_out:{state['today']}")
     elif action == "clock_in_and_out":
         msg = MESSAGES["clock_in_and_out"].format(
             in_time=state["clock_in_time"],
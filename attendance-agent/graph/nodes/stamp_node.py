@@ -23,6 +23,7 @@ async def stamp_node(state: AttendanceState, browser: StamperInterface = None) -
         if result.success:
             return {
                 "last_clock_out_time": result.timestamp,
+                "clock_out_pending": False,
                 "action_taken": "clock_out",
                 "error_message": None,
             }
@@ -50,6 +51,7 @@ async def stamp_node(state: AttendanceState, browser: StamperInterface = None) -
             "clock_in_done": True,
             "clock_in_time": in_result.timestamp,
             "last_clock_out_time": out_result.timestamp,
+            "clock_out_pending": False,
             "action_taken": "clock_in_and_out",
             "error_message": None,
         }
@@ -8,8 +8,19 @@ def _today_str() -> str:
     return date.today().isoformat()
 
 
-def state_update_node(state: AttendanceState) -> dict:
-    """打刻後の状態を更新し、日付跨ぎでリセットするノード"""
+def state_update_node(state: AttendanceState, state_store=None) -> dict:
+    """打刻後の状態を更新し、日付跨ぎでリセットするノード
+
+    state_store（StateStore）を渡すと、更新後の打刻状態をその場で永続化する。
+    （引数名 store は LangGraph が自身の BaseStore の注入に使うため避ける）
+    """
+    result = _updated_state(state)
+    if state_store is not None:
+        state_store.save(result["today"], result)
+    return result
+
+
+def _updated_state(state: AttendanceState) -> dict:
     today = _today_str()
 
     # 日付が変わったらリセット
@@ -18,10 +29,13 @@ def state_update_node(state: AttendanceState) -> dict:
             "today": today,
             "is_holiday": False,
             "holiday_reason": None,
+            "leave_intervals": [],
             "clock_in_done": False,
             "clock_in_time": None,
             "last_clock_out_time": None,
             "is_working": False,
+            "last_activity_time": None,
+            "clock_out_pending": False,
             "operation_log": [],
             "action_taken": None,
             "error_message": None,
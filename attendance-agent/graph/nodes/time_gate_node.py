@@ -1,6 +1,13 @@
 # graph/nodes/time_gate_node.py
-from datetime import datetime, time
+from datetime import datetime
 from graph.state import AttendanceState
+from services.config_loader import ConfigSource, TimeRulesConfig, as_snapshot
+from services.time_rules import (
+    ZONE_CLOCK_IN,
+    ZONE_CLOCK_OUT,
+    timeline_for,
+    to_minutes,
+)
 
 
 def _now() -> datetime:
@@ -8,39 +15,57 @@ def _now() -> datetime:
     return datetime.now()
 
 
-def _parse_time(time_str: str) -> time:
-    """HH:MM形式の文字列をtimeオブジェクトに変換"""
-    h, m = map(int, time_str.split(":"))
-    return time(h, m)
+def _clock_out_action(
+    state: AttendanceState, rules: TimeRulesConfig, current: int, cutoff: int
+) -> str:
+    """出勤済みで退勤時刻を過ぎたときに退勤打刻するかを clock_out_strategy で決める
 
+    every_check:  チェックの度に打刻し直す
+    min_interval: 前回の退勤打刻から min_restamp_minutes 経つまで打刻し直さない
+    final_idle:   稼働中は打刻せず、非稼働になった時点（または打刻禁止時刻の
+                  final_margin_minutes 前）に最終操作を反映して1回だけ打刻する
+    """
+    strategy = rules.clock_out_strategy
+    last_clock_out = state.get("last_clock_out_time")
 
-def time_gate_node(state: AttendanceState, config: dict = None) -> dict:
-    """時刻に応じて打刻種別（出勤/退勤/スキップ）を決定するノード"""
-    if config is None:
-        config = {"time_rules": {"clock_out_time": "18:00", "cutoff_time": "22:00"}}
+    if strategy == "min_interval":
+        if last_clock_out and current - to_minutes(last_clock_out) < rules.min_restamp_minutes:
+            return "skipped"
+    elif strategy == "final_idle":
+        if last_clock_out and not state.get("clock_out_pending"):
+            return "skipped"  # 前回の退勤打刻後に操作がない
+        if state["is_working"] and current < cutoff - rules.final_margin_minutes:
+            return "skipped"  # まだ作業中
+    return "clock_out"
 
-    rules = config["time_rules"]
-    clock_out_time = _parse_time(rules["clock_out_time"])
-    cutoff_time = _parse_time(rules["cutoff_time"])
 
-    now = _now()
-    current_time = now.time()
-
-    # 22:00以降 → スキップ（打刻禁止）
-    if current_time >= cutoff_time:
-        return {"action_taken": "skipped"}
+def time_gate_node(state: AttendanceState, config: ConfigSource = None) -> dict:
+    """時刻に応じて打刻種別（出勤/退勤/スキップ）を決定するノード
 
+    半休などの休暇時間帯（leave_intervals）がある場合、休暇中は打刻せず
+    （午前休なら休暇が明けるまで出勤打刻しない）、退勤時刻を跨ぐ休暇
+    （午後休など）はその開始時刻を退勤時刻とする。
+    退勤時刻以降の打刻し直しは time_rules.clock_out_strategy に従う。
+    config は dict・ConfigSnapshot・ConfigWatcher のいずれでもよい。
+    """
+    rules = as_snapshot(config).time_rules
+    now = _now()
+    # 時刻ルールは日付・設定・休暇時間帯ごとに1回だけ区間表にする
+    timeline = timeline_for(now.date(), rules, state.get("leave_intervals"))
+    zone = timeline.zone(now)
     clock_in_done = state["clock_in_done"]
 
-    # 18:00〜22:00
-    if current_time >= clock_out_time:
+    # 退勤時刻〜打刻禁止時刻
+    if zone == ZONE_CLOCK_OUT:
         if clock_in_done:
-            return {"action_taken": "clock_out"}
+            current = now.hour * 60 + now.minute
+            return {"action_taken": _clock_out_action(state, rules, current, timeline.cutoff)}
         else:
             return {"action_taken": "clock_in_and_out"}
 
-    # 〜18:00
-    if not clock_in_done:
+    # 〜退勤時刻
+    if zone == ZONE_CLOCK_IN and not clock_in_done:
         return {"action_taken": "clock_in"}
-    else:
-        return {"action_taken": "skipped"}
+
+    # 出勤済み・休暇中・打刻禁止時刻以降
+    return {"action_taken": "skipped"}
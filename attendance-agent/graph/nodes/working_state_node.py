@@ -1,24 +1,48 @@
 from graph.state import AttendanceState
+from services.config_loader import ConfigSource, as_snapshot
 from services.pc_monitor import PCMonitor
 
 
 def working_state_node(
     state: AttendanceState,
     monitor: PCMonitor = None,
-    config: dict = None,
+    config: ConfigSource = None,
 ) -> dict:
-    """PC操作ログを分析し、作業中かどうかを判定するノード"""
-    if config is None:
-        config = {"working_state": {"window_minutes": 15, "min_event_count": 2}}
+    """PC操作ログを分析し、作業中かどうかを判定するノード
 
-    ws_config = config["working_state"]
-    window = ws_config["window_minutes"]
-    min_count = ws_config["min_event_count"]
+    退勤打刻を最終操作後にまとめて行う設定（clock_out_strategy: final_idle）
+    では、出勤済みかつ最終退勤打刻より後に min_event_count 回以上の操作が
+    あれば clock_out_pending を立て、非稼働になった時点で退勤打刻できるように
+    する（退勤打刻後にマウスが1回動いただけでは打ち直さない）。
+    clock_out_pending はチェックポイントの状態に残し、操作が判定窓から
+    外れても退勤打刻に成功するまで（stamp ノードが下ろすまで）立てたままにする。
+    config は dict・ConfigSnapshot・ConfigWatcher のいずれでもよい。
+    """
+    snapshot = as_snapshot(config)
+    window = snapshot.working_state.window_minutes
+    min_count = snapshot.working_state.min_event_count
 
     is_working = monitor.is_working(threshold_minutes=window, min_count=min_count)
     recent_events = monitor.get_recent_events(window)
 
+    last_activity = monitor.last_activity_time()
+    last_activity_time = last_activity.strftime("%H:%M") if last_activity else None
+    strategy = snapshot.time_rules.clock_out_strategy
+    last_clock_out = state.get("last_clock_out_time")
+    if last_clock_out is None:
+        active_since_clock_out = last_activity_time is not None
+    else:
+        after = sum(1 for e in recent_events if e.strftime("%H:%M") > last_clock_out)
+        active_since_clock_out = after >= min_count
+    clock_out_pending = bool(
+        strategy == "final_idle"
+        and state.get("clock_in_done")
+        and (state.get("clock_out_pending") or active_since_clock_out)
+    )
+
     return {
         "is_working": is_working,
         "operation_log": recent_events,
+        "last_activity_time": last_activity_time,
+        "clock_out_pending": clock_out_pending,
     }
@@ -6,10 +6,13 @@ class AttendanceState(TypedDict):
     today: str                          # YYYY-MM-DD
     is_holiday: bool                    # 祝日・有給フラグ
     holiday_reason: Optional[str]       # 理由
+    leave_intervals: list[dict]         # 半休など時間帯のある休暇 {"start", "end", "category", "reason"}
     clock_in_done: bool                 # 出勤打刻済み
     clock_in_time: Optional[str]        # 出勤打刻時刻 HH:MM
     last_clock_out_time: Optional[str]  # 最終退勤打刻時刻 HH:MM
     is_working: bool                    # 現在作業中か
+    last_activity_time: Optional[str]   # 最後にPC操作があった時刻 HH:MM
+    clock_out_pending: bool             # 最終退勤打刻後に操作があった（final_idle用、退勤打刻まで保持）
     operation_log: list[datetime]       # 直近の操作イベントリスト
     action_taken: Optional[str]         # "clock_in" / "clock_out" / "skipped" / "error"
     error_message: Optional[str]        # エラー詳細
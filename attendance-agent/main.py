@@ -1,73 +1,122 @@
-"""勤怠管理エージェント - エントリーポイント"""
-import asyncio
+"""勤怠管理エージェント - エントリーポイント
+
+ログイン直後の起動で操作の取りこぼしを減らすため、PC監視を最初に開始し、
+重いモジュール（googleapiclient, slack_sdk, playwright, APScheduler,
+グラフノード）は監視開始後まで import しない。グラフは起動時に1回だけ
+コンパイルし、チェックごとに使い回す。
+"""
+import time
+
+_STARTED = time.monotonic()
+
+import argparse
 import signal
 import sys
-import time
-from datetime import date
-from pathlib import Path
+import threading
+from datetime import date, datetime
 
 from dotenv import load_dotenv
 import os
 
-from services.config_loader import load_config
-from services.pc_monitor import PCMonitor
-from services.google_calendar import GoogleCalendarService, LocalCalendarService
-from services.slack_client import SlackNotifier, ConsoleNotifier
-from graph.nodes.working_state_node import working_state_node
-from graph.nodes.calendar_check_node import calendar_check_node
-from graph.nodes.time_gate_node import time_gate_node
-from graph.nodes.stamp_node import stamp_node
-from graph.nodes.slack_notify_node import slack_notify_node
-from graph.nodes.state_update_node import state_update_node
-from schedulers.scheduler import AttendanceScheduler
-
-
-# グローバル状態保持用
-_state_store = {
-    "clock_in_done": False,
-    "clock_in_time": None,
-    "last_clock_out_time": None,
-    "last_date": "",
-}
-
-
-def create_services(config: dict):
-    """設定に基づいてサービスインスタンスを生成"""
-    load_dotenv()
+from services.config_loader import as_snapshot, create_config_source, load_config
+from services.startup_report import StartupReport
+
+
+# PC監視の保持期間の下限（window_minutes を再読み込みで広げても数え漏れない）
+MIN_MONITOR_RETENTION_MINUTES = 60
 
-    # PC監視
-    monitor = PCMonitor()
 
-    # カレンダーサービス
+def create_monitor(config: dict):
+    """PC監視サービスを生成"""
+    from services.pc_monitor import PCMonitor
+
+    ws_config = config["working_state"]
+    return PCMonitor(
+        bucket_seconds=ws_config.get("bucket_seconds", 1),
+        retention_minutes=max(MIN_MONITOR_RETENTION_MINUTES, ws_config["window_minutes"]),
+    )
+
+
+def create_calendar_service(config: dict):
+    """設定に基づいてカレンダーサービスを生成（API初期化はバックグラウンドで行う）"""
+    from services.google_calendar import GoogleCalendarService, LocalCalendarService
+
     cal_config = config["calendar"]
     if cal_config["enabled"] and cal_config.get("fallback") != "jpholiday":
-        calendar_service = GoogleCalendarService(
+        from services.keyword_matcher import KeywordMatcher
+        matcher = KeywordMatcher.from_config(cal_config)
+        holiday_calendar_id = os.getenv("HOLIDAY_CALENDAR_ID", cal_config["holiday_calendar_id"])
+        holiday_cache = None
+        cache_config = cal_config.get("cache", {})
+        if cache_config.get("enabled"):
+            from services.holiday_cache import HolidayCache
+            # 休暇分類や照合項目が変わったらgoogle由来の結果を破棄する
+            # 同じファイルを共有する他のユーザー・祝日カレンダーの結果とは分ける
+            holiday_cache = HolidayCache(
+                path=cache_config["path"],
+                vacation_keywords=matcher.signature(),
+                ttl_hours=cache_config.get("ttl_hours"),
+                scope=f"{os.getenv('ATTENDANCE_USER', '')}:{holiday_calendar_id}",
+            )
+        return GoogleCalendarService(
             credentials_path=os.getenv("GOOGLE_CREDENTIALS_PATH", "credentials.json"),
             token_path=os.getenv("GOOGLE_TOKEN_PATH", "token.json"),
-            holiday_calendar_id=os.getenv(
-                "HOLIDAY_CALENDAR_ID", cal_config["holiday_calendar_id"]
-            ),
+            holiday_calendar_id=holiday_calendar_id,
             vacation_keywords=cal_config["vacation_keywords"],
+            init_in_background=True,
+            prefetch_days=cal_config.get("prefetch_days", 60),
+            sync_interval_hours=cal_config.get("sync_interval_hours", 24),
+            holiday_cache=holiday_cache,
+            company_closures=cal_config.get("company_closures", []),
+            matcher=matcher,
+            half_day_boundary=cal_config.get("half_day_boundary", "13:00"),
         )
-    else:
-        calendar_service = LocalCalendarService(
-            vacation_keywords=cal_config["vacation_keywords"]
-        )
+    return LocalCalendarService(
+        vacation_keywords=cal_config["vacation_keywords"],
+        company_closures=cal_config.get("company_closures", []),
+    )
+
+
+def create_notifier(config: dict):
+    """設定に基づいて通知サービスを生成（Slack未設定ならコンソール出力）"""
+    from services.slack_client import SlackNotifier, ConsoleNotifier, DigestNotifier
 
-    # Slack通知
     slack_config = config["slack"]
     slack_token = os.getenv("SLACK_BOT_TOKEN", "")
     slack_channel = os.getenv("SLACK_NOTIFY_CHANNEL", slack_config.get("notify_channel", ""))
-    if slack_config["enabled"] and slack_token:
-        notifier = SlackNotifier(token=slack_token, channel=slack_channel)
-    else:
-        notifier = ConsoleNotifier()
+    if not (slack_config["enabled"] and slack_token):
+        return ConsoleNotifier()
+
+    notifier = SlackNotifier(
+        token=slack_token,
+        channel=slack_channel,
+        coalesce_window_minutes=slack_config.get("coalesce_window_minutes", 0),
+    )
+    queue_config = slack_config.get("queue", {})
+    if queue_config.get("enabled"):
+        from services.notification_queue import QueuedNotifier
+        notifier = QueuedNotifier.from_config(notifier, queue_config)
+    if slack_config.get("digest", {}).get("enabled"):
+        notifier = DigestNotifier(notifier)
+    return notifier
+
+
+def create_services(config: dict, monitor=None):
+    """設定に基づいてサービスインスタンスを生成（monitor指定時はそれを使う）"""
+    load_dotenv()
+
+    # PC監視
+    if monitor is None:
+        monitor = create_monitor(config)
+
+    calendar_service = create_calendar_service(config)
+    notifier = create_notifier(config)
 
     # 打刻サービス
     browser_config = config["browser"]
     stamper_type = browser_config.get("stamper", "dummy")
 
-    if stamper_type == "playwright":
+    if stamper_type in ("playwright", "http"):
         from services.attendance_browser import AttendanceBrowser
         stamper = AttendanceBrowser(
             url=os.getenv("ATTENDANCE_URL", ""),
@@ -75,6 +124,16 @@ def create_services(config: dict):
             password=os.getenv("ATTENDANCE_PASS", ""),
             config=config,
         )
+        if stamper_type == "http":
+            # HTTPで直接打刻し、失敗時のみブラウザで打刻する
+            from services.http_stamper import HttpStamper
+            stamper = HttpStamper(
+                url=os.getenv("ATTENDANCE_URL", ""),
+                user=os.getenv("ATTENDANCE_USER", ""),
+                password=os.getenv("ATTENDANCE_PASS", ""),
+                config=config,
+                fallback=stamper,
+            )
     else:
         from services.dummy_stamper import DummyStamper
         stamper = DummyStamper()
@@ -82,99 +141,211 @@ def create_services(config: dict):
     return monitor, calendar_service, notifier, stamper
 
 
-def run_check(monitor, calendar_service, notifier, stamper, config):
-    """1回分のチェックを実行"""
-    today_str = date.today().isoformat()
+def create_state_store(config: dict):
+    """当日の打刻状態を保存するストアを生成"""
+    from services.state_store import StateStore
 
-    # 日付リセット
-    if today_str != _state_store["last_date"]:
-        _state_store["clock_in_done"] = False
-        _state_store["clock_in_time"] = None
-        _state_store["last_clock_out_time"] = None
-        _state_store["last_date"] = today_str
+    return StateStore.from_config(
+        config.get("state_store", {}),
+        user_id=os.getenv("ATTENDANCE_USER") or "default",
+    )
 
-    # 初期状態
-    state = {
-        "today": today_str,
-        "is_holiday": False,
-        "holiday_reason": None,
-        "clock_in_done": _state_store["clock_in_done"],
-        "clock_in_time": _state_store["clock_in_time"],
-        "last_clock_out_time": _state_store["last_clock_out_time"],
-        "is_working": False,
-        "operation_log": [],
-        "action_taken": None,
-        "error_message": None,
-        "extra": {},
-    }
 
-    # 1. WorkingState
-    ws_result = working_state_node(state, monitor=monitor, config=config)
-    state.update(ws_result)
+def create_check_graph(monitor, calendar_service, notifier, stamper, config, store):
+    """チェック用のグラフを起動時に1回だけコンパイルする
 
-    if not state["is_working"]:
-        return
+    打刻状態は日付を thread_id とするチェックポイントで次のチェックへ
+    引き継ぐ（store はプロセス再起動時の復元用）。
+    """
+    from graph.checkpointer import LatestCheckpointSaver
+    from graph.graph import build_graph
 
-    # 2. CalendarCheck
-    cal_result = calendar_check_node(state, calendar_service=calendar_service)
-    state.update(cal_result)
+    return build_graph(
+        monitor=monitor,
+        calendar_service=calendar_service,
+        browser=stamper,
+        notifier=notifier,
+        config=config,
+        store=store,
+        checkpointer=LatestCheckpointSaver(),
+    )
 
-    if state["is_holiday"]:
-        return
 
-    # 3. TimeGate
-    tg_result = time_gate_node(state, config=config)
-    state.update(tg_result)
+def run_check(graph, store, runner):
+    """1回分のチェックを実行（グラフはrunnerの常駐ループ上で実行する）"""
+    from graph.check import run_graph_check
 
-    if state["action_taken"] == "skipped":
-        return
+    runner.run(run_graph_check(graph, store, date.today().isoformat()))
 
-    # 4. Stamp
-    stamp_result = asyncio.run(stamp_node(state, browser=stamper))
-    state.update(stamp_result)
 
-    # 5. SlackNotify
-    slack_notify_node(state, notifier=notifier)
+def _report_first_event(monitor, report: StartupReport):
+    """最初の操作イベントが記録された時点で起動レポートを出力する"""
+    report.mark("first event recorded", at=monitor.wait_for_first_event())
+    report.print()
 
-    # 6. StateUpdate
-    su_result = state_update_node(state)
-    state.update(su_result)
 
-    # 状態保持
-    _state_store["clock_in_done"] = state.get("clock_in_done", False)
-    _state_store["clock_in_time"] = state.get("clock_in_time")
-    _state_store["last_clock_out_time"] = state.get("last_clock_out_time")
+def enter_dormancy(scheduler, monitor, wake):
+    """休日の休眠モードに入る
+
+    wake（翌日の 0:00）まで定期チェックを止め、monitor を渡した場合は
+    PC監視のリスナーも止める。リスナーは営業日の最初のチェックで再開する。
+    """
+    if not scheduler.sleeping():
+        print(f"[勤怠エージェント] 休日のため {wake:%m/%d %H:%M} まで休眠します")
+    scheduler.sleep_until(wake)
+    if monitor is not None and monitor.listening:
+        monitor.stop()
 
 
 def main():
     """メイン起動処理"""
+    parser = argparse.ArgumentParser(description="勤怠管理エージェント")
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="起動の各段階と最初の操作イベント記録までの時間を表示する",
+    )
+    args = parser.parse_args()
+    report = StartupReport(enabled=args.startup_report, origin=_STARTED)
+
     config = load_config("config.yaml")
-    monitor, calendar_service, notifier, stamper = create_services(config)
+    # グラフ・DayPlanner はチェックの度に最新の検証済み設定を引く
+    live_config = create_config_source(config, "config.yaml")
+    report.mark("config loaded")
 
-    # PC監視開始
+    # PC監視を最優先で開始
+    monitor = create_monitor(config)
     monitor.start()
+    report.mark("monitor started")
     print("[勤怠エージェント] PC監視を開始しました")
+    if args.startup_report:
+        threading.Thread(
+            target=_report_first_event, args=(monitor, report), daemon=True
+        ).start()
+
+    from services.async_runner import AsyncRunner
+    from schedulers.scheduler import AttendanceScheduler
+
+    _, calendar_service, notifier, stamper = create_services(config, monitor=monitor)
+    store = create_state_store(config)
+    if hasattr(notifier, "start"):
+        notifier.start()  # 前回送れなかった通知もここで再送する
+    report.mark("services created")
+
+    # 打刻用の常駐イベントループ（ブラウザを複数回のチェックで再利用するため）
+    runner = AsyncRunner()
+    runner.start()
+
+    graph = create_check_graph(
+        monitor, calendar_service, notifier, stamper, live_config, store
+    )
+    report.mark("graph compiled")
 
     # スケジューラ設定
-    interval = config["scheduler"]["check_interval_minutes"]
+    sched_config = config["scheduler"]
+    interval = sched_config["check_interval_minutes"]
+    event_driven = sched_config.get("event_driven", False)
+
+    sleep_off_hours = sched_config.get("sleep_off_hours", False)
+    dormant_on_holidays = sched_config.get("dormant_on_holidays", False)
+    pause_monitor = dormant_on_holidays and sched_config.get("pause_monitor_when_dormant", False)
+    planner = None
+    if sleep_off_hours or dormant_on_holidays:
+        from schedulers.day_planner import DayPlanner
+        planner = DayPlanner(live_config, calendar_service, wake_daily=dormant_on_holidays)
 
     def check_job():
         try:
-            run_check(monitor, calendar_service, notifier, stamper, config)
+            if dormant_on_holidays:
+                # 休日はグラフを実行せず、翌日の 0:00 まで休眠する
+                wake = planner.dormant_until(datetime.now())
+                if wake is not None:
+                    enter_dormancy(scheduler, monitor if pause_monitor else None, wake)
+                    return
+                if pause_monitor and not monitor.listening:
+                    monitor.start()
+                    print("[勤怠エージェント] 営業日のためPC監視を再開しました")
+            if event_driven:
+                # 稼働→非稼働の遷移はここで検出する
+                monitor.refresh_activity()
+            run_check(graph, store, runner)
+            if sleep_off_hours:
+                # 打刻できない時間帯・休日は次に打刻できる時刻まで止める
+                scheduler.sleep_until(planner.next_wake(datetime.now()))
         except Exception as e:
             print(f"[勤怠エージェント] チェック中にエラー: {e}")
             notifier.send_error(str(e))
 
-    scheduler = AttendanceScheduler(interval_minutes=interval, job_func=check_job)
+    scheduler = AttendanceScheduler(
+        interval_minutes=interval,
+        job_func=check_job,
+        idle_interval_minutes=(
+            sched_config["idle_heartbeat_minutes"] if event_driven else None
+        ),
+    )
+    warm_config = config["browser"].get("warm_page", {})
+    if warm_config.get("enabled") and hasattr(stamper, "warm_up"):
+        def warm_job():
+            try:
+                runner.run(stamper.warm_up())
+            except Exception as e:
+                print(f"[勤怠エージェント] ウォームページの準備に失敗: {e}")
+
+        for i, refresh_time in enumerate(warm_config.get("refresh_times", [])):
+            scheduler.add_daily_job(f"warm_page_{i}", warm_job, refresh_time)
+
+    if hasattr(notifier, "flush_digest"):
+        scheduler.add_daily_job(
+            "notify_digest", notifier.flush_digest, config["slack"]["digest"]["time"]
+        )
+
     scheduler.start()
+    report.mark("scheduler started")
     print(f"[勤怠エージェント] {interval}分間隔でチェックを開始します")
 
+    if event_driven:
+        def on_activity_change(active: bool):
+            scheduler.set_idle(not active)
+            if active:
+                scheduler.trigger_now()
+
+        def watch_activity(snapshot):
+            monitor.watch_activity(
+                window_minutes=snapshot.working_state.window_minutes,
+                min_count=snapshot.working_state.min_event_count,
+                on_change=on_activity_change,
+            )
+
+        scheduler.set_idle(True)
+        watch_activity(as_snapshot(live_config))
+        if hasattr(live_config, "subscribe"):
+            live_config.subscribe(watch_activity)
+        print(
+            "[勤怠エージェント] 操作検知で即時チェックします"
+            f"（非稼働中は{sched_config['idle_heartbeat_minutes']}分間隔）"
+        )
+
+    # config.yaml の変更監視（稼働判定・時刻ルール・セレクタは再起動なしで反映）
+    if hasattr(live_config, "start"):
+        live_config.subscribe(
+            lambda snapshot: monitor.ensure_retention(snapshot.working_state.window_minutes)
+        )
+        if hasattr(stamper, "apply_config"):
+            live_config.subscribe(stamper.apply_config)
+        live_config.start()
+
     # シグナルハンドリング
     def shutdown(signum, frame):
         print("\n[勤怠エージェント] 停止中...")
+        if hasattr(live_config, "stop"):
+            live_config.stop()
         scheduler.stop()
         monitor.stop()
-        asyncio.run(stamper.close())
+        runner.run(stamper.close())
+        runner.stop()
+        if hasattr(notifier, "stop"):
+            notifier.stop()
+        store.close()
         print("[勤怠エージェント] 停止しました")
         sys.exit(0)
 
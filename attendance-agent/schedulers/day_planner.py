@@ -0,0 +1,92 @@
+# schedulers/day_planner.py
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from services.config_loader import ConfigSource, as_snapshot
+from services.time_rules import ZONE_CLOSED, ZONE_LEAVE, timeline_for
+
+# 休日が続いても、この日数先までに営業日が見つからなければその時点で起きる
+MAX_LOOKAHEAD_DAYS = 31
+
+
+def next_midnight(now: datetime) -> datetime:
+    """now の翌日の 0:00"""
+    return datetime.combine(now.date() + timedelta(days=1), time())
+
+
+class DayPlanner:
+    """次にチェックが必要になる時刻を時刻ルールとカレンダーから求める
+
+    打刻禁止時刻以降と休日は次の営業日の 0:00 まで、半休などの休暇中は
+    休暇が明けるまでチェックを止めてよい。それ以外（出勤・退勤の時間帯）は
+    None を返し、通常の間隔でチェックを続ける。
+
+    カレンダー（休日判定・休暇時間帯）は1日1回だけ問い合わせて、日付が
+    変わるまでは同じ結果を使う（API失敗で得た暫定結果は使い回さない）。
+    wake_daily=True のときは休日を飛ばさず翌日の 0:00 に起き、その日の
+    カレンダーを確認し直す（休眠モード用）。
+    config は dict・ConfigSnapshot・ConfigWatcher のいずれでもよい。
+    """
+
+    def __init__(self, config: ConfigSource, calendar_service, wake_daily: bool = False):
+        # dict はここで1回だけ検証する（ConfigWatcher はチェックの度に最新を引く）
+        self._config = as_snapshot(config) if isinstance(config, dict) else config
+        self._calendar = calendar_service
+        self._wake_daily = wake_daily
+        # (日付, 営業日か, 休暇時間帯): 当日分のカレンダー問い合わせ結果
+        self._today: Optional[tuple[date, bool, list]] = None
+
+    def _day_info(self, day: date) -> tuple[date, bool, list]:
+        if self._today is not None and self._today[0] == day:
+            return self._today
+        is_holiday, _ = self._calendar.is_holiday(day)
+        failed = self._calendar.last_lookup_failed
+        leaves = []
+        if not is_holiday:
+            leaves = self._calendar.get_leave_intervals(day)
+            failed = failed or self._calendar.last_lookup_failed
+        info = (day, not is_holiday, leaves)
+        # API失敗時の暫定結果は覚えず、次のチェックで問い合わせ直す
+        if not failed:
+            self._today = info
+        return info
+
+    def is_business_day(self, day: date) -> bool:
+        """day が営業日か（同じ日付はカレンダーに問い合わせ直さない）"""
+        if self._today is not None and self._today[0] == day:
+            return self._today[1]
+        is_holiday, _ = self._calendar.is_holiday(day)
+        return not is_holiday
+
+    def next_business_day_start(self, day: date) -> datetime:
+        """day より後の最初の営業日の 0:00"""
+        candidate = day + timedelta(days=1)
+        for _ in range(MAX_LOOKAHEAD_DAYS):
+            if self.is_business_day(candidate):
+                break
+            candidate += timedelta(days=1)
+        return datetime.combine(candidate, time())
+
+    def _next_day_start(self, now: datetime) -> datetime:
+        if self._wake_daily:
+            return next_midnight(now)
+        return self.next_business_day_start(now.date())
+
+    def dormant_until(self, now: datetime) -> Optional[datetime]:
+        """今日が休日なら翌日の 0:00、営業日ならNone"""
+        _, business, _ = self._day_info(now.date())
+        return None if business else next_midnight(now)
+
+    def next_wake(self, now: datetime) -> Optional[datetime]:
+        """now 以降でチェックを再開すべき時刻（今チェックが必要ならNone）"""
+        today, business, leaves = self._day_info(now.date())
+        if not business:
+            return self._next_day_start(now)
+
+        timeline = timeline_for(today, as_snapshot(self._config).time_rules, leaves)
+        zone = timeline.zone(now)
+        if zone == ZONE_CLOSED:
+            return self._next_day_start(now)
+        if zone == ZONE_LEAVE:
+            return timeline.next_transition(now) or self._next_day_start(now)
+        return None
@@ -1,20 +1,38 @@
 # schedulers/scheduler.py
+from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
-from typing import Callable
+from typing import Callable, Optional
+
+JOB_ID = "attendance_check"
 
 
 class AttendanceScheduler:
-    """APSchedulerによる定期実行管理"""
+    """APSchedulerによる定期実行管理
+
+    idle_interval_minutes を指定すると、非稼働中は低頻度のハートビートに
+    切り替えられる（set_idle）。稼働開始時は trigger_now() で即時チェックする。
+    打刻の必要がない時間帯は sleep_until() で次のチェックを指定時刻まで
+    止める（その間は trigger_now() も無視する）。
+    """
 
-    def __init__(self, interval_minutes: int, job_func: Callable):
+    def __init__(
+        self,
+        interval_minutes: int,
+        job_func: Callable,
+        idle_interval_minutes: Optional[int] = None,
+    ):
         self._interval = interval_minutes
+        self._idle_interval = idle_interval_minutes
+        self._idle = False
+        self._sleep_until: Optional[datetime] = None
         self._job_func = job_func
         self._scheduler = BackgroundScheduler()
         self._scheduler.add_job(
             self._job_func,
             trigger=IntervalTrigger(minutes=self._interval),
-            id="attendance_check",
+            id=JOB_ID,
             replace_existing=True,
         )
 
@@ -25,3 +43,44 @@ class AttendanceScheduler:
     def stop(self):
         """スケジューラ停止"""
         self._scheduler.shutdown(wait=False)
+
+    def add_daily_job(self, job_id: str, func: Callable, time_str: str):
+        """毎日 HH:MM に func を実行するジョブを追加"""
+        hour, minute = map(int, time_str.split(":"))
+        self._scheduler.add_job(
+            func,
+            trigger=CronTrigger(hour=hour, minute=minute),
+            id=job_id,
+            replace_existing=True,
+        )
+
+    def trigger_now(self):
+        """次回チェックを即時に前倒しする（同一ジョブなので多重実行はされない）"""
+        if self.sleeping():
+            return
+        self._scheduler.modify_job(JOB_ID, next_run_time=datetime.now())
+
+    def set_idle(self, idle: bool):
+        """非稼働中はハートビート間隔、稼働中は通常間隔に切り替える"""
+        if self._idle_interval is None or idle == self._idle:
+            return
+        self._idle = idle
+        self._reschedule()
+
+    def sleep_until(self, when: Optional[datetime]):
+        """when まで定期チェックを止める（None なら止めずに通常の間隔に戻す）"""
+        if when == self._sleep_until or (when is None and not self.sleeping()):
+            return
+        self._sleep_until = when
+        self._reschedule()
+
+    def sleeping(self) -> bool:
+        """sleep_until() で指定した時刻より前か"""
+        return self._sleep_until is not None and datetime.now() < self._sleep_until
+
+    def _reschedule(self):
+        minutes = self._idle_interval if self._idle else self._interval
+        start = self._sleep_until if self.sleeping() else None
+        self._scheduler.reschedule_job(
+            JOB_ID, trigger=IntervalTrigger(minutes=minutes, start_date=start)
+        )
@@ -0,0 +1,242 @@
+"""勤怠管理エージェント - サーバーモード
+
+1プロセスで複数ユーザーの打刻を行う。Chromium は1つだけ起動して
+ユーザーごとに BrowserContext を割り当て（BrowserPool）、同時に打刻する
+ユーザー数を server.max_concurrent_stamps で制限する。打刻状態は
+StateStore をユーザーごとに分けて（for_user）保存し、グラフと
+チェックポイントもユーザーごとに持つ。
+
+稼働判定は各PCの collector.py から届くハートビート（RemoteMonitor）で行う。
+休日判定は土日・祝日・会社休業日のみ（LocalCalendarService）で、個人の
+休暇（Google カレンダー）はユーザーごとのカレンダーに対応するまで判定しない。
+
+    python server.py
+"""
+import asyncio
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+
+import yaml
+
+from graph.check import run_graph_check
+from graph.checkpointer import LatestCheckpointSaver
+from graph.graph import build_graph
+
+
+@dataclass
+class UserAccount:
+    user_id: str     # 打刻状態・セッションのキー
+    user: str        # 勤怠システムのログインID
+    password: str
+
+
+def load_users(path: str) -> list[UserAccount]:
+    """ユーザー一覧（YAML）を読み込む
+
+    users:
+      - id: "tanaka"
+        user: "tanaka@example.com"
+        password_env: "ATTENDANCE_PASS_TANAKA"   # password を直接書いてもよい
+    """
+    with open(Path(path), "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+
+    accounts = []
+    for entry in data.get("users", []):
+        user_id = str(entry["id"])
+        password = entry.get("password")
+        if password is None:
+            password = os.getenv(entry.get("password_env", ""), "")
+        accounts.append(
+            UserAccount(user_id=user_id, user=entry.get("user", user_id), password=password)
+        )
+    return accounts
+
+
+class UserNotifier:
+    """共有の通知サービスにユーザー名を付けて送る"""
+
+    def __init__(self, notifier, user_id: str):
+        self._notifier = notifier
+        self._user_id = user_id
+
+    def send(self, message: str, coalesce_key: str = None):
+        if coalesce_key is not None:
+            coalesce_key = f"{self._user_id}:{coalesce_key}"
+        self._notifier.send(f"[{self._user_id}] {message}", coalesce_key=coalesce_key)
+
+    def send_error(self, message: str):
+        self._notifier.send_error(f"[{self._user_id}] {message}")
+
+
+@dataclass
+class UserAgent:
+    account: UserAccount
+    graph: object
+    store: object
+
+
+def create_user_agents(
+    accounts, config, pool, store, calendar_service, notifier, monitor_factory
+) -> list[UserAgent]:
+    """ユーザーごとの打刻サービス・打刻状態・コンパイル済みグラフを用意する"""
+    agents = []
+    for account in accounts:
+        user_store = store.for_user(account.user_id)
+        graph = build_graph(
+            monitor=monitor_factory(account.user_id),
+            calendar_service=calendar_service,
+            browser=pool.stamper(account.user_id, account.user, account.password),
+            notifier=UserNotifier(notifier, account.user_id),
+            config=config,
+            store=user_store,
+            checkpointer=LatestCheckpointSaver(),
+        )
+        agents.append(UserAgent(account=account, graph=graph, store=user_store))
+    return agents
+
+
+async def run_user_checks(agents: list[UserAgent], today_str: str, notifier=None) -> dict:
+    """全ユーザーのチェックを並行に実行し、ユーザーごとの実行後の状態を返す
+
+    打刻の同時実行数は BrowserPool の枠で制限される。1人のエラーで他の
+    ユーザーのチェックは止めない（エラーは notifier に送り、結果から除く）。
+    """
+    results = await asyncio.gather(
+        *(run_graph_check(agent.graph, agent.store, today_str) for agent in agents),
+        return_exceptions=True,
+    )
+    states = {}
+    for agent, result in zip(agents, results):
+        user_id = agent.account.user_id
+        if isinstance(result, Exception):
+            print(f"[サーバーモード] {user_id} のチェック中にエラー: {result}")
+            if notifier is not None:
+                notifier.send_error(f"[{user_id}] {result}")
+            continue
+        states[user_id] = result
+    return states
+
+
+def create_local_calendar_service(config: dict):
+    """全ユーザー共通の休日判定（土日・祝日・会社休業日）を生成
+
+    個人の休暇は判定しない（各ユーザーの Google カレンダーには対応していない）。
+    """
+    from services.google_calendar import LocalCalendarService
+
+    cal_config = config["calendar"]
+    return LocalCalendarService(
+        vacation_keywords=cal_config["vacation_keywords"],
+        company_closures=cal_config.get("company_closures", []),
+    )
+
+
+def main():
+    """サーバーモードの起動処理"""
+    from dotenv import load_dotenv
+
+    from main import create_notifier
+    from schedulers.scheduler import AttendanceScheduler
+    from services.async_runner import AsyncRunner
+    from services.browser_pool import BrowserPool
+    from services.config_loader import create_config_source, load_config
+    from services.heartbeat import HeartbeatReceiver, RemoteMonitor
+    from services.state_store import StateStore
+
+    load_dotenv()
+    config = load_config("config.yaml")
+    live_config = create_config_source(config, "config.yaml")
+    hb_config = config["heartbeat"]
+
+    # ハートビートの受信を最優先で開始
+    remote = RemoteMonitor(
+        retention_minutes=max(60, config["working_state"]["window_minutes"]),
+        secret=os.getenv("HEARTBEAT_SECRET", "").encode() or None,
+    )
+    receiver = HeartbeatReceiver(remote, host=hb_config["bind"], port=hb_config["port"])
+    receiver.start()
+    print(f"[サーバーモード] UDP {hb_config['bind']}:{hb_config['port']} でハートビートを受信します")
+
+    # Google カレンダーはサーバーの1つのトークン（の primary カレンダー）しか
+    # 読めず、その持ち主の休暇が全ユーザーの休日になってしまうため、
+    # ユーザーごとのカレンダーに対応するまでは祝日・会社休業日だけで判定する
+    calendar_service = create_local_calendar_service(config)
+    notifier = create_notifier(config)
+    if hasattr(notifier, "start"):
+        notifier.start()
+    store = StateStore.from_config(config.get("state_store", {}))
+    pool = BrowserPool.from_config(os.getenv("ATTENDANCE_URL", ""), config)
+    accounts = load_users(config["server"]["users_file"])
+    agents = create_user_agents(
+        accounts, live_config, pool, store, calendar_service, notifier, remote.for_user
+    )
+    print(f"[サーバーモード] {len(agents)}人分の打刻を担当します")
+
+    runner = AsyncRunner()
+    runner.start()
+
+    sleep_off_hours = config["scheduler"].get("sleep_off_hours", False)
+    dormant_on_holidays = config["scheduler"].get("dormant_on_holidays", False)
+    planner = None
+    if sleep_off_hours or dormant_on_holidays:
+        from schedulers.day_planner import DayPlanner
+        planner = DayPlanner(live_config, calendar_service, wake_daily=dormant_on_holidays)
+
+    def check_job():
+        try:
+            if dormant_on_holidays:
+                # 休日は全ユーザーのチェックを行わず、翌日の 0:00 まで休眠する
+                wake = planner.dormant_until(datetime.now())
+                if wake is not None:
+                    scheduler.sleep_until(wake)
+                    return
+            runner.run(run_user_checks(agents, date.today().isoformat(), notifier))
+            if sleep_off_hours:
+                scheduler.sleep_until(planner.next_wake(datetime.now()))
+        except Exception as e:
+            print(f"[サーバーモード] チェック中にエラー: {e}")
+            notifier.send_error(str(e))
+
+    scheduler = AttendanceScheduler(
+        interval_minutes=config["scheduler"]["check_interval_minutes"],
+        job_func=check_job,
+    )
+    if hasattr(notifier, "flush_digest"):
+        scheduler.add_daily_job(
+            "notify_digest", notifier.flush_digest, config["slack"]["digest"]["time"]
+        )
+    scheduler.start()
+    if hasattr(live_config, "start"):
+        live_config.subscribe(pool.apply_config)
+        live_config.start()
+
+    def shutdown(signum, frame):
+        print("\n[サーバーモード] 停止中...")
+        if hasattr(live_config, "stop"):
+            live_config.stop()
+        scheduler.stop()
+        receiver.stop()
+        runner.run(pool.close())
+        runner.stop()
+        if hasattr(notifier, "stop"):
+            notifier.stop()
+        store.close()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        shutdown(None, None)
+
+
+if __name__ == "__main__":
+    main()
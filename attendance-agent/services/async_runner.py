@@ -0,0 +1,46 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+
+class AsyncRunner:
+    """専用スレッド上で常駐するasyncioイベントループ
+
+    Playwrightのブラウザ/コンテキストは生成したループに紐づくため、
+    打刻やclose()はすべてこのループに投入して実行する。
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """ループ用スレッドを開始"""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="attendance-async", daemon=True
+        )
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """コルーチンをループに投入し、完了まで待って結果を返す"""
+        if self._loop is None:
+            raise RuntimeError("AsyncRunner が開始されていません")
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    def stop(self):
+        """ループを停止してスレッドを終了"""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
@@ -1,66 +1,225 @@
 import asyncio
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
 
+from services.retry_policy import PermanentError, RetryPolicy
 from services.stamper_interface import StamperInterface, StampResult
 
+DEFAULT_TIMEOUTS = {
+    "navigation_ms": 15000,
+    "ready_ms": 10000,
+    "success_ms": 10000,
+}
+
+# 軽量プロファイルの既定値（browser.lean_profile で上書き可能）
+DEFAULT_LEAN_PROFILE = {
+    "enabled": False,
+    "block_resource_types": ["image", "media", "font"],
+    "allow_hosts": [],
+    "deny_hosts": [],
+    "launch_args": [
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-gpu",
+        "--mute-audio",
+        "--no-first-run",
+        "--blink-settings=imagesEnabled=false",
+    ],
+}
+
+
+async def launch_chromium(browser_config: dict):
+    """browser 設定に従って Chromium を起動し (playwright, browser) を返す"""
+    from playwright.async_api import async_playwright
+
+    lean = {**DEFAULT_LEAN_PROFILE, **browser_config.get("lean_profile", {})}
+    playwright = await async_playwright().start()
+    browser = await playwright.chromium.launch(
+        headless=browser_config["headless"],
+        args=lean["launch_args"] if lean["enabled"] else None,
+    )
+    return playwright, browser
+
+
+def _host_matches(host: str, patterns: list[str]) -> bool:
+    """ホスト名がパターン（完全一致またはサブドメイン）に一致するか"""
+    return any(host == p or host.endswith("." + p) for p in patterns)
+
 
 class AttendanceBrowser(StamperInterface):
-    """Playwrightで社内勤怠システムにアクセスし打刻する"""
+    """Playwrightで社内勤怠システムにアクセスし打刻する
 
-    def __init__(self, url: str, user: str, password: str, config: dict):
+    shared_browser（SharedChromium）を渡すと、自前でブラウザを起動せず
+    共有の Chromium 上に自分用の BrowserContext だけを作る（サーバーモード）。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        user: str,
+        password: str,
+        config: dict,
+        shared_browser=None,
+        session_storage_path: Optional[str] = None,
+    ):
         self._url = url
         self._user = user
         self._password = password
         self._config = config["browser"]
+        self._shared_browser = shared_browser
+        self._session_path = session_storage_path or self._config["session_storage_path"]
         self._selectors = self._config["selectors"]
+        # "selector": 対象要素の表示を待つ / "networkidle": 通信が落ち着くまで待つ
+        self._wait_strategy = self._config.get("wait_strategy", "selector")
+        self._timeouts = {**DEFAULT_TIMEOUTS, **self._config.get("timeouts", {})}
+        self._retry = RetryPolicy.from_config(
+            self._config["retry_count"], self._config.get("retry", {})
+        )
+        self._lean = {**DEFAULT_LEAN_PROFILE, **self._config.get("lean_profile", {})}
+        # allow_hosts 未指定時は勤怠システム（とログインURL）のホストのみ許可
+        self._allow_hosts = list(self._lean["allow_hosts"]) or [
+            host
+            for host in (
+                urlparse(self._url).hostname,
+                urlparse(self._selectors.get("login_url", "")).hostname,
+            )
+            if host
+        ]
         self._playwright = None
         self._browser = None
         self._context = None
+        # ログイン済みで勤怠画面を開いたまま待機させるページ
+        self._warm_enabled = self._config.get("warm_page", {}).get("enabled", False)
+        self._warm_page = None
+        self._rewarm_task = None
 
-    async def _get_page(self):
-        """ブラウザページを取得（セッション再利用）"""
-        if self._browser is None:
-            from playwright.async_api import async_playwright
+    def apply_config(self, config):
+        """再読み込みした設定のセレクタ・待機方法・タイムアウトを次の打刻から使う
 
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.launch(
-                headless=self._config["headless"]
-            )
+        ブラウザの起動オプションや軽量プロファイルは起動時の設定のまま。
+        """
+        browser_config = config["browser"]
+        self._selectors = dict(browser_config["selectors"])
+        self._wait_strategy = browser_config.get("wait_strategy", "selector")
+        self._timeouts = {**DEFAULT_TIMEOUTS, **browser_config.get("timeouts", {})}
 
-            storage_path = Path(self._config["session_storage_path"])
-            if storage_path.exists():
-                self._context = await self._browser.new_context(
-                    storage_state=str(storage_path)
-                )
+    async def _get_page(self):
+        """ブラウザページを取得（セッション再利用）"""
+        if self._context is None:
+            if self._shared_browser is not None:
+                browser = await self._shared_browser.get()
             else:
-                self._context = await self._browser.new_context()
+                browser = await self._launch()
+            self._context = await self._new_context(browser)
 
         page = await self._context.new_page()
         return page
 
+    async def _launch(self):
+        """専用のブラウザを起動する（初回のみ）"""
+        if self._browser is None:
+            self._playwright, self._browser = await launch_chromium(self._config)
+        return self._browser
+
+    async def _new_context(self, browser):
+        """保存済みセッションを読み込んだ BrowserContext を作る"""
+        lean = self._lean["enabled"]
+        context_options = {}
+        storage_path = Path(self._session_path)
+        if storage_path.exists():
+            context_options["storage_state"] = str(storage_path)
+        if lean:
+            context_options["service_workers"] = "block"
+        context = await browser.new_context(**context_options)
+        if lean:
+            await context.route("**/*", self._route_request)
+        return context
+
+    def _should_block(self, resource_type: str, url: str) -> bool:
+        """軽量プロファイルでリクエストを遮断するか判定する"""
+        if resource_type in self._lean["block_resource_types"]:
+            return True
+        host = urlparse(url).hostname or ""
+        if not host:
+            return False  # data: / blob: など
+        if _host_matches(host, self._lean["deny_hosts"]):
+            return True
+        return not _host_matches(host, self._allow_hosts)
+
+    async def _route_request(self, route):
+        """軽量プロファイルのリクエストルーティング"""
+        request = route.request
+        if self._should_block(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
     async def _save_session(self):
         """セッション状態を保存"""
         if self._context:
-            storage_path = self._config["session_storage_path"]
-            Path(storage_path).parent.mkdir(parents=True, exist_ok=True)
-            await self._context.storage_state(path=storage_path)
+            Path(self._session_path).parent.mkdir(parents=True, exist_ok=True)
+            await self._context.storage_state(path=self._session_path)
+
+    async def _wait_ready(self, page, selector: str, timeout_key: str):
+        """ページの準備完了を待つ
+
+        解析ビーコンやポーリングで通信が途切れない環境では networkidle が
+        成立しないため、既定では操作対象の要素が表示されるまでを待つ。
+        表示された要素を返す（networkidle の場合はクエリ結果）。
+        """
+        timeout = self._timeouts[timeout_key]
+        if self._wait_strategy == "networkidle":
+            await page.wait_for_load_state("networkidle", timeout=timeout)
+            return await page.query_selector(selector)
+        return await page.wait_for_selector(selector, state="visible", timeout=timeout)
 
     async def ensure_logged_in(self, page) -> bool:
-        """ログイン状態を確認し、必要ならログインする"""
+        """ログイン状態を確認し、必要ならログインする（打刻ボタンはどちらでもよい）"""
         try:
-            await page.goto(self._url)
-            await page.wait_for_load_state("networkidle")
-            if "login" in page.url.lower():
-                await page.fill(self._selectors["username_field"], self._user)
-                await page.fill(self._selectors["password_field"], self._password)
-                await page.click(self._selectors["login_button"])
-                await page.wait_for_load_state("networkidle")
-                await self._save_session()
+            await self._login(page)
             return True
         except Exception:
             return False
 
+    async def _login(self, page, button_selector: Optional[str] = None):
+        """勤怠画面を開き、必要ならログインする（失敗時は例外）
+
+        button_selector（これから押す打刻ボタン）が表示されるまでを準備完了と
+        する。省略時は出勤・退勤どちらかのボタンが表示されればよい。
+        """
+        if button_selector is None:
+            button_selector = (
+                f"{self._selectors['clock_in_button']}, "
+                f"{self._selectors['clock_out_button']}"
+            )
+        await page.goto(
+            self._url,
+            wait_until="domcontentloaded",
+            timeout=self._timeouts["navigation_ms"],
+        )
+        # 勤怠画面かログイン画面のどちらかが表示されるまで待つ
+        await self._wait_ready(
+            page,
+            f"{button_selector}, {self._selectors['username_field']}",
+            "ready_ms",
+        )
+        if "login" in page.url.lower():
+            await page.fill(self._selectors["username_field"], self._user)
+            await page.fill(self._selectors["password_field"], self._password)
+            await page.click(self._selectors["login_button"])
+            try:
+                await self._wait_ready(page, button_selector, "ready_ms")
+            except Exception:
+                if "login" in page.url.lower():
+                    raise PermanentError("ログインが拒否されました")
+                raise
+            await self._save_session()
+
     async def clock_in(self) -> StampResult:
         """出勤打刻"""
         return await self._stamp(self._selectors["clock_in_button"], "clock_in")
@@ -69,39 +228,125 @@ class AttendanceBrowser(StamperInterface):
         """退勤打刻"""
         return await self._stamp(self._selectors["clock_out_button"], "clock_out")
 
+    async def warm_up(self) -> bool:
+        """ログイン済みの勤怠画面を開いたページを用意しておく
+
+        打刻時はボタンのクリックと成功確認のみで済むようになる。
+        セッション切れに備え、打刻時間帯の前に定期的に呼び直す。
+        """
+        if self._warm_page is not None:
+            page, self._warm_page = self._warm_page, None
+            await page.close()
+
+        page = await self._get_page()
+        if not await self.ensure_logged_in(page):
+            await page.close()
+            return False
+        self._warm_page = page
+        return True
+
+    def _take_warm_page(self):
+        """ウォームページを取り出す（無い・閉じている場合はNone）"""
+        page, self._warm_page = self._warm_page, None
+        if page is None or page.is_closed():
+            return None
+        return page
+
+    async def _rewarm(self, page):
+        """打刻に使ったページを勤怠画面に戻して次回用に待機させる"""
+        try:
+            if await self.ensure_logged_in(page) and self._warm_page is None:
+                self._warm_page = page
+                return
+        except Exception:
+            pass
+        await page.close()
+
     async def _stamp(self, button_selector: str, action: str) -> StampResult:
-        """打刻実行（リトライ付き）"""
-        retry_count = self._config["retry_count"]
-        last_error = None
+        """打刻実行（RetryPolicyによるリトライ付き）"""
 
-        for attempt in range(retry_count):
-            page = None
-            try:
-                page = await self._get_page()
-                await self.ensure_logged_in(page)
-                await page.click(button_selector)
-                await page.wait_for_load_state("networkidle")
+        async def attempt(n: int):
+            return await self._attempt_stamp(button_selector, use_warm=(n == 1))
+
+        outcome = await self._retry.run(attempt)
+        if not outcome.success:
+            return StampResult(
+                success=False,
+                timestamp="",
+                error=str(outcome.error),
+                elapsed_ms=outcome.elapsed_ms,
+                attempts=outcome.attempts,
+            )
+
+        timestamp, warm = outcome.value
+        print(
+            f"[AttendanceBrowser] {action} {'warm' if warm else 'cold'} "
+            f"{outcome.elapsed_ms:.0f}ms ({outcome.attempts}回目)"
+        )
+        return StampResult(
+            success=True,
+            timestamp=timestamp,
+            error=None,
+            elapsed_ms=outcome.elapsed_ms,
+            warm=warm,
+            attempts=outcome.attempts,
+        )
 
-                success_el = await page.query_selector(
-                    self._selectors["success_message"]
+    async def _attempt_stamp(self, button_selector: str, use_warm: bool):
+        """1回分の打刻。成功時は (打刻時刻, ウォームページ使用有無) を返す"""
+        page = self._take_warm_page() if use_warm else None
+        warm = page is not None
+        succeeded = False
+        try:
+            if warm and await page.query_selector(button_selector) is None:
+                # セッション切れなどで古くなったウォームページは捨て、開き直す
+                await page.close()
+                page, warm = None, False
+            if page is None:
+                page = await self._get_page()
+                await self._login(page, button_selector)
+            if await page.query_selector(button_selector) is None:
+                raise PermanentError(f"打刻ボタンが見つかりません: {button_selector}")
+            await page.click(button_selector)
+            # クリック後の失敗は打刻済みの可能性があるため再試行しない（二重打刻の防止）
+            try:
+                success_el = await self._wait_ready(
+                    page, self._selectors["success_message"], "success_ms"
                 )
-                if success_el:
-                    timestamp = datetime.now().strftime("%H:%M")
-                    await self._save_session()
-                    return StampResult(success=True, timestamp=timestamp, error=None)
-                else:
-                    last_error = "打刻確認メッセージが見つかりません"
             except Exception as e:
-                last_error = str(e)
-            finally:
-                if page:
+                raise PermanentError(f"打刻後の確認メッセージを待てませんでした: {e}") from e
+            if not success_el:
+                raise PermanentError("打刻確認メッセージが見つかりません")
+            succeeded = True
+            timestamp = datetime.now().strftime("%H:%M")
+            await self._save_session()
+            return timestamp, warm
+        finally:
+            if page:
+                if succeeded and self._warm_enabled:
+                    self._rewarm_task = asyncio.ensure_future(self._rewarm(page))
+                else:
                     await page.close()
 
-        return StampResult(success=False, timestamp="", error=last_error)
+    async def release(self):
+        """BrowserContext を閉じる（ブラウザは残し、次の打刻で作り直す）
+
+        セッションは session_storage_path に保存済みなので、作り直した
+        コンテキストでもログイン状態は引き継がれる。
+        """
+        if self._rewarm_task is not None and not self._rewarm_task.done():
+            self._rewarm_task.cancel()
+        self._warm_page = None
+        if self._context is not None:
+            context, self._context = self._context, None
+            await context.close()
 
     async def close(self):
-        """ブラウザを閉じる"""
+        """ブラウザを閉じる（共有ブラウザの場合は自分のコンテキストのみ）"""
+        await self.release()
         if self._browser:
             await self._browser.close()
+            self._browser = None
         if self._playwright:
             await self._playwright.stop()
+            self._playwright = None
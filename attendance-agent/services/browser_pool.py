@@ -0,0 +1,147 @@
+import asyncio
+import re
+from pathlib import Path
+
+from services.attendance_browser import AttendanceBrowser, launch_chromium
+from services.stamper_interface import StamperInterface, StampResult
+
+DEFAULT_SERVER_CONFIG = {
+    "max_concurrent_stamps": 8,
+    "session_dir": ".sessions",
+}
+
+
+class SharedChromium:
+    """複数ユーザーの打刻で共有する Chromium（サーバーモード用）
+
+    最初に get() されたときに1回だけ起動する。AttendanceBrowser はこの上に
+    ユーザーごとの BrowserContext を作るため、Cookie やストレージは
+    ユーザー間で分離されたまま、ブラウザプロセスは1組で済む。
+    """
+
+    def __init__(self, browser_config: dict):
+        self._config = browser_config
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        """起動済みのブラウザを返す（未起動・切断済みなら起動する）"""
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                await self._close_locked()
+                self._playwright, self._browser = await launch_chromium(self._config)
+            return self._browser
+
+    async def close(self):
+        async with self._lock:
+            await self._close_locked()
+
+    async def _close_locked(self):
+        if self._browser is not None:
+            browser, self._browser = self._browser, None
+            try:
+                await browser.close()
+            except Exception:
+                pass  # 切断済み
+        if self._playwright is not None:
+            playwright, self._playwright = self._playwright, None
+            await playwright.stop()
+
+
+class BrowserPool:
+    """1つの Chromium 上でユーザーごとに打刻するプール（サーバーモード用）
+
+    同時に打刻するユーザー数を max_concurrent_stamps で制限し、打刻が
+    終わったユーザーの BrowserContext はその場で閉じる。セッションは
+    session_dir/<ユーザー>.json に保存されるので次回もログイン済みで始まり、
+    開いているコンテキスト数は常に max_concurrent_stamps 以下になる
+    （メモリ使用量がユーザー数に比例しない）。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        config: dict,
+        max_concurrent_stamps: int = 8,
+        session_dir: str = ".sessions",
+    ):
+        self._url = url
+        self._config = config
+        self._session_dir = Path(session_dir)
+        self._chromium = SharedChromium(config["browser"])
+        self._slots = asyncio.Semaphore(max(1, max_concurrent_stamps))
+        self._stampers: dict[str, "PooledStamper"] = {}
+
+    @classmethod
+    def from_config(cls, url: str, config: dict) -> "BrowserPool":
+        """config.yaml の server セクションから生成"""
+        server = {**DEFAULT_SERVER_CONFIG, **config.get("server", {})}
+        return cls(
+            url=url,
+            config=config,
+            max_concurrent_stamps=server["max_concurrent_stamps"],
+            session_dir=server["session_dir"],
+        )
+
+    def session_path(self, user_id: str) -> str:
+        """ユーザーのセッション保存先（ファイル名に使えない文字は置き換える）"""
+        safe = re.sub(r"[^A-Za-z0-9_.@-]", "_", user_id)
+        return str(self._session_dir / f"{safe}.json")
+
+    def stamper(self, user_id: str, user: str, password: str) -> "PooledStamper":
+        """ユーザー用の打刻サービスを返す（ユーザーごとに1つ）"""
+        stamper = self._stampers.get(user_id)
+        if stamper is None:
+            browser = AttendanceBrowser(
+                url=self._url,
+                user=user,
+                password=password,
+                config=self._config,
+                shared_browser=self._chromium,
+                session_storage_path=self.session_path(user_id),
+            )
+            stamper = PooledStamper(browser, self._slots)
+            self._stampers[user_id] = stamper
+        return stamper
+
+    def apply_config(self, config):
+        """再読み込みした設定（セレクタなど）を全ユーザーの打刻に反映する"""
+        for stamper in self._stampers.values():
+            stamper.browser.apply_config(config)
+
+    async def close(self):
+        """全ユーザーのコンテキストと共有ブラウザを閉じる"""
+        for stamper in self._stampers.values():
+            await stamper.close()
+        await self._chromium.close()
+
+
+class PooledStamper(StamperInterface):
+    """プールの同時実行枠を取ってから打刻し、終わったらコンテキストを閉じる"""
+
+    def __init__(self, browser: AttendanceBrowser, slots: asyncio.Semaphore):
+        self._browser = browser
+        self._slots = slots
+
+    @property
+    def browser(self) -> AttendanceBrowser:
+        return self._browser
+
+    async def _run(self, action: str) -> StampResult:
+        async with self._slots:
+            try:
+                return await getattr(self._browser, action)()
+            finally:
+                await self._browser.release()
+
+    async def clock_in(self) -> StampResult:
+        """出勤打刻"""
+        return await self._run("clock_in")
+
+    async def clock_out(self) -> StampResult:
+        """退勤打刻"""
+        return await self._run("clock_out")
+
+    async def close(self) -> None:
+        await self._browser.close()
@@ -0,0 +1,184 @@
+import calendar
+import threading
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+# 日種別（年間テーブルの値）
+BUSINESS_DAY = 0
+WEEKEND = 1
+NATIONAL_HOLIDAY = 2
+COMPANY_CLOSURE = 3
+
+# 保持する年間テーブルの最大数（年跨ぎの範囲検索に前後の年を使う）
+MAX_YEARS = 3
+
+_WEEKDAY_NAMES = {5: "土曜日", 6: "日曜日"}
+
+
+def _parse_closure_day(value: str) -> tuple[Optional[int], int, int]:
+    """"MM-DD"（毎年）または "YYYY-MM-DD"（その年のみ）を (年, 月, 日) に変換"""
+    parts = [int(p) for p in str(value).split("-")]
+    if len(parts) == 2:
+        # 毎年の指定は閏年で検証する（"02-29" は許可し、平年は 02-28 に丸める）
+        date(2000, parts[0], parts[1])
+        return None, parts[0], parts[1]
+    if len(parts) == 3:
+        date(parts[0], parts[1], parts[2])
+        return parts[0], parts[1], parts[2]
+    raise ValueError(f"休業日の形式が不正です: {value}")
+
+
+def _yearly_date(year: int, month: int, day: int) -> date:
+    """毎年の "MM-DD" を指定年の日付にする（平年の 02-29 は 02-28）"""
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+class YearTable:
+    """1年分の日種別を通日（1月1日=0）で引ける表"""
+
+    def __init__(self, year: int, kinds: bytearray, names: dict[int, str]):
+        self.year = year
+        self.kinds = kinds
+        self.names = names      # 祝日・休業日の名称（通日→名称）
+
+    def index(self, target_date: date) -> int:
+        return target_date.timetuple().tm_yday - 1
+
+    def reason(self, index: int) -> str:
+        kind = self.kinds[index]
+        if kind == BUSINESS_DAY:
+            return ""
+        if kind == WEEKEND:
+            day = date(self.year, 1, 1) + timedelta(days=index)
+            return _WEEKDAY_NAMES[day.weekday()]
+        return self.names.get(index, "")
+
+
+class BusinessCalendar:
+    """土日・祝日(jpholiday)・会社休業日を年単位で事前計算した営業日カレンダー
+
+    年間テーブルは初回参照時に生成し、年が変われば新しい年の表を
+    自動で生成する（古い年の表は MAX_YEARS を超えたら破棄）。
+
+    company_closures の各要素は {"name", "start", "end"} で、日付は
+    "MM-DD"（毎年）または "YYYY-MM-DD"（その年のみ）。"12-29"〜"01-03"
+    のように年を跨ぐ指定は、各年の該当部分を休業日とする。
+    """
+
+    def __init__(self, company_closures: list[dict] = None):
+        self._closures = [
+            (
+                closure.get("name", "会社休業日"),
+                _parse_closure_day(closure["start"]),
+                _parse_closure_day(closure.get("end", closure["start"])),
+            )
+            for closure in company_closures or []
+        ]
+        self._tables: dict[int, YearTable] = {}
+        self._lock = threading.Lock()
+
+    def table(self, year: int) -> YearTable:
+        """指定年の表を返す（未生成なら生成する）"""
+        table = self._tables.get(year)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(year)
+                if table is None:
+                    table = self._build(year)
+                    self._tables[year] = table
+                    while len(self._tables) > MAX_YEARS:
+                        # 現在の年から最も遠い年を捨てる
+                        del self._tables[max(self._tables, key=lambda y: abs(y - year))]
+        return table
+
+    def _build(self, year: int) -> YearTable:
+        # 起動を速くするため初回生成時にimport
+        import jpholiday
+
+        first = date(year, 1, 1)
+        size = 366 if calendar.isleap(year) else 365
+        kinds = bytearray(size)
+        names: dict[int, str] = {}
+
+        for index in range(size):
+            day = first + timedelta(days=index)
+            if day.weekday() >= 5:
+                kinds[index] = WEEKEND
+                continue
+            holiday_name = jpholiday.is_holiday_name(day)
+            if holiday_name:
+                kinds[index] = NATIONAL_HOLIDAY
+                names[index] = holiday_name
+
+        for name, start, end in self._closures:
+            for index in self._closure_indexes(year, start, end):
+                if kinds[index] == BUSINESS_DAY:
+                    kinds[index] = COMPANY_CLOSURE
+                    names[index] = name
+
+        return YearTable(year, kinds, names)
+
+    @staticmethod
+    def _closure_indexes(year: int, start, end) -> Iterable[int]:
+        """休業期間のうち指定年に含まれる通日の一覧"""
+        start_year, start_month, start_day = start
+        end_year, end_month, end_day = end
+        if start_year is not None or end_year is not None:
+            # 年指定あり（片方のみの指定は同じ年とみなす）
+            first = date(start_year or end_year, start_month, start_day)
+            last = date(end_year or start_year, end_month, end_day)
+        else:
+            first = _yearly_date(year, start_month, start_day)
+            last = _yearly_date(year, end_month, end_day)
+            if last < first:
+                # 年跨ぎ: 年初の部分と年末の部分
+                head = (date(year, 1, 1), last)
+                tail = (first, date(year, 12, 31))
+                return [
+                    i
+                    for lo, hi in (head, tail)
+                    for i in range(lo.timetuple().tm_yday - 1, hi.timetuple().tm_yday)
+                ]
+        first = max(first, date(year, 1, 1))
+        last = min(last, date(year, 12, 31))
+        if last < first:
+            return range(0)
+        return range(first.timetuple().tm_yday - 1, last.timetuple().tm_yday)
+
+    def is_holiday(self, target_date: date) -> tuple[bool, str]:
+        """休日かどうかと理由を返す（O(1)）"""
+        table = self.table(target_date.year)
+        index = table.index(target_date)
+        if table.kinds[index] == BUSINESS_DAY:
+            return (False, "")
+        return (True, table.reason(index))
+
+    def is_business_day(self, target_date: date) -> bool:
+        table = self.table(target_date.year)
+        return table.kinds[table.index(target_date)] == BUSINESS_DAY
+
+    def next_business_day(self, target_date: date) -> date:
+        """target_date より後の最初の営業日"""
+        day = target_date + timedelta(days=1)
+        for year in range(day.year, day.year + 2):
+            table = self.table(year)
+            start = table.index(day) if year == day.year else 0
+            found = table.kinds.find(BUSINESS_DAY, start)
+            if found >= 0:
+                return date(year, 1, 1) + timedelta(days=found)
+        raise ValueError(f"{target_date} 以降2年以内に営業日がありません")
+
+    def business_days_between(self, start: date, end: date) -> int:
+        """start から end まで（両端を含む）の営業日数"""
+        total = 0
+        for year in range(start.year, end.year + 1):
+            table = self.table(year)
+            lo = table.index(start) if year == start.year else 0
+            hi = table.index(end) + 1 if year == end.year else len(table.kinds)
+            total += table.kinds.count(BUSINESS_DAY, lo, hi)
+        return total
+
+    def business_days_in_month(self, year: int, month: int) -> int:
+        """指定月の営業日数"""
+        last_day = calendar.monthrange(year, month)[1]
+        return self.business_days_between(date(year, month, 1), date(year, month, last_day))
@@ -1,22 +1,68 @@
-import yaml
+import copy
+import re
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Union
+
+import yaml
 
 DEFAULT_CONFIG = {
     "scheduler": {
         "check_interval_minutes": 5,
+        "event_driven": False,
+        "idle_heartbeat_minutes": 30,
+        "sleep_off_hours": False,
+        "dormant_on_holidays": False,
+        "pause_monitor_when_dormant": False,
     },
     "working_state": {
         "window_minutes": 15,
         "min_event_count": 2,
+        "bucket_seconds": 1,
     },
     "time_rules": {
         "clock_out_time": "18:00",
         "cutoff_time": "22:00",
+        "clock_out_strategy": "every_check",
+        "min_restamp_minutes": 30,
+        "final_margin_minutes": 10,
     },
     "browser": {
         "headless": True,
         "retry_count": 3,
+        "retry": {
+            "base_delay_seconds": 2.0,
+            "max_delay_seconds": 30.0,
+            "jitter": 0.5,
+            "deadline_seconds": 120,
+        },
         "session_storage_path": ".session",
+        "wait_strategy": "selector",
+        "timeouts": {
+            "navigation_ms": 15000,
+            "ready_ms": 10000,
+            "success_ms": 10000,
+        },
+        "lean_profile": {
+            "enabled": False,
+            "block_resource_types": ["image", "media", "font"],
+            "allow_hosts": [],
+            "deny_hosts": [],
+        },
+        "http": {
+            "login_path": "/login",
+            "clock_in_path": "/stamp?kind=in",
+            "clock_out_path": "/stamp?kind=out",
+            "username_param": "username",
+            "password_param": "password",
+            "success_text": "",
+            "timeout_seconds": 10,
+        },
+        "warm_page": {
+            "enabled": False,
+            "refresh_times": ["08:30", "17:50"],
+        },
         "selectors": {
             "login_url": "",
             "username_field": "#username",
@@ -31,24 +77,75 @@ DEFAULT_CONFIG = {
         "enabled": True,
         "notify_channel": "",
         "fallback": "console",
+        "coalesce_window_minutes": 30,
+        "digest": {
+            "enabled": False,
+            "time": "22:05",
+        },
+        "queue": {
+            "enabled": False,
+            "spool_path": ".notify_spool.jsonl",
+            "max_attempts": 5,
+            "base_delay_seconds": 2.0,
+            "max_delay_seconds": 60.0,
+            "max_queue": 100,
+        },
     },
     "calendar": {
         "enabled": True,
         "fallback": "jpholiday",
         "holiday_calendar_id": "ja.japanese#holiday@group.v.calendar.google.com",
         "vacation_keywords": ["有給", "年休", "休暇"],
+        "leave_categories": {
+            "full_day": ["特別休暇", "慶弔", "振休", "代休"],
+            "am_off": ["午前休", "午前半休", "AM休"],
+            "pm_off": ["午後休", "午後半休", "PM休"],
+            "half_day": ["半休", "半日休"],
+        },
+        "match_fields": ["summary", "description", "location"],
+        "half_day_boundary": "13:00",
+        "prefetch_days": 60,
+        "sync_interval_hours": 24,
+        "cache": {
+            "enabled": False,
+            "path": ".holiday_cache.db",
+            "ttl_hours": {
+                "google": 6,
+            },
+        },
+        "company_closures": [],
+    },
+    "state_store": {
+        "path": ".attendance_state.db",
+        "retention_days": 90,
+    },
+    "server": {
+        "users_file": "users.yaml",
+        "max_concurrent_stamps": 8,
+        "session_dir": ".sessions",
+    },
+    "config_reload": {
+        "enabled": False,
+        "interval_seconds": 5,
+    },
+    "heartbeat": {
+        "server": "127.0.0.1",
+        "bind": "127.0.0.1",
+        "port": 47800,
+        "redundancy_minutes": 15,
+        "interval_seconds": 60,
     },
 }
 
 
 def _deep_merge(base: dict, override: dict) -> dict:
-    """ベース設定にオーバーライドをマージする"""
-    result = base.copy()
+    """ベース設定にオーバーライドをマージする（base・override は変更しない）"""
+    result = copy.deepcopy(base)
     for key, value in override.items():
         if key in result and isinstance(result[key], dict) and isinstance(value, dict):
             result[key] = _deep_merge(result[key], value)
         else:
-            result[key] = value
+            result[key] = copy.deepcopy(value)
     return result
 
 
@@ -59,4 +156,192 @@ def load_config(path: str = "config.yaml") -> dict:
         with open(config_path, "r", encoding="utf-8") as f:
             user_config = yaml.safe_load(f) or {}
         return _deep_merge(DEFAULT_CONFIG, user_config)
-    return DEFAULT_CONFIG.copy()
+    return copy.deepcopy(DEFAULT_CONFIG)
+
+
+class ConfigError(ValueError):
+    """設定値が不正"""
+
+
+CLOCK_OUT_STRATEGIES = ("every_check", "min_interval", "final_idle")
+_TIME_RE = re.compile(r"^([01]?\d|2[0-3]):[0-5]\d$|^24:00$")
+
+
+def _positive_int(section: str, values: dict, key: str, minimum: int = 1) -> int:
+    value = values[key]
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise ConfigError(f"{section}.{key} は{minimum}以上の整数を指定してください: {value!r}")
+    return value
+
+
+def _time_str(section: str, values: dict, key: str) -> str:
+    value = values[key]
+    if not isinstance(value, str) or not _TIME_RE.match(value):
+        raise ConfigError(f"{section}.{key} は HH:MM 形式で指定してください: {value!r}")
+    return value
+
+
+def _minutes(time_str: str) -> int:
+    h, m = map(int, time_str.split(":"))
+    return h * 60 + m
+
+
+@dataclass(frozen=True, slots=True)
+class SchedulerConfig:
+    check_interval_minutes: int
+    event_driven: bool
+    idle_heartbeat_minutes: int
+    sleep_off_hours: bool
+    dormant_on_holidays: bool
+    pause_monitor_when_dormant: bool
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "SchedulerConfig":
+        values = {**DEFAULT_CONFIG["scheduler"], **values}
+        return cls(
+            check_interval_minutes=_positive_int("scheduler", values, "check_interval_minutes"),
+            event_driven=bool(values["event_driven"]),
+            idle_heartbeat_minutes=_positive_int("scheduler", values, "idle_heartbeat_minutes"),
+            sleep_off_hours=bool(values["sleep_off_hours"]),
+            dormant_on_holidays=bool(values["dormant_on_holidays"]),
+            pause_monitor_when_dormant=bool(values["pause_monitor_when_dormant"]),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class WorkingStateConfig:
+    window_minutes: int
+    min_event_count: int
+    bucket_seconds: int
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "WorkingStateConfig":
+        values = {**DEFAULT_CONFIG["working_state"], **values}
+        return cls(
+            window_minutes=_positive_int("working_state", values, "window_minutes"),
+            min_event_count=_positive_int("working_state", values, "min_event_count"),
+            bucket_seconds=_positive_int("working_state", values, "bucket_seconds"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TimeRulesConfig:
+    clock_out_time: str
+    cutoff_time: str
+    clock_out_strategy: str
+    min_restamp_minutes: int
+    final_margin_minutes: int
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "TimeRulesConfig":
+        values = {**DEFAULT_CONFIG["time_rules"], **values}
+        clock_out_time = _time_str("time_rules", values, "clock_out_time")
+        cutoff_time = _time_str("time_rules", values, "cutoff_time")
+        if _minutes(clock_out_time) >= _minutes(cutoff_time):
+            raise ConfigError(
+                f"time_rules.clock_out_time ({clock_out_time}) は "
+                f"cutoff_time ({cutoff_time}) より前にしてください"
+            )
+        strategy = values["clock_out_strategy"]
+        if strategy not in CLOCK_OUT_STRATEGIES:
+            raise ConfigError(
+                f"time_rules.clock_out_strategy は {', '.join(CLOCK_OUT_STRATEGIES)} "
+                f"のいずれかを指定してください: {strategy!r}"
+            )
+        return cls(
+            clock_out_time=clock_out_time,
+            cutoff_time=cutoff_time,
+            clock_out_strategy=strategy,
+            min_restamp_minutes=_positive_int("time_rules", values, "min_restamp_minutes", 0),
+            final_margin_minutes=_positive_int("time_rules", values, "final_margin_minutes", 0),
+        )
+
+
+def _freeze(value: Any) -> Any:
+    """dict・list を読み取り専用の MappingProxyType・tuple に変換する"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    """検証済みの設定のスナップショット（変更不可）
+
+    チェックの度に参照する scheduler・working_state・time_rules は型付きの
+    属性で、それ以外の設定（ブラウザのセレクタなど）は読み取り専用の
+    Mapping として sections から引く。作成時に1回だけ検証する。
+    """
+
+    scheduler: SchedulerConfig
+    working_state: WorkingStateConfig
+    time_rules: TimeRulesConfig
+    sections: Mapping[str, Any]
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "ConfigSnapshot":
+        """設定 dict（省略されたキーはデフォルト値）から作る。不正なら ConfigError"""
+        merged = _deep_merge(DEFAULT_CONFIG, config)
+        return cls(
+            scheduler=SchedulerConfig.from_dict(merged["scheduler"]),
+            working_state=WorkingStateConfig.from_dict(merged["working_state"]),
+            time_rules=TimeRulesConfig.from_dict(merged["time_rules"]),
+            sections=_freeze(merged),
+        )
+
+    def __getitem__(self, name: str):
+        """config["browser"] のように dict と同じ書き方で節を引く"""
+        return self.sections[name]
+
+
+# ノード・DayPlanner が設定として受け取れる型。ノードの config 引数には
+# 必ずこの型を注釈すること（注釈なしだと LangGraph が RunnableConfig を渡す）
+ConfigSource = Union[dict, ConfigSnapshot, "ConfigWatcher"]
+
+
+def load_snapshot(path: str = "config.yaml") -> ConfigSnapshot:
+    """YAML設定ファイルを検証済みの ConfigSnapshot として読み込む"""
+    return ConfigSnapshot.from_dict(load_config(path))
+
+
+def create_config_source(config: dict, path: str = "config.yaml") -> ConfigSource:
+    """グラフ・DayPlanner に渡す設定を用意する（起動時に1回だけ検証する）
+
+    config_reload.enabled なら path の変更を反映する ConfigWatcher
+    （start() は呼び出し側で行う）、そうでなければ固定の ConfigSnapshot。
+    """
+    snapshot = ConfigSnapshot.from_dict(config)
+    reload_config = config.get("config_reload", {})
+    if not reload_config.get("enabled"):
+        return snapshot
+    from services.config_watcher import ConfigWatcher
+
+    return ConfigWatcher(
+        path,
+        interval_seconds=reload_config.get("interval_seconds", 5),
+        snapshot=snapshot,
+    )
+
+
+_DEFAULT_SNAPSHOT: Optional[ConfigSnapshot] = None
+
+
+def as_snapshot(config: Optional[ConfigSource]) -> ConfigSnapshot:
+    """ノードなどが受け取った設定を ConfigSnapshot にそろえる
+
+    ConfigSnapshot はそのまま、ConfigWatcher など current を持つものは
+    その時点の最新スナップショットを、dict はデフォルトとマージして
+    検証したもの、None はデフォルト設定を返す。
+    """
+    global _DEFAULT_SNAPSHOT
+    if isinstance(config, ConfigSnapshot):
+        return config
+    if config is None:
+        if _DEFAULT_SNAPSHOT is None:
+            _DEFAULT_SNAPSHOT = ConfigSnapshot.from_dict({})
+        return _DEFAULT_SNAPSHOT
+    if isinstance(config, dict):
+        return ConfigSnapshot.from_dict(config)
+    return config.current
@@ -0,0 +1,89 @@
+import os
+import threading
+from typing import Callable, Optional
+
+import yaml
+
+from services.config_loader import ConfigError, ConfigSnapshot, load_snapshot
+
+
+class ConfigWatcher:
+    """config.yaml の更新を監視し、新しい ConfigSnapshot に差し替える
+
+    interval_seconds ごとにファイルの更新時刻（とサイズ）を確認し、変わって
+    いれば読み込み直す。検証に通った場合だけ current を丸ごと差し替える
+    ため、参照側は常にどちらか一方の完全なスナップショットを見る。
+    YAML の書きかけや不正な値のときは前のスナップショットを使い続ける。
+
+    グラフのノードには ConfigWatcher をそのまま設定として渡せる
+    （as_snapshot() がチェックの度に current を引く）。
+    """
+
+    def __init__(
+        self,
+        path: str = "config.yaml",
+        interval_seconds: float = 5,
+        snapshot: Optional[ConfigSnapshot] = None,
+    ):
+        self._path = path
+        self._interval = interval_seconds
+        self._stamp = self._stat()
+        # 起動時に読み込み済みなら snapshot を渡すと読み込み直さない
+        self._current = snapshot if snapshot is not None else load_snapshot(path)
+        self._listeners: list[Callable[[ConfigSnapshot], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def current(self) -> ConfigSnapshot:
+        """最新の検証済みスナップショット"""
+        return self._current
+
+    def subscribe(self, callback: Callable[[ConfigSnapshot], None]):
+        """差し替えの度に新しいスナップショットで callback を呼ぶ"""
+        self._listeners.append(callback)
+
+    def _stat(self) -> Optional[tuple[int, int]]:
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def check(self) -> bool:
+        """ファイルが更新されていれば読み込み直す（差し替えた場合はTrue）"""
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            snapshot = load_snapshot(self._path)
+        except (ConfigError, yaml.YAMLError, OSError) as e:
+            print(f"[ConfigWatcher] 設定を読み込めないため変更前の設定を使います: {e}")
+            return False
+        if snapshot == self._current:
+            return False
+        self._current = snapshot
+        print(f"[ConfigWatcher] {self._path} を読み込み直しました")
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"[ConfigWatcher] 設定の反映に失敗: {e}")
+        return True
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="config-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.check()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
@@ -1,45 +1,90 @@
 # services/google_calendar.py
-from datetime import date, datetime
+import threading
+import time
+from datetime import date, datetime, timedelta
 from typing import Optional
-import jpholiday
+
+from services.business_calendar import BusinessCalendar
+from services.holiday_cache import HolidayCache
+from services.keyword_matcher import FULL_DAY, KeywordMatcher
+
+# バックグラウンド初期化の完了を is_holiday で待つ最大秒数
+INIT_WAIT_SECONDS = 30
+# 先読み同期に失敗した場合、次に試行するまでの秒数
+SYNC_RETRY_SECONDS = 15 * 60
+
+
+def _monotonic() -> float:
+    """テスト時にモック可能な単調増加時刻取得（秒）"""
+    return time.monotonic()
+
+
+def _today() -> date:
+    """テスト時にモック可能な今日の日付"""
+    return date.today()
+
+
+def _event_dates(event: dict) -> list[date]:
+    """イベントが掛かる日付の一覧（終日イベントの終了日は含まない）"""
+    start, end = event.get("start", {}), event.get("end", {})
+    if "date" in start:
+        first = date.fromisoformat(start["date"])
+        last = date.fromisoformat(end.get("date", start["date"])) - timedelta(days=1)
+    elif "dateTime" in start:
+        start_dt = _parse_datetime(start["dateTime"])
+        end_dt = _parse_datetime(end.get("dateTime", start["dateTime"]))
+        first = start_dt.date()
+        # 0:00ちょうどに終わるイベントは前日までとみなす
+        last = max(start_dt, end_dt - timedelta(microseconds=1)).date()
+    else:
+        return []
+    days = max(0, (last - first).days)
+    return [first + timedelta(days=i) for i in range(days + 1)]
+
+
+def _hhmm(minutes: int) -> str:
+    """0:00からの分数を HH:MM に変換（終日の終端は 24:00）"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _parse_datetime(value: str) -> datetime:
+    """RFC3339の日時をローカルタイムゾーンのnaiveなdatetimeに変換"""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
 
 
 class LocalCalendarService:
-    """ローカル祝日データ(jpholiday)による判定サービス"""
+    """ローカル祝日データ(jpholiday)・会社休業日による判定サービス
+
+    判定は年単位で事前計算した営業日カレンダー（BusinessCalendar）を引く。
+    """
 
-    def __init__(self, vacation_keywords: list[str] = None):
+    # ローカル判定は失敗しない（GoogleCalendarService と同じ属性を持たせる）
+    last_lookup_failed = False
+
+    def __init__(
+        self,
+        vacation_keywords: list[str] = None,
+        company_closures: list[dict] = None,
+    ):
         self._vacation_keywords = vacation_keywords or ["有給", "年休", "休暇"]
-        self._cache: dict[date, tuple[bool, str]] = {}
+        self.business_calendar = BusinessCalendar(company_closures)
 
     def is_holiday(self, target_date: date = None) -> tuple[bool, str]:
-        """指定日が祝日かどうかを判定する"""
+        """指定日が休日（土日・祝日・会社休業日）かどうかを判定する"""
         if target_date is None:
             target_date = date.today()
-
-        if target_date in self._cache:
-            return self._cache[target_date]
-
-        # 土日チェック
-        if target_date.weekday() >= 5:
-            day_name = "土曜日" if target_date.weekday() == 5 else "日曜日"
-            result = (True, day_name)
-            self._cache[target_date] = result
-            return result
-
-        # 祝日チェック
-        holiday_name = jpholiday.is_holiday_name(target_date)
-        if holiday_name:
-            result = (True, holiday_name)
-            self._cache[target_date] = result
-            return result
-
-        result = (False, "")
-        self._cache[target_date] = result
-        return result
+        return self.business_calendar.is_holiday(target_date)
 
     def get_today_events(self) -> list[dict]:
         return []
 
+    def get_leave_intervals(self, target_date: date = None) -> list[dict]:
+        """ローカル判定では半休などの時間帯休暇は扱わない"""
+        return []
+
 
 class GoogleCalendarService:
     """Google Calendar APIによる祝日・有給判定サービス（フォールバック付き）"""
@@ -50,18 +95,60 @@ class GoogleCalendarService:
         token_path: str = "token.json",
         holiday_calendar_id: str = "",
         vacation_keywords: list[str] = None,
+        init_in_background: bool = False,
+        prefetch_days: int = 60,
+        sync_interval_hours: float = 24,
+        holiday_cache: Optional[HolidayCache] = None,
+        company_closures: list[dict] = None,
+        matcher: Optional[KeywordMatcher] = None,
+        half_day_boundary: str = "13:00",
     ):
         self._credentials_path = credentials_path
         self._token_path = token_path
         self._holiday_calendar_id = holiday_calendar_id
         self._vacation_keywords = vacation_keywords or ["有給", "年休", "休暇"]
+        self._matcher = matcher or KeywordMatcher({FULL_DAY: self._vacation_keywords})
         self._cache: dict[date, tuple[bool, str]] = {}
+        # 終日の午前休/午後休を区切る時刻（0:00からの分数）
+        hour, minute = map(int, half_day_boundary.split(":"))
+        self._half_day_boundary = hour * 60 + minute
+        # 直近に求めた1日分の休暇時間帯 (日付, 時間帯)
+        self._leave_day: Optional[tuple[date, list[dict]]] = None
         self._service = None
-        self._fallback = LocalCalendarService(self._vacation_keywords)
-        self._init_api()
+        self._holiday_cache = holiday_cache
+        self._fallback = LocalCalendarService(self._vacation_keywords, company_closures)
+        # 先読みした個人カレンダーのイベント（id→イベント）と日付→有給理由の索引
+        self._prefetch_days = prefetch_days
+        self._sync_interval = sync_interval_hours * 3600
+        self._events: dict[str, dict] = {}
+        self._vacation_index: dict[date, str] = {}
+        self._index_range: Optional[tuple[date, date]] = None
+        self._sync_token: Optional[str] = None
+        self._synced_at = float("-inf")
+        self._next_sync_attempt = float("-inf")
+        self._sync_lock = threading.Lock()
+        # ディスクキャッシュで答えた後に先読み索引を作るバックグラウンド同期
+        self._sync_thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        # 呼び出したスレッドごとの直近の判定がAPI失敗による暫定値か
+        self._lookup = threading.local()
+        if init_in_background:
+            # discoveryクライアントの構築で起動（PC監視開始）を待たせない
+            threading.Thread(
+                target=self._init_api, name="calendar-init", daemon=True
+            ).start()
+        else:
+            self._init_api()
 
     def _init_api(self):
         """Google Calendar APIを初期化（失敗時はフォールバックモード）"""
+        try:
+            self._build_service()
+        finally:
+            self._ready.set()
+
+    def _build_service(self):
+        """認証してdiscoveryクライアントを構築する"""
         try:
             from google.oauth2.credentials import Credentials
             from google_auth_oauthlib.flow import InstalledAppFlow
@@ -93,36 +180,179 @@ class GoogleCalendarService:
         except Exception:
             self._service = None  # フォールバックモード
 
+    @property
+    def last_lookup_failed(self) -> bool:
+        """このスレッドの直近の is_holiday / get_leave_intervals が
+        初期化待ちの打ち切りやAPI失敗による暫定値だったか"""
+        return getattr(self._lookup, "failed", False)
+
     def is_holiday(self, target_date: date = None) -> tuple[bool, str]:
         """祝日・有給判定（API失敗時はローカルフォールバック）"""
         if target_date is None:
             target_date = date.today()
+        self._lookup.failed = False
 
-        if target_date in self._cache:
-            return self._cache[target_date]
-
-        # まずローカル祝日チェック
+        # まずローカル祝日チェック（事前計算済みの表を引くだけなのでキャッシュしない）
         local_result = self._fallback.is_holiday(target_date)
         if local_result[0]:
-            self._cache[target_date] = local_result
             return local_result
 
-        # Google Calendar APIで有給チェック
+        if target_date in self._cache:
+            return self._cache[target_date]
+
+        # バックグラウンド初期化中なら完了を待つ。間に合わなければ
+        # ローカル判定のみ返し、結果はキャッシュしない
+        if not self._ready.wait(INIT_WAIT_SECONDS):
+            self._lookup.failed = True
+            return (False, "")
+
+        # Google Calendar APIで有給チェック（先読み範囲内は索引から答える）
         if self._service:
+            # 今回の起動でまだ同期していない日付はディスクキャッシュを優先する
+            # （先読み・差分同期はバックグラウンドで始め、以降は索引から答える）
+            if self._holiday_cache is not None and not self._covers(target_date):
+                cached = self._holiday_cache.get(target_date, "google")
+                if cached is not None:
+                    self._sync_in_background()
+                    return cached
             try:
                 result = self._check_google_calendar(target_date)
-                if result[0]:
-                    self._cache[target_date] = result
-                    return result
             except Exception:
-                pass
+                self._lookup.failed = True
+                return (False, "")
+            if not self._covers(target_date):
+                self._cache[target_date] = result
+            if self._holiday_cache is not None:
+                self._holiday_cache.put(target_date, "google", result)
+            return result
 
-        result = (False, "")
-        self._cache[target_date] = result
-        return result
+        return (False, "")
 
     def _check_google_calendar(self, target_date: date) -> tuple[bool, str]:
-        """Google Calendar APIで個人カレンダーの有給イベントをチェック"""
+        """個人カレンダーの有給イベントをチェック"""
+        if self._prefetch_days > 0:
+            self._ensure_synced(_today())
+            if self._covers(target_date):
+                reason = self._vacation_index.get(target_date)
+                return (True, reason) if reason else (False, "")
+        return self._query_single_date(target_date)
+
+    def _match_vacation(self, event: dict) -> Optional[str]:
+        """終日休のイベントなら理由（件名）を返す"""
+        match = self._matcher.match_event(event)
+        if match is None or match.category != FULL_DAY:
+            return None
+        return event.get("summary") or match.keyword
+
+    def _covers(self, target_date: date) -> bool:
+        return (
+            self._index_range is not None
+            and self._index_range[0] <= target_date <= self._index_range[1]
+        )
+
+    def _ensure_synced(self, today: date):
+        """先読み索引が古ければ同期する
+
+        先読み範囲の残りが半分を切ったら範囲を取り直し（全件取得）、
+        それ以外は同期トークンで差分のみ取得する。
+        """
+        with self._sync_lock:
+            now = _monotonic()
+            rolled = (
+                self._index_range is None
+                or today < self._index_range[0]
+                or (self._index_range[1] - today).days < self._prefetch_days // 2
+            )
+            if not rolled and now - self._synced_at < self._sync_interval:
+                return
+            if now < self._next_sync_attempt:
+                return
+            try:
+                if rolled or self._sync_token is None or not self._incremental_sync():
+                    self._full_sync(today)
+                self._synced_at = now
+            except Exception:
+                self._next_sync_attempt = now + SYNC_RETRY_SECONDS
+                raise
+
+    def _sync_in_background(self):
+        """先読み索引の同期をバックグラウンドで始める（実行中なら何もしない）"""
+        if self._prefetch_days <= 0:
+            return
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            return
+        self._sync_thread = threading.Thread(
+            target=self._background_sync, name="calendar-sync", daemon=True
+        )
+        self._sync_thread.start()
+
+    def _background_sync(self):
+        try:
+            self._ensure_synced(_today())
+        except Exception:
+            pass  # 失敗時は SYNC_RETRY_SECONDS 後の問い合わせで再試行
+
+    def _list_events(self, **params) -> tuple[list[dict], Optional[str]]:
+        """ページングしながらイベントを取得し、(イベント, nextSyncToken) を返す"""
+        items: list[dict] = []
+        page_token = None
+        while True:
+            response = (
+                self._service.events()
+                .list(calendarId="primary", singleEvents=True, pageToken=page_token, **params)
+                .execute()
+            )
+            items.extend(response.get("items", []))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return items, response.get("nextSyncToken")
+
+    def _full_sync(self, today: date):
+        """今日から prefetch_days 日分のイベントを一括取得して索引を作り直す"""
+        end = today + timedelta(days=self._prefetch_days)
+        items, sync_token = self._list_events(
+            timeMin=datetime.combine(today, datetime.min.time()).astimezone().isoformat(),
+            timeMax=datetime.combine(end, datetime.min.time()).astimezone().isoformat(),
+            maxResults=2500,
+        )
+        self._events = {
+            e["id"]: e for e in items if e.get("status") != "cancelled" and "id" in e
+        }
+        self._sync_token = sync_token
+        self._index_range = (today, end - timedelta(days=1))
+        self._rebuild_index()
+
+    def _incremental_sync(self) -> bool:
+        """同期トークンで差分を取得する（トークン失効時はFalse）"""
+        try:
+            items, sync_token = self._list_events(syncToken=self._sync_token)
+        except Exception as e:
+            if getattr(getattr(e, "resp", None), "status", None) == 410:
+                self._sync_token = None
+                return False
+            raise
+        for event in items:
+            if event.get("status") == "cancelled":
+                self._events.pop(event.get("id"), None)
+            elif "id" in event:
+                self._events[event["id"]] = event
+        self._sync_token = sync_token or self._sync_token
+        self._rebuild_index()
+        return True
+
+    def _rebuild_index(self):
+        self._leave_day = None
+        index: dict[date, str] = {}
+        for event in self._events.values():
+            reason = self._match_vacation(event)
+            if reason is None:
+                continue
+            for day in _event_dates(event):
+                index.setdefault(day, reason)
+        self._vacation_index = index
+
+    def _query_single_date(self, target_date: date) -> tuple[bool, str]:
+        """先読み範囲外の日付を1日分だけAPIで問い合わせる"""
         start = datetime.combine(target_date, datetime.min.time()).isoformat() + "Z"
         end = datetime.combine(target_date, datetime.max.time()).isoformat() + "Z"
 
@@ -133,25 +363,95 @@ class GoogleCalendarService:
         )
 
         for event in events_result.get("items", []):
-            summary = event.get("summary", "")
-            for keyword in self._vacation_keywords:
-                if keyword in summary:
-                    return (True, summary)
+            reason = self._match_vacation(event)
+            if reason is not None:
+                return (True, reason)
 
         return (False, "")
 
+    def _events_on(self, target: date) -> list[dict]:
+        """指定日に掛かるイベント（先読み範囲外はAPIで取得）"""
+        if self._covers(target):
+            return [e for e in self._events.values() if target in _event_dates(e)]
+        start = datetime.combine(target, datetime.min.time()).isoformat() + "Z"
+        end = datetime.combine(target, datetime.max.time()).isoformat() + "Z"
+        result = (
+            self._service.events()
+            .list(calendarId="primary", timeMin=start, timeMax=end, singleEvents=True)
+            .execute()
+        )
+        return result.get("items", [])
+
     def get_today_events(self) -> list[dict]:
         if not self._service:
             return []
         try:
-            target = date.today()
-            start = datetime.combine(target, datetime.min.time()).isoformat() + "Z"
-            end = datetime.combine(target, datetime.max.time()).isoformat() + "Z"
-            result = (
-                self._service.events()
-                .list(calendarId="primary", timeMin=start, timeMax=end, singleEvents=True)
-                .execute()
-            )
-            return result.get("items", [])
+            return self._events_on(_today())
         except Exception:
             return []
+
+    def get_leave_intervals(self, target_date: date = None) -> list[dict]:
+        """指定日の半休など時間帯のある休暇を開始時刻順に返す
+
+        各要素は {"start": "HH:MM", "end": "HH:MM", "category", "reason"}。
+        時刻指定のイベントはその時間帯（am_off は 0:00 から終了時刻まで）、
+        終日の am_off/pm_off は half_day_boundary で区切った午前/午後とする。終日休（full_day）は
+        is_holiday で扱うため含めない。結果は日付ごとに1回だけ求め、
+        同期で索引が更新されるまで使い回す。
+        """
+        if target_date is None:
+            target_date = _today()
+        self._lookup.failed = False
+        cached = self._leave_day
+        if cached is not None and cached[0] == target_date:
+            return cached[1]
+        if not self._ready.wait(INIT_WAIT_SECONDS):
+            self._lookup.failed = True
+            return []
+        if not self._service:
+            return []
+        try:
+            events = self._events_on(target_date)
+        except Exception:
+            self._lookup.failed = True
+            return []  # 取得失敗時はキャッシュせず次回再試行
+
+        intervals = []
+        for event in events:
+            interval = self._leave_interval(event, target_date)
+            if interval is not None:
+                intervals.append(interval)
+        intervals.sort(key=lambda i: (i["start"], i["end"]))
+        self._leave_day = (target_date, intervals)
+        return intervals
+
+    def _leave_interval(self, event: dict, target_date: date) -> Optional[dict]:
+        match = self._matcher.match_event(event)
+        if match is None or match.category == FULL_DAY:
+            return None
+        start, end = event.get("start", {}), event.get("end", {})
+        if "dateTime" in start:
+            day_start = datetime.combine(target_date, datetime.min.time())
+            start_dt = max(_parse_datetime(start["dateTime"]), day_start)
+            end_dt = min(
+                _parse_datetime(end.get("dateTime", start["dateTime"])),
+                day_start + timedelta(days=1),
+            )
+            if end_dt <= start_dt:
+                return None
+            first = int((start_dt - day_start).total_seconds() // 60)
+            last = int((end_dt - day_start).total_seconds() // 60)
+            if match.category == "am_off":
+                first = 0   # 午前休は始業前も含め、休暇が明けるまで出勤打刻しない
+        elif match.category == "am_off":
+            first, last = 0, self._half_day_boundary
+        elif match.category == "pm_off":
+            first, last = self._half_day_boundary, 24 * 60
+        else:
+            return None  # 午前/午後の区別がない終日の半休は時間帯を決められない
+        return {
+            "start": _hhmm(first),
+            "end": _hhmm(last),
+            "category": match.category,
+            "reason": event.get("summary") or match.keyword,
+        }
@@ -0,0 +1,344 @@
+import hashlib
+import hmac
+import ipaddress
+import socket
+import struct
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+# パケット: ヘッダ + ユーザーID(UTF-8) + 1分ごとの件数(1バイト/分) [+ 署名8バイト]
+#   magic(2) version(1) flags(1) seq(4) end_minute(4) minutes(1) user_id_len(1)
+# end_minute は最後の件数に対応するUNIX時刻の分（秒 // 60）。どのパケットも
+# 直近 redundancy_minutes 分を丸ごと載せるので、途中のパケットが落ちても
+# 次のパケットで埋まる。受信側は分ごとに大きい方の件数を採るため、
+# 重複・順序の入れ替わりがあっても結果は変わらない。
+MAGIC = b"KH"
+VERSION = 1
+FLAG_SIGNED = 0x01
+_HEADER = struct.Struct("!2sBBIIBB")
+TAG_SIZE = 8
+MAX_USER_ID_BYTES = 64
+MAX_MINUTES = 60
+DEFAULT_PORT = 47800
+
+
+class HeartbeatError(Exception):
+    """壊れた・署名の合わないハートビート"""
+
+
+@dataclass
+class Heartbeat:
+    user_id: str
+    seq: int
+    end_minute: int
+    counts: bytes     # 古い順の1分ごとの件数（最後が end_minute）
+
+
+def _now_minute() -> int:
+    """テスト時にモック可能な現在時刻（UNIX時刻の分）"""
+    return int(time.time()) // 60
+
+
+def _tag(secret: bytes, body: bytes) -> bytes:
+    return hmac.new(secret, body, hashlib.sha256).digest()[:TAG_SIZE]
+
+
+def encode_heartbeat(
+    user_id: str,
+    seq: int,
+    end_minute: int,
+    counts,
+    secret: Optional[bytes] = None,
+) -> bytes:
+    """ハートビートをパケットにする（件数は255で頭打ち）"""
+    uid = user_id.encode("utf-8")
+    if not uid or len(uid) > MAX_USER_ID_BYTES:
+        raise ValueError("user_id は1〜64バイトにしてください")
+    payload = bytes(min(255, max(0, c)) for c in counts[-MAX_MINUTES:])
+    body = (
+        _HEADER.pack(
+            MAGIC,
+            VERSION,
+            FLAG_SIGNED if secret else 0,
+            seq & 0xFFFFFFFF,
+            end_minute,
+            len(payload),
+            len(uid),
+        )
+        + uid
+        + payload
+    )
+    return body + _tag(secret, body) if secret else body
+
+
+def decode_heartbeat(data: bytes, secret: Optional[bytes] = None) -> Heartbeat:
+    """パケットを解釈する（secret 指定時は署名のないパケットを拒否）"""
+    if len(data) < _HEADER.size:
+        raise HeartbeatError("パケットが短すぎます")
+    magic, version, flags, seq, end_minute, minutes, uid_len = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise HeartbeatError("未対応のパケットです")
+    signed = flags & FLAG_SIGNED
+    body_size = _HEADER.size + uid_len + minutes
+    if len(data) != body_size + (TAG_SIZE if signed else 0):
+        raise HeartbeatError("パケット長が一致しません")
+    if secret:
+        if not signed or not hmac.compare_digest(
+            data[body_size:], _tag(secret, data[:body_size])
+        ):
+            raise HeartbeatError("署名が一致しません")
+    start = _HEADER.size
+    try:
+        user_id = data[start:start + uid_len].decode("utf-8")
+    except UnicodeDecodeError:
+        raise HeartbeatError("ユーザーIDが不正です")
+    return Heartbeat(user_id, seq, end_minute, data[start + uid_len:body_size])
+
+
+class _UserActivity:
+    """1ユーザー分の1分ごとの件数（分番号をキーにした固定長リング）"""
+
+    __slots__ = ("counts", "slots", "last_active_minute")
+
+    def __init__(self, size: int):
+        self.counts = array("B", bytes(size))
+        self.slots = array("q", [-1]) * size
+        self.last_active_minute = -1
+
+
+class RemoteMonitor:
+    """各PCのコレクタから届くハートビートを集約し、ユーザーごとの稼働状態を返す
+
+    PCMonitor と同じ判定（直近N分の件数の合計）を、受信した1分ごとの件数で
+    行う。保持するのはユーザーあたり retention_minutes バイト程度で、
+    for_user() が working_state_node に渡せる監視サービスを返す。
+    """
+
+    def __init__(self, retention_minutes: int = 60, secret: Optional[bytes] = None):
+        self._size = max(1, retention_minutes)
+        self._secret = secret
+        self._users: dict[str, _UserActivity] = {}
+        self._lock = threading.Lock()
+        self.rejected = 0   # 壊れた・署名の合わないパケット数
+
+    @property
+    def signed(self) -> bool:
+        """署名付きのパケットだけを受け付けるか"""
+        return self._secret is not None
+
+    def ingest(self, data: bytes) -> bool:
+        """受信したパケットを取り込む（不正なパケットは数えて捨てる）"""
+        try:
+            heartbeat = decode_heartbeat(data, self._secret)
+        except HeartbeatError:
+            self.rejected += 1
+            return False
+        self.record(heartbeat.user_id, heartbeat.end_minute, heartbeat.counts)
+        return True
+
+    def record(self, user_id: str, end_minute: int, counts):
+        """end_minute で終わる1分ごとの件数を取り込む（分ごとに大きい方を採る）"""
+        size = self._size
+        first = end_minute - len(counts) + 1
+        with self._lock:
+            activity = self._users.get(user_id)
+            if activity is None:
+                activity = self._users[user_id] = _UserActivity(size)
+            slots, stored = activity.slots, activity.counts
+            for offset, count in enumerate(counts):
+                minute = first + offset
+                idx = minute % size
+                if slots[idx] > minute:
+                    continue  # 保持期間より古い分
+                if slots[idx] != minute:
+                    slots[idx] = minute
+                    stored[idx] = count
+                elif count > stored[idx]:
+                    stored[idx] = count
+                if count and minute > activity.last_active_minute:
+                    activity.last_active_minute = minute
+
+    def users(self) -> list[str]:
+        """ハートビートを受信したことのあるユーザー"""
+        with self._lock:
+            return list(self._users)
+
+    def for_user(self, user_id: str) -> "RemoteUserMonitor":
+        return RemoteUserMonitor(self, user_id)
+
+    def _minute_counts(self, user_id: str, minutes: int) -> list[tuple[int, int]]:
+        """直近N分のうち件数のある (分, 件数) を古い順に返す"""
+        last = _now_minute()
+        first = last - min(minutes, self._size) + 1
+        with self._lock:
+            activity = self._users.get(user_id)
+            if activity is None:
+                return []
+            hits = []
+            for minute in range(first, last + 1):
+                idx = minute % self._size
+                if activity.slots[idx] == minute and activity.counts[idx]:
+                    hits.append((minute, activity.counts[idx]))
+            return hits
+
+    def _last_active_minute(self, user_id: str) -> int:
+        with self._lock:
+            activity = self._users.get(user_id)
+            return -1 if activity is None else activity.last_active_minute
+
+
+class RemoteUserMonitor:
+    """RemoteMonitor の1ユーザー分の表示（PCMonitor と同じ判定用メソッドを持つ）"""
+
+    def __init__(self, remote: RemoteMonitor, user_id: str):
+        self._remote = remote
+        self._user_id = user_id
+
+    def count_recent_events(self, minutes: int) -> int:
+        """直近N分以内の操作件数を返す"""
+        return sum(count for _, count in self._remote._minute_counts(self._user_id, minutes))
+
+    def get_recent_events(self, minutes: int) -> list[datetime]:
+        """直近N分以内の操作イベントを返す（時刻は分単位に丸められる）"""
+        events = []
+        for minute, count in self._remote._minute_counts(self._user_id, minutes):
+            events.extend([datetime.fromtimestamp(minute * 60)] * count)
+        return events
+
+    def last_activity_time(self) -> Optional[datetime]:
+        """最後に操作があった分の終わり（受信がなければNone）"""
+        minute = self._remote._last_active_minute(self._user_id)
+        if minute < 0:
+            return None
+        return datetime.fromtimestamp(minute * 60) + timedelta(seconds=59)
+
+    def is_working(self, threshold_minutes: int, min_count: int) -> bool:
+        """直近threshold_minutes分以内にmin_count回以上の操作があれば作業中と判定"""
+        return self.count_recent_events(threshold_minutes) >= min_count
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class HeartbeatReceiver:
+    """UDPでハートビートを受信して RemoteMonitor に取り込む（サーバー側）
+
+    署名なし（RemoteMonitor に secret がない）ではLAN内の誰でも任意の
+    ユーザーの操作を偽装して打刻させられるため、host の指定にかかわらず
+    127.0.0.1 でだけ待ち受ける。
+    """
+
+    def __init__(self, monitor: RemoteMonitor, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        self._monitor = monitor
+        self._host = host
+        self._port = port
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._sock.getsockname()
+
+    def start(self):
+        host = self._host
+        if not self._monitor.signed and not _is_loopback(host):
+            print(
+                f"[Heartbeat] HEARTBEAT_SECRET が未設定のため {host} ではなく "
+                "127.0.0.1 で待ち受けます"
+            )
+            host = "127.0.0.1"
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        sock.bind((host, self._port))
+        self._sock = sock
+        self._thread = threading.Thread(
+            target=self._serve, name="heartbeat-receiver", daemon=True
+        )
+        self._thread.start()
+
+    def _serve(self):
+        sock, ingest = self._sock, self._monitor.ingest
+        while True:
+            try:
+                data = sock.recv(512)
+            except OSError:
+                return  # stop() でソケットが閉じられた
+            ingest(data)
+
+    def stop(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+class HeartbeatSender:
+    """PCMonitor の1分ごとの件数を定期的にサーバーへ送る（コレクタ側）
+
+    操作のない間（直近 redundancy_minutes 分の件数がすべて0）は送らない。
+    """
+
+    def __init__(
+        self,
+        monitor,
+        user_id: str,
+        address: tuple[str, int],
+        redundancy_minutes: int = 15,
+        interval_seconds: float = 60,
+        secret: Optional[bytes] = None,
+    ):
+        self._monitor = monitor
+        self._user_id = user_id
+        self._address = address
+        self._minutes = max(1, min(MAX_MINUTES, redundancy_minutes))
+        self._interval = interval_seconds
+        self._secret = secret
+        self._seq = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def send_once(self) -> bool:
+        """現在の件数を1パケット送る（送らなかった場合はFalse）"""
+        end_minute = _now_minute()
+        counts = self._monitor.minute_counts(self._minutes, end_minute)
+        if not any(counts):
+            return False
+        self._seq += 1
+        packet = encode_heartbeat(
+            self._user_id, self._seq, end_minute, counts, self._secret
+        )
+        try:
+            self._sock.sendto(packet, self._address)
+        except OSError as e:
+            print(f"[Heartbeat] 送信に失敗: {e}")
+            return False
+        return True
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="heartbeat-sender", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.send_once()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        self._sock.close()
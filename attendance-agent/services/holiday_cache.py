@@ -0,0 +1,167 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Optional
+
+from services.sqlite_util import connect
+
+# 判定元ごとの有効期限（時間）。ここにない判定元は無期限
+DEFAULT_TTL_HOURS = {
+    "google": 6,            # カレンダーへの有給登録を半日以内に反映
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS holidays (
+    scope TEXT NOT NULL,
+    day TEXT NOT NULL,
+    source TEXT NOT NULL,
+    is_holiday INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (scope, day, source)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _now() -> float:
+    """テスト時にモック可能な現在時刻（エポック秒）"""
+    return time.time()
+
+
+def _drop_legacy_table(conn: sqlite3.Connection):
+    """scope 列の無い旧形式の holidays テーブルを削除する"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(holidays)")}
+    if columns and "scope" not in columns:
+        conn.execute("DROP TABLE holidays")
+
+
+class HolidayCache:
+    """祝日・有給判定結果のディスクキャッシュ（SQLite）
+
+    (スコープ, 日付, 判定元) をキーに判定結果と有効期限を保存し、再起動後も
+    Calendar APIの呼び出しを省く。同一ホストの複数
+    エージェントから共有できるようWALモードで開く。ファイルは最初の
+    get/put で開く（起動時には開かない）。
+
+    google 由来の結果はユーザーの個人カレンダーと祝日カレンダーで変わるため、
+    scope（ユーザーIDとカレンダーIDなど）ごとに分けて保存する。
+    scope 列の無い旧形式のテーブルは作り直す（キャッシュなので破棄してよい）。
+
+    vacation_keywords が前回と異なる場合、キーワードに依存する
+    google 由来の結果を破棄する。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        vacation_keywords: list[str] = None,
+        ttl_hours: dict = None,
+        scope: str = "",
+    ):
+        self._path = path
+        self._scope = scope
+        self._keywords = json.dumps(sorted(set(vacation_keywords or [])), ensure_ascii=False)
+        self._ttl_hours = {**DEFAULT_TTL_HOURS, **(ttl_hours or {})}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._disabled = False
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and not self._disabled:
+            try:
+                conn = connect(self._path)
+                _drop_legacy_table(conn)
+                conn.executescript(_SCHEMA)
+                self._check_keywords(conn)
+                self._conn = conn
+            except (sqlite3.Error, OSError) as e:
+                print(f"[HolidayCache] キャッシュを開けないため無効化します: {e}")
+                self._disabled = True
+        return self._conn
+
+    def _check_keywords(self, conn: sqlite3.Connection):
+        """有給キーワードが変わっていれば自スコープのgoogle由来の結果を破棄する"""
+        meta_key = f"vacation_keywords:{self._scope}"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (meta_key,)
+            ).fetchone()
+            if row is None or row[0] != self._keywords:
+                conn.execute(
+                    "DELETE FROM holidays WHERE scope = ? AND source = 'google'",
+                    (self._scope,),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    (meta_key, self._keywords),
+                )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, day: date, *sources: str) -> Optional[tuple[bool, str]]:
+        """指定した判定元のうち、有効期限内の結果を返す（なければNone）"""
+        placeholders = ",".join("?" * len(sources))
+        with self._lock:
+            conn = self._open()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT is_holiday, reason FROM holidays"
+                    f" WHERE scope = ? AND day = ? AND source IN ({placeholders})"
+                    " AND (expires_at IS NULL OR expires_at > ?)"
+                    " ORDER BY is_holiday DESC LIMIT 1",
+                    (self._scope, day.isoformat(), *sources, _now()),
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        if row is None:
+            return None
+        return (bool(row[0]), row[1])
+
+    def put(self, day: date, source: str, result: tuple[bool, str]):
+        """判定結果を判定元の有効期限付きで保存する"""
+        ttl = self._ttl_hours.get(source)
+        expires_at = None if ttl is None else _now() + ttl * 3600
+        with self._lock:
+            conn = self._open()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO holidays"
+                    " (scope, day, source, is_holiday, reason, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (self._scope, day.isoformat(), source, int(result[0]), result[1], expires_at),
+                )
+            except sqlite3.Error:
+                pass
+
+    def purge_expired(self):
+        """期限切れの結果を削除する"""
+        with self._lock:
+            conn = self._open()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "DELETE FROM holidays WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                    (_now(),),
+                )
+            except sqlite3.Error:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
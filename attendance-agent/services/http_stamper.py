@@ -0,0 +1,251 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urljoin
+
+from services.stamper_interface import StamperInterface, StampResult
+
+DEFAULT_HTTP_CONFIG = {
+    "login_path": "/login",
+    "clock_in_path": "/stamp?kind=in",
+    "clock_out_path": "/stamp?kind=out",
+    "username_param": "username",
+    "password_param": "password",
+    "success_text": "",
+    "timeout_seconds": 10,
+}
+
+
+class HttpStampError(Exception):
+    """HTTP打刻の失敗（打刻は受け付けられていないため、ブラウザで打ち直してよい）"""
+
+
+class HttpStampUncertainError(HttpStampError):
+    """打刻POSTがサーバーに届いた後の失敗（打刻済みの可能性があるため打ち直さない）"""
+
+
+class HttpStamper(StamperInterface):
+    """フォームPOSTで直接打刻する（ブラウザを起動しない）
+
+    接続はプール済みのHTTPセッションを使い回し、Cookieは
+    session_storage_path（Playwrightのstorage_state形式）と共有する。
+    HTTPでの打刻に失敗した場合は fallback（Playwright実装）で打刻する。
+    ただし打刻POSTがサーバーに届いた可能性がある失敗（応答待ちの
+    タイムアウトや 5xx、打刻後の画面に確認メッセージがない場合）は
+    二重打刻を避けるため打ち直さず、失敗として返す。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        user: str,
+        password: str,
+        config: dict,
+        fallback: Optional[StamperInterface] = None,
+    ):
+        self._url = url
+        self._user = user
+        self._password = password
+        self._config = config["browser"]
+        self._http = {**DEFAULT_HTTP_CONFIG, **self._config.get("http", {})}
+        self._storage_path = Path(self._config["session_storage_path"])
+        self._fallback = fallback
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        """HTTPセッションを取得（初回のみ生成し、保存済みCookieを読み込む）"""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._load_cookies(session)
+            self._session = session
+        return self._session
+
+    def _load_cookies(self, session):
+        """storage_state形式のファイルからCookieを読み込む"""
+        if not self._storage_path.exists():
+            return
+        try:
+            state = json.loads(self._storage_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        for cookie in state.get("cookies", []):
+            session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+
+    def _save_cookies(self, session):
+        """Cookieをstorage_state形式で保存（Playwright側と共有するため）"""
+        state = {"cookies": [], "origins": []}
+        if self._storage_path.exists():
+            try:
+                state = json.loads(self._storage_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                pass
+        state["cookies"] = [
+            {
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain,
+                "path": c.path,
+                "expires": c.expires if c.expires is not None else -1,
+                "httpOnly": bool(c.has_nonstandard_attr("HttpOnly")),
+                "secure": bool(c.secure),
+                "sameSite": "Lax",
+            }
+            for c in session.cookies
+        ]
+        self._storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self._storage_path.write_text(json.dumps(state), encoding="utf-8")
+
+    def _is_login_page(self, response) -> bool:
+        """応答がログイン画面（パスワード入力欄のあるフォーム）か"""
+        body = response.text.lower()
+        password_param = self._http["password_param"].lower()
+        return 'type="password"' in body or f'name="{password_param}"' in body
+
+    def _needs_login(self, response) -> bool:
+        if response.status_code in (401, 403):
+            return True
+        if response.is_redirect:
+            return "login" in response.headers.get("Location", "").lower()
+        # セッション切れでも 200 でログイン画面を返すシステムがある
+        return "login" in response.url.lower() or self._is_login_page(response)
+
+    def _login(self, session):
+        timeout = self._http["timeout_seconds"]
+        response = session.post(
+            urljoin(self._url, self._http["login_path"]),
+            data={
+                self._http["username_param"]: self._user,
+                self._http["password_param"]: self._password,
+            },
+            timeout=timeout,
+        )
+        if (
+            response.status_code >= 400
+            or "login" in response.url.lower()
+            or self._is_login_page(response)
+        ):
+            raise HttpStampError("ログインが拒否されました")
+        self._save_cookies(session)
+
+    def _send_stamp(self, session, stamp_url: str, timeout):
+        """打刻POSTを1回送る（リダイレクトはログイン判定のため追わない）"""
+        import requests
+
+        try:
+            return session.post(stamp_url, timeout=timeout, allow_redirects=False)
+        except requests.exceptions.ConnectTimeout as e:
+            raise HttpStampError(f"勤怠システムに接続できません: {e}") from e
+        except requests.exceptions.RequestException as e:
+            raise HttpStampUncertainError(f"打刻リクエストの応答を確認できません: {e}") from e
+
+    def _follow_redirect(self, session, response, timeout):
+        """打刻後のリダイレクト（Post/Redirect/Get）先の画面を取得する"""
+        import requests
+
+        try:
+            return session.get(
+                urljoin(response.url, response.headers.get("Location", "")),
+                timeout=timeout,
+            )
+        except requests.exceptions.RequestException as e:
+            raise HttpStampUncertainError(f"打刻後の画面を取得できません: {e}") from e
+
+    def _post_stamp(self, path: str):
+        """打刻POSTを送る（未ログインならログインして1回だけ再送）
+
+        成功の判定は応答本文（リダイレクトされた場合はその先の画面）の
+        success_text だけで行う。HTTP 2xx でもログイン画面やエラー画面の
+        ことがあるため、success_text が未設定のときや本文に含まれないときは
+        失敗とする。ログイン画面への誘導や 4xx は打刻が受け付けられていない
+        ため HttpStampError、それ以外は HttpStampUncertainError を送出する。
+        """
+        success_text = self._http["success_text"]
+        if not success_text:
+            raise HttpStampError("browser.http.success_text が未設定のため打刻を確認できません")
+        timeout = self._http["timeout_seconds"]
+        stamp_url = urljoin(self._url, path)
+        with self._lock:
+            session = self._get_session()
+            response = self._send_stamp(session, stamp_url, timeout)
+            if self._needs_login(response):
+                self._login(session)
+                response = self._send_stamp(session, stamp_url, timeout)
+            if self._needs_login(response):
+                raise HttpStampError("再ログイン後もログイン画面が返されました")
+            if response.is_redirect:
+                response = self._follow_redirect(session, response, timeout)
+        if 400 <= response.status_code < 500:
+            raise HttpStampError(f"打刻リクエストが拒否されました（HTTP {response.status_code}）")
+        if not 200 <= response.status_code < 300:
+            raise HttpStampUncertainError(
+                f"打刻リクエストが失敗しました（HTTP {response.status_code}）"
+            )
+        if success_text not in response.text:
+            raise HttpStampUncertainError("打刻確認メッセージが見つかりません")
+
+    async def _stamp(self, path: str, action: str) -> StampResult:
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._post_stamp, path)
+        except Exception as e:
+            # 打刻済みの可能性がある場合はブラウザで打ち直さない（二重打刻の防止）
+            if self._fallback is None or isinstance(e, HttpStampUncertainError):
+                if self._fallback is not None:
+                    print(f"[HttpStamper] {action} 打刻済みの可能性があるため再試行しません: {e}")
+                return StampResult(
+                    success=False,
+                    timestamp="",
+                    error=str(e),
+                    elapsed_ms=(time.perf_counter() - started) * 1000,
+                    attempts=1,
+                )
+            print(f"[HttpStamper] {action} HTTP打刻に失敗したためブラウザで再試行: {e}")
+            fallback = getattr(self._fallback, action)
+            return await fallback()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"[HttpStamper] {action} http {elapsed_ms:.0f}ms")
+        return StampResult(
+            success=True,
+            timestamp=datetime.now().strftime("%H:%M"),
+            error=None,
+            elapsed_ms=elapsed_ms,
+            attempts=1,
+        )
+
+    async def clock_in(self) -> StampResult:
+        """出勤打刻"""
+        return await self._stamp(self._http["clock_in_path"], "clock_in")
+
+    async def clock_out(self) -> StampResult:
+        """退勤打刻"""
+        return await self._stamp(self._http["clock_out_path"], "clock_out")
+
+    def apply_config(self, config):
+        """再読み込みした設定をフォールバック（ブラウザ打刻）に反映する"""
+        if hasattr(self._fallback, "apply_config"):
+            self._fallback.apply_config(config)
+
+    async def close(self):
+        """HTTPセッションとフォールバックを閉じる"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self._fallback is not None:
+            await self._fallback.close()
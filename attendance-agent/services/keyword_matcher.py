@@ -0,0 +1,154 @@
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+# 終日休として扱う分類（is_holiday が True になる）
+FULL_DAY = "full_day"
+
+# 照合するイベントの項目（先に挙げた項目での一致を優先する）
+DEFAULT_MATCH_FIELDS = ("summary", "description", "location")
+
+
+def _normalize(text: str) -> str:
+    """全角/半角・大文字/小文字の違いを吸収する"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    keyword: str
+    category: str
+    field: str      # 一致したイベントの項目
+    start: int      # 正規化後の文字列での開始位置
+
+
+class KeywordMatcher:
+    """休暇分類のキーワードを一度にまとめて照合する（Aho–Corasick法）
+
+    taxonomy は 分類→キーワード一覧（例: {"full_day": ["有給", ...],
+    "am_off": ["午前休", ...]}）。文字列を1回走査するだけで全キーワードの
+    出現を列挙でき、キーワード数に比例して遅くならない。複数が一致した
+    場合は最も長いキーワード（同じ長さなら先に出現したもの）を採用するため、
+    「午前半休」は「半休」より優先される。
+    """
+
+    def __init__(self, taxonomy: dict[str, list[str]], fields=DEFAULT_MATCH_FIELDS):
+        self._fields = tuple(fields)
+        self._keywords: list[tuple[str, str, int]] = []   # (キーワード, 分類, 正規化後の長さ)
+        seen: dict[str, int] = {}
+        for category, keywords in taxonomy.items():
+            for keyword in keywords:
+                normalized = _normalize(keyword)
+                if not normalized or normalized in seen:
+                    continue  # 重複は先に定義した分類を優先
+                seen[normalized] = len(self._keywords)
+                self._keywords.append((keyword, category, len(normalized)))
+        self._build(seen)
+
+    @classmethod
+    def from_config(cls, cal_config: dict) -> "KeywordMatcher":
+        """config.yaml の calendar セクションから生成
+
+        vacation_keywords は終日休（full_day）のキーワードとして扱う。
+        """
+        taxonomy = {FULL_DAY: list(cal_config.get("vacation_keywords", []))}
+        for category, keywords in cal_config.get("leave_categories", {}).items():
+            taxonomy.setdefault(category, []).extend(keywords)
+        return cls(taxonomy, cal_config.get("match_fields", DEFAULT_MATCH_FIELDS))
+
+    def _build(self, patterns: dict[str, int]):
+        # goto[state] は 文字→次状態、outputs[state] はその状態で終わるキーワード番号
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[tuple[int, ...]] = [()]
+        for pattern, keyword_id in patterns.items():
+            state = 0
+            for ch in pattern:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    outputs.append(())
+                state = next_state
+            outputs[state] = (keyword_id,)
+
+        # 幅優先で失敗遷移を求め、接尾辞側の出力を取り込む
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fallback = goto[f].get(ch, 0)
+                fail[next_state] = fallback if fallback != next_state else 0
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+
+    def signature(self) -> list[str]:
+        """照合条件の一覧（条件が変わったことの検出に使う）"""
+        return [f"{category}:{keyword}" for keyword, category, _ in self._keywords] + [
+            "fields:" + ",".join(self._fields)
+        ]
+
+    def _scan(self, text: str):
+        """一致ごとに (終了位置, キーワード番号) を返す"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for i, ch in enumerate(_normalize(text)):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword_id in outputs[state]:
+                yield i, keyword_id
+
+    def find_all(self, text: str) -> list[tuple[int, str, str]]:
+        """一致したすべてのキーワードを (開始位置, キーワード, 分類) で返す"""
+        found = []
+        for end, keyword_id in self._scan(text):
+            keyword, category, length = self._keywords[keyword_id]
+            found.append((end - length + 1, keyword, category))
+        return found
+
+    def search(self, text: str) -> Optional[tuple[int, str, str]]:
+        """最も長く一致したキーワードを (開始位置, キーワード, 分類) で返す"""
+        if not text:
+            return None
+        # 照合は1文字ごとに走るため _scan を展開し、ローカル変数で回す
+        goto, fail, outputs, keywords = self._goto, self._fail, self._outputs, self._keywords
+        root = goto[0]
+        best_length = 0
+        best_start = best_id = -1
+        state = 0
+        for i, ch in enumerate(_normalize(text)):
+            if state == 0:
+                state = root.get(ch, 0)
+                if state == 0:
+                    continue  # どのキーワードの先頭でもない文字（大半の文字）
+            else:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+            for keyword_id in outputs[state]:
+                length = keywords[keyword_id][2]
+                if length > best_length:
+                    best_length, best_start, best_id = length, i - length + 1, keyword_id
+        if best_id < 0:
+            return None
+        keyword, category, _ = keywords[best_id]
+        return best_start, keyword, category
+
+    def match_event(self, event: dict) -> Optional[KeywordMatch]:
+        """イベントの件名・説明・場所を順に照合し、最初に一致した項目の結果を返す"""
+        for field in self._fields:
+            found = self.search(event.get(field) or "")
+            if found is not None:
+                start, keyword, category = found
+                return KeywordMatch(keyword, category, field, start)
+        return None
@@ -0,0 +1,166 @@
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from services.retry_policy import RetryPolicy
+from services.slack_client import ERROR_MESSAGE, SlackRateLimited
+
+# レート制限時に待つ秒数の上限（異常なRetry-Afterで止まり続けないため）
+MAX_RETRY_AFTER_SECONDS = 300
+
+_STOP = object()
+
+
+class QueuedNotifier:
+    """通知をキューに積み、バックグラウンドスレッドで送信する
+
+    send はキューに積むだけで即座に返るため、Slack APIが遅延・停止しても
+    チェック処理を止めない。送信は notifier.deliver(message, coalesce_key) を使い、
+    失敗時は RetryPolicy の間隔で再送する（HTTP 429 は Retry-After に従う）。
+    再送しても届かなかった通知と停止時に未送信だった通知は spool_path に
+    JSON Lines で保存し、次回 start 時に先頭から送り直す。
+    """
+
+    def __init__(
+        self,
+        notifier,
+        spool_path: str,
+        policy: Optional[RetryPolicy] = None,
+        max_queue: int = 100,
+    ):
+        self._notifier = notifier
+        self._spool_path = Path(spool_path)
+        self._policy = policy or RetryPolicy(max_attempts=5, base_delay=2.0, max_delay=60.0)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._spool_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, notifier, config: dict) -> "QueuedNotifier":
+        """config.yaml の slack.queue セクションから生成"""
+        policy = RetryPolicy.from_config(config.get("max_attempts", 5), config)
+        return cls(
+            notifier,
+            spool_path=config.get("spool_path", ".notify_spool.jsonl"),
+            policy=policy,
+            max_queue=config.get("max_queue", 100),
+        )
+
+    def start(self):
+        """保存済みの未送信通知を積み直し、送信スレッドを開始する"""
+        for item in self._take_spool():
+            self._enqueue(item)
+        self._thread = threading.Thread(
+            target=self._run, name="notification-queue", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """送信スレッドを止め、未送信の通知を保存する"""
+        self._stopping.set()
+        if self._thread is not None:
+            try:
+                self._queue.put_nowait(_STOP)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+            self._thread = None
+        pending = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item)
+        self._spool(pending)
+
+    def send(self, message: str, coalesce_key: Optional[str] = None) -> bool:
+        """通知をキューに積む（送信結果は待たない）"""
+        self._enqueue((message, coalesce_key))
+        return True
+
+    def send_error(self, error: str) -> bool:
+        """エラー通知をキューに積む"""
+        return self.send(ERROR_MESSAGE.format(error=error))
+
+    def pending_count(self) -> int:
+        return self._queue.qsize()
+
+    def _enqueue(self, item: tuple[str, Optional[str]]):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # 送信が詰まっている間に溢れた通知は待たずに保存する
+            self._spool([item])
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if not self._deliver(item):
+                self._spool([item])
+            if self._stopping.is_set():
+                return
+
+    def _deliver(self, item: tuple[str, Optional[str]]) -> bool:
+        """再送込みで1件送信する（届かなければFalse）"""
+        message, coalesce_key = item
+        attempt = 0
+        while attempt < self._policy.max_attempts:
+            attempt += 1
+            try:
+                self._notifier.deliver(message, coalesce_key)
+                return True
+            except SlackRateLimited as e:
+                delay = min(e.retry_after, MAX_RETRY_AFTER_SECONDS)
+            except Exception as e:
+                if self._policy.is_permanent(e):
+                    print(f"[QueuedNotifier] 通知を送信できません: {e}")
+                    return False
+                delay = self._policy.delay_for(attempt)
+            if attempt >= self._policy.max_attempts:
+                break
+            # 停止要求があれば待たずに打ち切る
+            if self._stopping.wait(delay):
+                return False
+        print(f"[QueuedNotifier] {attempt}回送信に失敗したため保存します")
+        return False
+
+    def _spool(self, items: list[tuple[str, Optional[str]]]):
+        if not items:
+            return
+        with self._spool_lock:
+            self._spool_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._spool_path, "a", encoding="utf-8") as f:
+                for message, coalesce_key in items:
+                    record = {
+                        "message": message,
+                        "coalesce_key": coalesce_key,
+                        "queued_at": time.time(),
+                    }
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _take_spool(self) -> list[tuple[str, Optional[str]]]:
+        """保存済みの通知を読み出してファイルを空にする"""
+        with self._spool_lock:
+            if not self._spool_path.exists():
+                return []
+            try:
+                lines = self._spool_path.read_text(encoding="utf-8").splitlines()
+                self._spool_path.unlink()
+            except OSError:
+                return []
+        items = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+                items.append((record["message"], record.get("coalesce_key")))
+            except (ValueError, KeyError, TypeError):
+                continue  # 書きかけの行は捨てる
+        return items
@@ -1,5 +1,8 @@
 import threading
+import time
+from array import array
 from datetime import datetime, timedelta
+from typing import Callable, Optional
 from pynput import mouse, keyboard
 
 # テスト時にモック差し替え可能にするためモジュールレベルで参照
@@ -7,28 +10,108 @@ mouse_listener_cls = mouse.Listener
 keyboard_listener_cls = keyboard.Listener
 
 
+def _monotonic() -> float:
+    """テスト時にモック可能な単調増加時刻取得（秒）"""
+    return time.monotonic()
+
+
+def _wall() -> float:
+    """テスト時にモック可能なUNIX時刻取得（秒）"""
+    return time.time()
+
+
 class PCMonitor:
-    """PC操作（マウス・キーボード）を監視し、稼働状態を判定する"""
+    """PC操作（マウス・キーボード）を監視し、稼働状態を判定する
 
-    def __init__(self):
-        self._events: list[datetime] = []
+    操作イベントは bucket_seconds 単位の固定長リングバッファ（件数カウンタ）
+    に集計する。稼働時間に関わらずメモリ使用量は一定で、判定は
+    ウィンドウ内のバケット数に比例した計算量で済む。
+    """
+
+    def __init__(self, bucket_seconds: int = 1, retention_minutes: int = 60):
+        if bucket_seconds < 1:
+            raise ValueError("bucket_seconds は1以上を指定してください")
+        self._bucket_seconds = bucket_seconds
+        self._size = max(1, (retention_minutes * 60) // bucket_seconds)
+        # _counts[i]: バケットの件数 / _slots[i]: そのスロットが保持するバケット番号
+        self._counts = array("I", bytes(4 * self._size))
+        self._slots = array("q", [-1]) * self._size
+        self._last_second = -1
+        self._last_event_at: Optional[float] = None   # 最後の操作イベント（monotonic）
         self._lock = threading.Lock()
+        # 稼働状態の遷移通知（watch_activity で設定）
+        self._watch: Optional[tuple[int, int, Callable[[bool], None]]] = None
+        self._active = False
+        # 起動後最初の操作イベントの記録時刻（起動時間計測用）
+        self._first_event = threading.Event()
+        self.first_event_at: Optional[float] = None
         self._mouse_listener = None
         self._keyboard_listener = None
 
+    def ensure_retention(self, minutes: int):
+        """保持期間が minutes 分に満たなければリングバッファを広げる
+
+        記録済みの件数は新しいバッファに移す（縮めることはしない）。
+        """
+        size = max(1, (minutes * 60) // self._bucket_seconds)
+        with self._lock:
+            if size <= self._size:
+                return
+            counts = array("I", bytes(4 * size))
+            slots = array("q", [-1]) * size
+            for idx in range(self._size):
+                bucket = self._slots[idx]
+                if bucket >= 0:
+                    slots[bucket % size] = bucket
+                    counts[bucket % size] = self._counts[idx]
+            self._counts, self._slots, self._size = counts, slots, size
+
+    def _bucket_of(self, mono: float) -> int:
+        return int(mono) // self._bucket_seconds
+
+    def _add(self, bucket: int, count: int = 1):
+        """指定バケットに件数を加算する（ロック取得済みで呼ぶこと）"""
+        idx = bucket % self._size
+        if self._slots[idx] > bucket:
+            return  # 保持期間より古いイベント
+        if self._slots[idx] != bucket:
+            self._slots[idx] = bucket
+            self._counts[idx] = 0
+        self._counts[idx] += count
+
     def _record_event(self):
         """操作イベントを記録する（dedup なし。テストから直接呼ばれる）"""
-        now = datetime.now()
+        mono = _monotonic()
         with self._lock:
-            self._events.append(now)
+            self._add(self._bucket_of(mono))
+            self._last_event_at = mono
 
     def _record_event_dedup(self):
-        """操作イベントを記録する（重複防止: 1秒以内の連続イベントは無視）"""
-        now = datetime.now()
+        """操作イベントを記録する（重複防止: 同一秒内の連続イベントは無視）
+
+        マウス移動は毎秒数百回発火するため、同一秒内のイベントはロックも
+        datetime 生成も行わずに返す。_last_second の読み書きは GIL 下で
+        アトミックなので、ロック内で再確認して二重計上だけを防ぐ。
+        """
+        sec = int(_monotonic())
+        if sec == self._last_second:
+            return
         with self._lock:
-            if self._events and (now - self._events[-1]).total_seconds() < 1:
+            if sec == self._last_second:
                 return
-            self._events.append(now)
+            self._last_second = sec
+            self._last_event_at = sec
+            self._add(sec // self._bucket_seconds)
+            if self.first_event_at is None:
+                self.first_event_at = _monotonic()
+                self._first_event.set()
+            if self._watch is None or self._active:
+                return
+            window, min_count, callback = self._watch
+            if self._count_locked(window) < min_count:
+                return
+            self._active = True
+        callback(True)
 
     def _on_mouse_move(self, x, y):
         self._record_event_dedup()
@@ -36,22 +119,121 @@ class PCMonitor:
     def _on_key_press(self, key):
         self._record_event_dedup()
 
+    def _window(self, minutes: int) -> tuple[int, int]:
+        """直近N分に対応するバケット範囲 [first, last] を返す"""
+        last = self._bucket_of(_monotonic())
+        span = min(self._size, -(-minutes * 60 // self._bucket_seconds))
+        return last - span + 1, last
+
+    def _count_locked(self, minutes: int) -> int:
+        """直近N分以内の件数を数える（ロック取得済みで呼ぶこと）"""
+        first, last = self._window(minutes)
+        total = 0
+        for bucket in range(first, last + 1):
+            idx = bucket % self._size
+            if self._slots[idx] == bucket:
+                total += self._counts[idx]
+        return total
+
+    def count_recent_events(self, minutes: int) -> int:
+        """直近N分以内の操作イベント件数を返す"""
+        with self._lock:
+            return self._count_locked(minutes)
+
     def get_recent_events(self, minutes: int) -> list[datetime]:
-        """直近N分以内の操作イベントを返す"""
-        cutoff = datetime.now() - timedelta(minutes=minutes)
+        """直近N分以内の操作イベントを返す（時刻はバケット単位に丸められる）"""
+        first, last = self._window(minutes)
         with self._lock:
-            return [e for e in self._events if e > cutoff]
+            hits = []
+            for bucket in range(first, last + 1):
+                idx = bucket % self._size
+                if self._slots[idx] == bucket and self._counts[idx]:
+                    hits.append((bucket, self._counts[idx]))
+        now_wall = datetime.now()
+        now_mono = _monotonic()
+        events = []
+        for bucket, count in hits:
+            ago = now_mono - bucket * self._bucket_seconds
+            events.extend([now_wall - timedelta(seconds=ago)] * count)
+        return events
+
+    def minute_counts(self, minutes: int, end_minute: Optional[int] = None) -> list[int]:
+        """UNIX時刻の分ごとの件数を、end_minute までのN分について古い順に返す
+
+        end_minute（UNIX時刻 // 60、省略時は現在の分）はハートビートに
+        載せる分と同じ値を渡す。各バケットは単調増加時刻とUNIX時刻の差で
+        UNIX時刻に換算してから分に振り分けるため、分の区切りがずれない。
+        """
+        mono = _monotonic()
+        offset = _wall() - mono
+        if end_minute is None:
+            end_minute = int(mono + offset) // 60
+        first_minute = end_minute - minutes + 1
+        first = self._bucket_of(max(0.0, first_minute * 60 - offset))
+        last = self._bucket_of(mono)
+        counts = [0] * minutes
+        with self._lock:
+            for bucket in range(max(first, last - self._size + 1), last + 1):
+                idx = bucket % self._size
+                if self._slots[idx] == bucket and self._counts[idx]:
+                    minute = int(bucket * self._bucket_seconds + offset) // 60
+                    if first_minute <= minute <= end_minute:
+                        counts[minute - first_minute] += self._counts[idx]
+        return counts
+
+    def last_activity_time(self) -> Optional[datetime]:
+        """最後に操作があった時刻（秒単位に丸められる。操作がなければNone）"""
+        last = self._last_event_at
+        if last is None:
+            return None
+        return datetime.now() - timedelta(seconds=max(0.0, _monotonic() - last))
 
     def is_working(self, threshold_minutes: int, min_count: int) -> bool:
         """直近threshold_minutes分以内にmin_count回以上の操作があれば作業中と判定"""
-        recent = self.get_recent_events(threshold_minutes)
-        return len(recent) >= min_count
+        return self.count_recent_events(threshold_minutes) >= min_count
+
+    def watch_activity(
+        self,
+        window_minutes: int,
+        min_count: int,
+        on_change: Callable[[bool], None],
+    ):
+        """稼働状態の遷移をコールバックで通知する
+
+        非稼働中にwindow_minutes分以内の操作がmin_count回に達した時点で
+        リスナースレッドから on_change(True) を呼ぶ。稼働→非稼働の遷移は
+        イベントが発生しないため refresh_activity() の呼び出し時に検出する。
+        """
+        with self._lock:
+            self._watch = (window_minutes, min_count, on_change)
+            self._active = self._count_locked(window_minutes) >= min_count
+
+    def refresh_activity(self) -> bool:
+        """現在の稼働状態を評価し、遷移していればコールバックを呼ぶ"""
+        with self._lock:
+            if self._watch is None:
+                return False
+            window, min_count, callback = self._watch
+            active = self._count_locked(window) >= min_count
+            changed = active != self._active
+            self._active = active
+        if changed:
+            callback(active)
+        return active
+
+    def wait_for_first_event(self, timeout: Optional[float] = None) -> Optional[float]:
+        """最初の操作イベントが記録されるまで待ち、その時刻（monotonic）を返す"""
+        self._first_event.wait(timeout)
+        return self.first_event_at
 
     def purge_old_events(self, minutes: int = 30):
-        """古いイベントを削除してメモリを節約"""
-        cutoff = datetime.now() - timedelta(minutes=minutes)
+        """N分より古いバケットを破棄する（リングバッファのため通常は不要）"""
+        first, _ = self._window(minutes)
         with self._lock:
-            self._events = [e for e in self._events if e > cutoff]
+            for idx in range(self._size):
+                if self._slots[idx] < first:
+                    self._slots[idx] = -1
+                    self._counts[idx] = 0
 
     def start(self):
         """マウス・キーボード監視を開始"""
@@ -61,8 +243,15 @@ class PCMonitor:
         self._keyboard_listener.start()
 
     def stop(self):
-        """監視を停止"""
+        """監視を停止（集計済みの件数は残るため、start() で再開できる）"""
         if self._mouse_listener:
             self._mouse_listener.stop()
+            self._mouse_listener = None
         if self._keyboard_listener:
             self._keyboard_listener.stop()
+            self._keyboard_listener = None
+
+    @property
+    def listening(self) -> bool:
+        """マウス・キーボードのリスナーが動いているか"""
+        return self._mouse_listener is not None
@@ -0,0 +1,101 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+
+class PermanentError(Exception):
+    """リトライしても回復しないエラー（セレクタ不在・ログイン拒否など）"""
+
+
+class TransientError(Exception):
+    """時間をおけば回復し得るエラー（通信断・応答遅延など）"""
+
+
+async def _sleep(seconds: float):
+    """テスト時にモック可能な待機"""
+    await asyncio.sleep(seconds)
+
+
+@dataclass
+class RetryOutcome:
+    value: Any                    # 成功時の戻り値（失敗時はNone）
+    error: Optional[BaseException]
+    attempts: int
+    elapsed_ms: float
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class RetryPolicy:
+    """指数バックオフ + ジッター + 全体期限付きのリトライ方針
+
+    PermanentError（および permanent_errors に挙げた例外）は即座に打ち切り、
+    それ以外は一時的なエラーとして間隔を空けて再試行する。
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 1.0        # 初回リトライまでの待機秒数
+    max_delay: float = 30.0        # 待機秒数の上限
+    multiplier: float = 2.0
+    jitter: float = 0.5            # 待機秒数を ±jitter の割合でばらつかせる
+    deadline: Optional[float] = None   # 全試行の合計期限（秒）
+    permanent_errors: tuple = (PermanentError,)
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    @classmethod
+    def from_config(cls, retry_count: int, config: dict) -> "RetryPolicy":
+        """config.yaml の retry セクションから生成"""
+        return cls(
+            max_attempts=max(1, retry_count),
+            base_delay=config.get("base_delay_seconds", 1.0),
+            max_delay=config.get("max_delay_seconds", 30.0),
+            jitter=config.get("jitter", 0.5),
+            deadline=config.get("deadline_seconds"),
+        )
+
+    def is_permanent(self, error: BaseException) -> bool:
+        return isinstance(error, self.permanent_errors)
+
+    def delay_for(self, attempt: int) -> float:
+        """attempt回目（1始まり）の失敗後に待つ秒数"""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        if self.jitter:
+            delay *= 1 + self.jitter * (2 * self.rng.random() - 1)
+        return max(0.0, delay)
+
+    async def run(self, func: Callable[[int], Awaitable[Any]]) -> RetryOutcome:
+        """func(attempt) を成功するまで再試行し、結果と試行回数を返す"""
+        started = time.monotonic()
+        error: Optional[BaseException] = None
+        attempt = 0
+
+        while attempt < self.max_attempts:
+            attempt += 1
+            try:
+                if self.deadline is None:
+                    value = await func(attempt)
+                else:
+                    remaining = self.deadline - (time.monotonic() - started)
+                    value = await asyncio.wait_for(func(attempt), remaining)
+                return RetryOutcome(value, None, attempt, _elapsed_ms(started))
+            except Exception as e:
+                error = e
+            if self.is_permanent(error) or attempt >= self.max_attempts:
+                break
+
+            delay = self.delay_for(attempt)
+            if self.deadline is not None:
+                if time.monotonic() - started + delay >= self.deadline:
+                    break
+            await _sleep(delay)
+
+        return RetryOutcome(None, error, attempt, _elapsed_ms(started))
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.monotonic() - started) * 1000
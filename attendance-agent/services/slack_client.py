@@ -1,11 +1,47 @@
 from typing import Optional
 import sys
+import threading
+import time
+
+from services.retry_policy import PermanentError, TransientError
+
+ERROR_MESSAGE = "❌ 打刻に失敗しました。手動確認をお願いします（エラー: {error}）"
+DIGEST_HEADER = "📋 本日の通知まとめ"
+
+# 再送しても成功しないSlack APIのエラーコード（HTTP 200 + ok:false で返る）
+PERMANENT_API_ERRORS = {
+    "account_inactive",
+    "channel_not_found",
+    "invalid_auth",
+    "is_archived",
+    "missing_scope",
+    "msg_too_long",
+    "no_permission",
+    "not_authed",
+    "not_in_channel",
+    "token_revoked",
+}
+# chat_update できない（新しいメッセージとして送り直す）エラーコード
+UNEDITABLE_API_ERRORS = {"message_not_found", "cant_update_message", "edit_window_closed"}
+
+
+def _monotonic() -> float:
+    """テスト時にモック可能な単調増加時刻取得（秒）"""
+    return time.monotonic()
+
+
+class SlackRateLimited(TransientError):
+    """Slack APIのレート制限（HTTP 429）"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited (Retry-After: {retry_after}s)")
+        self.retry_after = retry_after
 
 
 class ConsoleNotifier:
     """コンソール出力による通知（フォールバック用）"""
 
-    def send(self, message: str) -> bool:
+    def send(self, message: str, coalesce_key: Optional[str] = None) -> bool:
         print(f"[勤怠通知] {message}", file=sys.stdout)
         return True
 
@@ -15,12 +51,20 @@ class ConsoleNotifier:
 
 
 class SlackNotifier:
-    """Slack APIによる通知サービス"""
+    """Slack APIによる通知サービス
+
+    coalesce_key 付きの通知は、同じキーの前回通知から
+    coalesce_window_minutes 以内であれば新規投稿せず前回のメッセージを
+    chat_update で書き換える（退勤時刻の更新を1件にまとめるため）。
+    """
 
-    def __init__(self, token: str, channel: str):
+    def __init__(self, token: str, channel: str, coalesce_window_minutes: float = 0):
         self._channel = channel
         self._client = None
         self._fallback = ConsoleNotifier()
+        self._coalesce_window = coalesce_window_minutes * 60
+        # coalesce_key -> (チャンネルID, メッセージts, 最終更新時刻)
+        self._coalesced: dict[str, tuple[str, str, float]] = {}
 
         if token:
             try:
@@ -29,18 +73,123 @@ class SlackNotifier:
             except Exception:
                 pass
 
-    def send(self, message: str) -> bool:
+    def send(self, message: str, coalesce_key: Optional[str] = None) -> bool:
         """メッセージ送信（失敗時はフォールバック）"""
-        if self._client is None:
-            return self._fallback.send(message)
-
         try:
-            self._client.chat_postMessage(channel=self._channel, text=message)
+            self.deliver(message, coalesce_key)
             return True
         except Exception:
             return False
 
+    def deliver(self, message: str, coalesce_key: Optional[str] = None):
+        """メッセージを送信し、失敗時は例外を送出する
+
+        レート制限は SlackRateLimited、再送しても成功しない応答
+        （チャンネル不在・認証エラーなど）は PermanentError、
+        それ以外（通信断など）は元の例外のまま送出する。
+        """
+        if self._client is None:
+            self._fallback.send(message)
+            return
+
+        from slack_sdk.errors import SlackApiError
+
+        try:
+            if coalesce_key is not None and self._coalesce_window > 0:
+                self._post_or_update(message, coalesce_key)
+            else:
+                self._client.chat_postMessage(channel=self._channel, text=message)
+        except SlackApiError as e:
+            status = getattr(e.response, "status_code", None)
+            if status == 429:
+                headers = getattr(e.response, "headers", None) or {}
+                raise SlackRateLimited(float(headers.get("Retry-After", 1))) from e
+            if _api_error_code(e) in PERMANENT_API_ERRORS or (
+                status is not None and 400 <= status < 500
+            ):
+                raise PermanentError(str(e)) from e
+            raise
+
+    def _post_or_update(self, message: str, coalesce_key: str):
+        """窓内なら前回のメッセージを書き換え、そうでなければ新規投稿する"""
+        from slack_sdk.errors import SlackApiError
+
+        now = _monotonic()
+        previous = self._coalesced.get(coalesce_key)
+        if previous is not None and now - previous[2] <= self._coalesce_window:
+            channel, ts, _ = previous
+            try:
+                self._client.chat_update(channel=channel, ts=ts, text=message)
+                self._coalesced[coalesce_key] = (channel, ts, now)
+                return
+            except SlackApiError as e:
+                if _api_error_code(e) not in UNEDITABLE_API_ERRORS:
+                    raise
+                # 削除済みなどで編集できなければ新規投稿に切り替える
+
+        response = self._client.chat_postMessage(channel=self._channel, text=message)
+        # chat_update にはチャンネルIDが必要（DM宛ての場合も応答のIDを使う）
+        self._coalesced[coalesce_key] = (
+            response.get("channel", self._channel),
+            response["ts"],
+            now,
+        )
+
     def send_error(self, error: str) -> bool:
         """エラー通知"""
-        message = f"❌ 打刻に失敗しました。手動確認をお願いします（エラー: {error}）"
-        return self.send(message)
+        return self.send(ERROR_MESSAGE.format(error=error))
+
+
+def _api_error_code(error) -> str:
+    """SlackApiError の応答からエラーコード（"channel_not_found" など）を取り出す"""
+    try:
+        return error.response.get("error", "") or ""
+    except Exception:
+        return ""
+
+
+class DigestNotifier:
+    """coalesce_key 付きの通知を溜めておき、1日の終わりにまとめて送る
+
+    キーのない通知（出勤・エラーなど）はそのまま notifier に渡す。
+    flush_digest をスケジューラの日次ジョブから呼ぶ。
+    """
+
+    def __init__(self, notifier):
+        self._notifier = notifier
+        self._lock = threading.Lock()
+        # coalesce_key -> (最新のメッセージ, 件数)
+        self._pending: dict[str, tuple[str, int]] = {}
+
+    def send(self, message: str, coalesce_key: Optional[str] = None) -> bool:
+        if coalesce_key is None:
+            return self._notifier.send(message)
+        with self._lock:
+            _, count = self._pending.get(coalesce_key, ("", 0))
+            self._pending[coalesce_key] = (message, count + 1)
+        return True
+
+    def send_error(self, error: str) -> bool:
+        return self._notifier.send_error(error)
+
+    def flush_digest(self) -> bool:
+        """溜めた通知をまとめて1件送る（何もなければ送らない）"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return True
+        lines = [DIGEST_HEADER]
+        for message, count in pending.values():
+            suffix = f"（{count}件をまとめました）" if count > 1 else ""
+            lines.append(f"・{message}{suffix}")
+        return self._notifier.send("\n".join(lines))
+
+    def start(self):
+        if hasattr(self._notifier, "start"):
+            self._notifier.start()
+
+    def stop(self):
+        # 停止時点で溜まっている分も送信キューに渡してから止める
+        self.flush_digest()
+        if hasattr(self._notifier, "stop"):
+            self._notifier.stop()
@@ -0,0 +1,25 @@
+import sqlite3
+from pathlib import Path
+
+# 他プロセスが書き込み中の場合に待つ最大ミリ秒数
+BUSY_TIMEOUT_MS = 5000
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """複数プロセスで共有するSQLiteファイルを開く
+
+    WALモードにして読み取りと書き込みが互いを待たないようにし、
+    書き込みの競合は busy_timeout の範囲で待つ。自動コミットで開くため、
+    複数文をまとめる場合は呼び出し側で BEGIN IMMEDIATE を発行する。
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -8,6 +8,9 @@ class StampResult:
     success: bool
     timestamp: str
     error: Optional[str]
+    elapsed_ms: float = 0.0   # 打刻処理全体の所要時間
+    warm: bool = False        # ウォームページ（ログイン済み）を使ったか
+    attempts: int = 0         # 試行回数（リトライを含む）
 
 
 class StamperInterface(ABC):
@@ -0,0 +1,41 @@
+import sys
+import time
+from typing import Optional
+
+
+class StartupReport:
+    """起動処理の各段階までの経過時間を記録する（-X importtime 風の表示）
+
+    enabled=False のときは何も記録・出力しない。
+    """
+
+    def __init__(self, enabled: bool = False, origin: Optional[float] = None):
+        self._enabled = enabled
+        self._origin = origin if origin is not None else time.monotonic()
+        self._marks: list[tuple[str, float]] = []
+
+    def mark(self, label: str, at: Optional[float] = None):
+        """段階の完了時刻を記録（at は time.monotonic() の値）"""
+        if self._enabled:
+            self._marks.append((label, at if at is not None else time.monotonic()))
+
+    def elapsed_ms(self, label: str) -> Optional[float]:
+        for name, at in self._marks:
+            if name == label:
+                return (at - self._origin) * 1000
+        return None
+
+    def format(self) -> str:
+        lines = ["startup: self [ms] | cumulative [ms] | phase"]
+        prev = self._origin
+        for label, at in self._marks:
+            lines.append(
+                f"startup: {(at - prev) * 1000:9.1f} | "
+                f"{(at - self._origin) * 1000:15.1f} | {label}"
+            )
+            prev = at
+        return "\n".join(lines)
+
+    def print(self):
+        if self._enabled:
+            print(self.format(), file=sys.stderr)
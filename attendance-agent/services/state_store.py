@@ -0,0 +1,138 @@
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from services.sqlite_util import connect
+
+# 永続化する打刻状態のキーと初期値
+PERSISTED_FIELDS = {
+    "clock_in_done": False,
+    "clock_in_time": None,
+    "last_clock_out_time": None,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS day_state (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    clock_in_done INTEGER NOT NULL,
+    clock_in_time TEXT,
+    last_clock_out_time TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (user_id, day)
+) WITHOUT ROWID;
+"""
+
+
+class StateStore:
+    """1日分の打刻状態（出勤済み・出勤時刻・最終退勤時刻）をSQLiteに保存する
+
+    クラッシュや再起動の後も当日の状態を復元し、出勤打刻を重複させない。
+    保存は (ユーザー, 日付) 単位の1行の上書きで、新しい日付を初めて
+    保存したときに retention_days より古い行を削除する。直近に読み書き
+    した1日分はメモリにも持ち、チェック毎の読み出しでファイルを読まない。
+    サーバーモードでは for_user() で接続を共有したユーザー別のストアを作る。
+    """
+
+    def __init__(self, path: str, user_id: str = "default", retention_days: int = 90):
+        self._path = path
+        self._user_id = user_id
+        self._retention_days = retention_days
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._current: Optional[tuple[str, dict]] = None   # (日付, 状態)
+        self._owner: Optional["StateStore"] = None           # 接続を持つストア
+
+    @classmethod
+    def from_config(cls, config: dict, user_id: str = "default") -> "StateStore":
+        """config.yaml の state_store セクションから生成"""
+        return cls(
+            path=config.get("path", ".attendance_state.db"),
+            user_id=user_id,
+            retention_days=config.get("retention_days", 90),
+        )
+
+    def for_user(self, user_id: str) -> "StateStore":
+        """同じデータベース接続を共有する、別ユーザー用のストアを返す"""
+        store = StateStore(self._path, user_id, self._retention_days)
+        store._owner = self._owner or self
+        store._lock = store._owner._lock
+        return store
+
+    def _open(self) -> sqlite3.Connection:
+        if self._owner is not None:
+            return self._owner._open()
+        if self._conn is None:
+            conn = connect(self._path)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def load(self, day: str) -> dict:
+        """指定日の状態を返す（保存がなければ初期状態）"""
+        with self._lock:
+            if self._current is not None and self._current[0] == day:
+                return dict(self._current[1])
+            row = self._open().execute(
+                "SELECT clock_in_done, clock_in_time, last_clock_out_time"
+                " FROM day_state WHERE user_id = ? AND day = ?",
+                (self._user_id, day),
+            ).fetchone()
+            if row is None:
+                state = dict(PERSISTED_FIELDS)
+            else:
+                state = {
+                    "clock_in_done": bool(row[0]),
+                    "clock_in_time": row[1],
+                    "last_clock_out_time": row[2],
+                }
+            self._current = (day, state)
+            return dict(state)
+
+    def save(self, day: str, state: dict):
+        """指定日の状態を保存する（state のうち永続化対象のキーのみ）"""
+        values = {key: state.get(key, default) for key, default in PERSISTED_FIELDS.items()}
+        with self._lock:
+            new_day = self._current is None or self._current[0] != day
+            if not new_day and self._current[1] == values:
+                return  # 変化がなければ書かない
+            conn = self._open()
+            conn.execute(
+                "INSERT OR REPLACE INTO day_state"
+                " (user_id, day, clock_in_done, clock_in_time, last_clock_out_time, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self._user_id,
+                    day,
+                    int(bool(values["clock_in_done"])),
+                    values["clock_in_time"],
+                    values["last_clock_out_time"],
+                    time.time(),
+                ),
+            )
+            self._current = (day, values)
+            if new_day:
+                self._compact_locked(day)
+
+    def compact(self, today: Optional[str] = None):
+        """retention_days より古い日の状態を削除する"""
+        with self._lock:
+            self._compact_locked(today or date.today().isoformat())
+
+    def _compact_locked(self, today: str):
+        cutoff = date.fromisoformat(today) - timedelta(days=self._retention_days)
+        self._open().execute(
+            "DELETE FROM day_state WHERE user_id = ? AND day < ?",
+            (self._user_id, cutoff.isoformat()),
+        )
+
+    def close(self):
+        """接続を閉じる（for_user() で作ったストアでは何もしない）"""
+        if self._owner is not None:
+            return
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,111 @@
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from services.config_loader import TimeRulesConfig
+
+# 打刻の時間帯（ゾーン）
+ZONE_CLOCK_IN = "clock_in"     # 退勤時刻まで: 未出勤なら出勤打刻
+ZONE_CLOCK_OUT = "clock_out"   # 退勤時刻〜打刻禁止時刻: 退勤打刻
+ZONE_LEAVE = "leave"           # 半休などの休暇中: 打刻しない
+ZONE_CLOSED = "closed"         # 打刻禁止時刻以降: 打刻しない
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(time_str: str) -> int:
+    """HH:MM形式（24:00を含む）を0:00からの分数に変換"""
+    h, m = map(int, time_str.split(":"))
+    return h * 60 + m
+
+
+class DailyTimeline:
+    """1日分の時刻ルールを区間の列にまとめたもの
+
+    time_rules（退勤時刻・打刻禁止時刻）と当日の休暇時間帯から、
+    0:00〜24:00 をゾーンの変わり目で区切った表を作る。判定は二分探索で
+    ゾーンを引くだけで、次にゾーンが変わる時刻（next_transition）も返せる。
+    休暇が退勤時刻を跨ぐ場合（午後休など）は休暇の開始時刻を退勤時刻とする。
+    """
+
+    __slots__ = ("day", "clock_out", "cutoff", "_starts", "_zones")
+
+    def __init__(
+        self,
+        day: date,
+        clock_out_time: str,
+        cutoff_time: str,
+        leave_intervals: tuple = (),
+    ):
+        self.day = day
+        self.cutoff = to_minutes(cutoff_time)
+        clock_out = to_minutes(clock_out_time)
+        leaves = []
+        for start, end in leave_intervals:
+            start, end = to_minutes(start), to_minutes(end)
+            if start < clock_out <= end:
+                clock_out = start   # 退勤時刻まで続く休暇 → 休暇開始時刻で退勤
+            else:
+                leaves.append((start, end))
+        self.clock_out = clock_out
+
+        bounds = sorted(
+            {0, clock_out, self.cutoff}
+            | {m for interval in leaves for m in interval}
+        )
+        self._starts: list[int] = []
+        self._zones: list[str] = []
+        for start in bounds:
+            if not 0 <= start < MINUTES_PER_DAY:
+                continue
+            zone = self._zone_of(start, leaves)
+            if not self._zones or self._zones[-1] != zone:
+                self._starts.append(start)
+                self._zones.append(zone)
+
+    def _zone_of(self, minute: int, leaves: list[tuple[int, int]]) -> str:
+        if minute >= self.cutoff:
+            return ZONE_CLOSED
+        if any(start <= minute < end for start, end in leaves):
+            return ZONE_LEAVE
+        if minute >= self.clock_out:
+            return ZONE_CLOCK_OUT
+        return ZONE_CLOCK_IN
+
+    def zone_at(self, minute: int) -> str:
+        """0:00からの分数が属するゾーン"""
+        return self._zones[bisect_right(self._starts, minute) - 1]
+
+    def zone(self, now: datetime) -> str:
+        """現在時刻が属するゾーン"""
+        return self.zone_at(now.hour * 60 + now.minute)
+
+    def next_transition(self, now: datetime) -> Optional[datetime]:
+        """now より後で次にゾーンが変わる時刻（当日中に変わらなければNone）"""
+        index = bisect_right(self._starts, now.hour * 60 + now.minute)
+        if index >= len(self._starts):
+            return None
+        return datetime.combine(self.day, time()) + timedelta(minutes=self._starts[index])
+
+    def segments(self) -> list[tuple[str, str]]:
+        """(開始時刻 HH:MM, ゾーン) の一覧（確認・ログ用）"""
+        return [(f"{m // 60:02d}:{m % 60:02d}", z) for m, z in zip(self._starts, self._zones)]
+
+
+@lru_cache(maxsize=256)
+def _compile(day: date, clock_out_time: str, cutoff_time: str, leaves: tuple) -> DailyTimeline:
+    return DailyTimeline(day, clock_out_time, cutoff_time, leaves)
+
+
+def timeline_for(day: date, rules, leave_intervals=None) -> DailyTimeline:
+    """その日の DailyTimeline を返す
+
+    rules は TimeRulesConfig か time_rules の dict。
+    (日付, 退勤時刻, 打刻禁止時刻, 休暇時間帯) ごとに1回だけ作り、
+    設定や日付が変わるまでは同じものを使い回す。
+    """
+    if not isinstance(rules, TimeRulesConfig):
+        rules = TimeRulesConfig.from_dict(rules)
+    leaves = tuple((i["start"], i["end"]) for i in leave_intervals or ())
+    return _compile(day, rules.clock_out_time, rules.cutoff_time, leaves)
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+import pytest
+from services.async_runner import AsyncRunner
+
+
+def test_run_returns_result():
+    """投入したコルーチンの結果が返ること"""
+    runner = AsyncRunner()
+    runner.start()
+
+    async def add(a, b):
+        await asyncio.sleep(0)
+        return a + b
+
+    try:
+        assert runner.run(add(1, 2)) == 3
+    finally:
+        runner.stop()
+
+
+def test_same_loop_across_runs():
+    """複数回の実行で同じイベントループ・スレッドが使われること"""
+    runner = AsyncRunner()
+    runner.start()
+
+    async def current():
+        return asyncio.get_running_loop(), threading.current_thread()
+
+    try:
+        loop1, thread1 = runner.run(current())
+        loop2, thread2 = runner.run(current())
+    finally:
+        runner.stop()
+    assert loop1 is loop2
+    assert thread1 is thread2
+    assert thread1 is not threading.current_thread()
+
+
+def test_run_propagates_exception():
+    """コルーチン内の例外が呼び出し元に伝播すること"""
+    runner = AsyncRunner()
+    runner.start()
+
+    async def fail():
+        raise ValueError("打刻失敗")
+
+    try:
+        with pytest.raises(ValueError):
+            runner.run(fail())
+    finally:
+        runner.stop()
+
+
+def test_run_before_start():
+    """開始前の実行はエラーになること"""
+    runner = AsyncRunner()
+    coro = asyncio.sleep(0)
+    with pytest.raises(RuntimeError):
+        runner.run(coro)
+    coro.close()
@@ -0,0 +1,102 @@
+# tests/test_browser_pool.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from services.browser_pool import BrowserPool, PooledStamper
+from services.stamper_interface import StampResult
+
+
+def _config(tmp_path):
+    return {
+        "browser": {
+            "headless": True,
+            "retry_count": 1,
+            "session_storage_path": str(tmp_path / "default.json"),
+            "selectors": {
+                "login_url": "https://example.com/login",
+                "username_field": "#username",
+                "password_field": "#password",
+                "login_button": "#login-btn",
+                "clock_in_button": "#clock-in",
+                "clock_out_button": "#clock-out",
+                "success_message": ".success-msg",
+            },
+        }
+    }
+
+
+def _shared_browser():
+    """new_context() ごとに別のコンテキストを返す共有ブラウザのモック"""
+    browser = MagicMock()
+    browser.new_context = AsyncMock(side_effect=lambda **kwargs: AsyncMock())
+    return browser
+
+
+async def test_users_get_own_context_and_session(tmp_path):
+    """ユーザーごとに共有ブラウザ上の別コンテキストとセッションファイルを使うこと"""
+    pool = BrowserPool("https://example.com", _config(tmp_path), session_dir=str(tmp_path))
+    browser = _shared_browser()
+    pool._chromium.get = AsyncMock(return_value=browser)
+    (tmp_path / "alice.json").write_text("{}")
+
+    alice = pool.stamper("alice", "alice", "pw")
+    bob = pool.stamper("bob", "bob", "pw")
+    assert pool.stamper("alice", "alice", "pw") is alice
+
+    await alice._browser._get_page()
+    await bob._browser._get_page()
+
+    assert browser.new_context.await_count == 2
+    first, second = browser.new_context.await_args_list
+    assert first.kwargs["storage_state"] == str(tmp_path / "alice.json")
+    assert "storage_state" not in second.kwargs  # 未ログインのユーザー
+    assert alice._browser._context is not bob._browser._context
+
+
+def test_session_path_is_file_safe(tmp_path):
+    """ユーザーIDのファイル名に使えない文字を置き換えること"""
+    pool = BrowserPool("https://example.com", _config(tmp_path), session_dir=".sessions")
+    assert pool.session_path("dom\\tanaka/01") == ".sessions/dom_tanaka_01.json"
+
+
+async def test_pooled_stamper_limits_concurrency():
+    """同時に打刻するのは枠の数まで、打刻後はコンテキストを閉じること"""
+    slots = asyncio.Semaphore(2)
+    running = 0
+    peak = 0
+
+    async def clock_in():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return StampResult(success=True, timestamp="09:00", error=None)
+
+    browsers = []
+    for _ in range(6):
+        browser = MagicMock()
+        browser.clock_in = clock_in
+        browser.release = AsyncMock()
+        browsers.append(browser)
+
+    results = await asyncio.gather(*(PooledStamper(b, slots).clock_in() for b in browsers))
+
+    assert all(r.success for r in results)
+    assert peak == 2
+    assert all(b.release.await_count == 1 for b in browsers)
+
+
+async def test_release_keeps_shared_browser(tmp_path):
+    """close() は自分のコンテキストだけを閉じ、共有ブラウザは閉じないこと"""
+    pool = BrowserPool("https://example.com", _config(tmp_path), session_dir=str(tmp_path))
+    browser = _shared_browser()
+    pool._chromium.get = AsyncMock(return_value=browser)
+    stamper = pool.stamper("alice", "alice", "pw")
+
+    await stamper._browser._get_page()
+    context = stamper._browser._context
+    await stamper.close()
+
+    context.close.assert_awaited_once()
+    browser.close.assert_not_called()
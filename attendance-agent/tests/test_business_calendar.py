@@ -0,0 +1,97 @@
+# tests/test_business_calendar.py
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from services.business_calendar import (
+    BUSINESS_DAY,
+    COMPANY_CLOSURE,
+    MAX_YEARS,
+    NATIONAL_HOLIDAY,
+    WEEKEND,
+    BusinessCalendar,
+)
+
+YEAR_END = {"name": "年末年始休業", "start": "12-29", "end": "01-03"}
+
+
+def test_year_table_kinds():
+    """通日ごとに土日・祝日・営業日が格納されること"""
+    table = BusinessCalendar().table(2026)
+    assert len(table.kinds) == 365
+    assert table.kinds[0] == NATIONAL_HOLIDAY            # 1/1 元日
+    assert table.kinds[1] == BUSINESS_DAY                # 1/2 金曜
+    assert table.kinds[2] == WEEKEND                     # 1/3 土曜
+    assert len(BusinessCalendar().table(2028).kinds) == 366
+
+
+def test_is_holiday_reasons():
+    """休日の理由が判定元ごとに返ること"""
+    cal = BusinessCalendar([YEAR_END])
+    assert cal.is_holiday(date(2026, 2, 21)) == (True, "土曜日")
+    assert cal.is_holiday(date(2026, 2, 22)) == (True, "日曜日")
+    assert cal.is_holiday(date(2026, 2, 11)) == (True, "建国記念の日")
+    assert cal.is_holiday(date(2026, 12, 29)) == (True, "年末年始休業")
+    assert cal.is_holiday(date(2026, 1, 1)) == (True, "元日")   # 祝日が優先
+    assert cal.is_holiday(date(2026, 1, 2)) == (True, "年末年始休業")
+    assert cal.is_holiday(date(2026, 2, 24)) == (False, "")
+
+
+def test_one_off_closure():
+    """年指定の休業日はその年だけ適用されること"""
+    cal = BusinessCalendar([{"name": "創立記念日", "start": "2026-06-01", "end": "2026-06-02"}])
+    assert cal.is_holiday(date(2026, 6, 1)) == (True, "創立記念日")
+    assert cal.is_holiday(date(2026, 6, 2)) == (True, "創立記念日")
+    assert cal.table(2026).kinds[cal.table(2026).index(date(2026, 6, 1))] == COMPANY_CLOSURE
+    assert cal.is_holiday(date(2027, 6, 1)) == (False, "")
+
+
+def test_invalid_closure():
+    with pytest.raises(ValueError):
+        BusinessCalendar([{"name": "x", "start": "2026/12/29"}])
+    with pytest.raises(ValueError):
+        BusinessCalendar([{"name": "x", "start": "02-30"}])
+
+
+def test_yearly_leap_day_closure():
+    """毎年の "02-29" は平年では 02-28 として扱い、例外にしないこと"""
+    cal = BusinessCalendar([{"name": "閏日休業", "start": "02-26", "end": "02-29"}])
+    assert cal.is_holiday(date(2026, 2, 27)) == (True, "閏日休業")
+    assert cal.is_holiday(date(2026, 3, 2)) == (False, "")
+    assert cal.is_holiday(date(2028, 2, 29)) == (True, "閏日休業")
+
+
+def test_next_business_day_across_year_end():
+    """年末年始休業を跨いで翌営業日を返すこと"""
+    cal = BusinessCalendar([YEAR_END])
+    assert cal.next_business_day(date(2026, 2, 20)) == date(2026, 2, 24)  # 土日と振替休日
+    assert cal.next_business_day(date(2026, 12, 28)) == date(2027, 1, 4)
+
+
+def test_business_days_in_month():
+    """月の営業日数を数えられること"""
+    cal = BusinessCalendar([YEAR_END])
+    assert cal.business_days_in_month(2026, 2) == 18
+    assert cal.business_days_in_month(2026, 12) == 20   # 平日23日 - 29〜31日
+    assert cal.business_days_between(date(2026, 12, 28), date(2027, 1, 5)) == 3
+
+
+def test_table_built_once_per_year():
+    """同じ年の表は1回だけ生成されること"""
+    cal = BusinessCalendar()
+    with patch.object(BusinessCalendar, "_build", wraps=cal._build) as build:
+        for day in range(1, 29):
+            cal.is_holiday(date(2026, 2, day))
+        assert build.call_count == 1
+        cal.is_holiday(date(2027, 1, 4))   # 年が変わったら新しい表を生成
+        assert build.call_count == 2
+
+
+def test_old_years_evicted():
+    """保持する表は MAX_YEARS 年分までであること"""
+    cal = BusinessCalendar()
+    for year in range(2020, 2020 + MAX_YEARS + 2):
+        cal.table(year)
+    assert len(cal._tables) == MAX_YEARS
+    assert 2020 + MAX_YEARS + 1 in cal._tables
@@ -50,3 +50,198 @@ def test_cache_works():
     result1 = service.is_holiday(d)
     result2 = service.is_holiday(d)
     assert result1 == result2
+
+
+def test_google_calendar_background_init():
+    """バックグラウンド初期化でもフォールバック判定できること"""
+    service = GoogleCalendarService(
+        credentials_path="nonexistent.json",
+        token_path="nonexistent.json",
+        holiday_calendar_id="test",
+        vacation_keywords=["有給"],
+        init_in_background=True,
+    )
+    is_holiday, reason = service.is_holiday(date(2026, 1, 1))
+    assert is_holiday is True
+    # 平日判定は初期化完了を待ってから行われる
+    assert service.is_holiday(date(2026, 2, 24)) == (False, "")
+    assert service._ready.is_set()
+
+
+def test_google_calendar_init_pending_not_cached():
+    """初期化が終わっていない間の平日判定はキャッシュされないこと"""
+    with patch.object(GoogleCalendarService, "_init_api"):
+        service = GoogleCalendarService(
+            credentials_path="nonexistent.json",
+            token_path="nonexistent.json",
+            vacation_keywords=["有給"],
+            init_in_background=True,
+        )
+    with patch("services.google_calendar.INIT_WAIT_SECONDS", 0):
+        assert service.is_holiday(date(2026, 2, 24)) == (False, "")
+    assert date(2026, 2, 24) not in service._cache
+
+
+class _FakeEvents:
+    """events().list(...).execute() の呼び出しを記録して応答を返すフェイク"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        return self
+
+    def execute(self):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _prefetch_service(fake, **kwargs):
+    service = GoogleCalendarService(
+        credentials_path="nonexistent.json",
+        token_path="nonexistent.json",
+        vacation_keywords=["有給", "休暇"],
+        **kwargs,
+    )
+    service._service = fake
+    return service
+
+
+def test_prefetch_builds_index_with_pagination():
+    """先読みをページングで1回取得し、以降はAPIを呼ばずに答えること"""
+    fake = _FakeEvents([
+        {
+            "items": [{
+                "id": "a", "summary": "有給",
+                "start": {"date": "2026-03-02"}, "end": {"date": "2026-03-04"},
+            }],
+            "nextPageToken": "p2",
+        },
+        {
+            "items": [{
+                "id": "b", "summary": "定例会議",
+                "start": {"dateTime": "2026-03-05T10:00:00+09:00"},
+                "end": {"dateTime": "2026-03-05T11:00:00+09:00"},
+            }],
+            "nextSyncToken": "sync-1",
+        },
+    ])
+    service = _prefetch_service(fake)
+
+    with patch("services.google_calendar._today", return_value=date(2026, 3, 2)):
+        assert service.is_holiday(date(2026, 3, 2)) == (True, "有給")
+        assert service.is_holiday(date(2026, 3, 3)) == (True, "有給")
+        assert service.is_holiday(date(2026, 3, 4)) == (False, "")  # 終了日は含まない
+        assert service.is_holiday(date(2026, 3, 5)) == (False, "")
+
+    assert len(fake.calls) == 2
+    assert "timeMin" in fake.calls[0]
+    assert fake.calls[1]["pageToken"] == "p2"
+    assert service._sync_token == "sync-1"
+
+
+def test_prefetch_incremental_sync_with_token():
+    """同期間隔経過後は同期トークンで差分のみ取得すること"""
+    fake = _FakeEvents([
+        {"items": [{
+            "id": "a", "summary": "有給",
+            "start": {"date": "2026-03-02"}, "end": {"date": "2026-03-03"},
+        }], "nextSyncToken": "sync-1"},
+        {"items": [
+            {"id": "a", "status": "cancelled"},
+            {"id": "c", "summary": "夏季休暇",
+             "start": {"date": "2026-03-10"}, "end": {"date": "2026-03-11"}},
+        ], "nextSyncToken": "sync-2"},
+    ])
+    service = _prefetch_service(fake, sync_interval_hours=1)
+
+    with patch("services.google_calendar._today", return_value=date(2026, 3, 2)):
+        with patch("services.google_calendar._monotonic", return_value=1000.0):
+            assert service.is_holiday(date(2026, 3, 2))[0] is True
+        with patch("services.google_calendar._monotonic", return_value=1000.0 + 3601):
+            assert service.is_holiday(date(2026, 3, 2)) == (False, "")
+            assert service.is_holiday(date(2026, 3, 10)) == (True, "夏季休暇")
+
+    assert fake.calls[1]["syncToken"] == "sync-1"
+    assert "timeMin" not in fake.calls[1]
+    assert service._sync_token == "sync-2"
+
+
+def test_prefetch_expired_sync_token_triggers_full_sync():
+    """同期トークン失効(410)時は全件を取り直すこと"""
+    gone = Exception("Gone")
+    gone.resp = MagicMock(status=410)
+    fake = _FakeEvents([
+        {"items": [], "nextSyncToken": "sync-1"},
+        gone,
+        {"items": [{
+            "id": "d", "summary": "有給",
+            "start": {"date": "2026-03-03"}, "end": {"date": "2026-03-04"},
+        }], "nextSyncToken": "sync-3"},
+    ])
+    service = _prefetch_service(fake, sync_interval_hours=1)
+
+    with patch("services.google_calendar._today", return_value=date(2026, 3, 2)):
+        with patch("services.google_calendar._monotonic", return_value=0.0):
+            assert service.is_holiday(date(2026, 3, 3)) == (False, "")
+        with patch("services.google_calendar._monotonic", return_value=7200.0):
+            assert service.is_holiday(date(2026, 3, 3)) == (True, "有給")
+
+    assert "timeMin" in fake.calls[2]
+    assert service._sync_token == "sync-3"
+
+
+def test_leave_intervals_from_events():
+    """半休イベントから休暇時間帯を求め、日毎に1回だけ計算すること"""
+    from services.keyword_matcher import KeywordMatcher
+
+    fake = _FakeEvents([{
+        "items": [
+            {"id": "a", "summary": "午前休",
+             "start": {"date": "2026-03-02"}, "end": {"date": "2026-03-03"}},
+            {"id": "b", "summary": "通院（時間休）",
+             "start": {"dateTime": "2026-03-03T15:00:00"},
+             "end": {"dateTime": "2026-03-03T17:30:00"}},
+            {"id": "c", "summary": "午後休",
+             "start": {"date": "2026-03-04"}, "end": {"date": "2026-03-05"}},
+            {"id": "d", "summary": "有給",
+             "start": {"date": "2026-03-05"}, "end": {"date": "2026-03-06"}},
+            {"id": "e", "summary": "午前休",
+             "start": {"dateTime": "2026-03-06T09:00:00"},
+             "end": {"dateTime": "2026-03-06T13:00:00"}},
+        ],
+        "nextSyncToken": "sync-1",
+    }])
+    service = _prefetch_service(fake)
+    service._matcher = KeywordMatcher({
+        "full_day": ["有給"],
+        "am_off": ["午前休"],
+        "pm_off": ["午後休"],
+        "half_day": ["時間休"],
+    })
+
+    with patch("services.google_calendar._today", return_value=date(2026, 3, 2)):
+        service.is_holiday(date(2026, 3, 2))
+        assert service.get_leave_intervals(date(2026, 3, 2)) == [
+            {"start": "00:00", "end": "13:00", "category": "am_off", "reason": "午前休"}
+        ]
+        with patch.object(service, "_events_on", wraps=service._events_on) as events_on:
+            service.get_leave_intervals(date(2026, 3, 2))
+            events_on.assert_not_called()
+        assert service.get_leave_intervals(date(2026, 3, 3)) == [
+            {"start": "15:00", "end": "17:30", "category": "half_day", "reason": "通院（時間休）"}
+        ]
+        assert service.get_leave_intervals(date(2026, 3, 4))[0]["start"] == "13:00"
+        assert service.get_leave_intervals(date(2026, 3, 4))[0]["end"] == "24:00"
+        assert service.get_leave_intervals(date(2026, 3, 5)) == []
+        # 時刻指定の午前休も始業前から休暇とする
+        assert service.get_leave_intervals(date(2026, 3, 6)) == [
+            {"start": "00:00", "end": "13:00", "category": "am_off", "reason": "午前休"}
+        ]
@@ -41,3 +41,18 @@ def test_calendar_check_workday():
     result = calendar_check_node(state, calendar_service=mock_cal)
     assert result["is_holiday"] is False
     assert result["holiday_reason"] is None
+
+
+def test_calendar_check_leave_intervals():
+    """打刻対象日は休暇時間帯を返し、休日は空にすること"""
+    leave = [{"start": "00:00", "end": "13:00", "category": "am_off", "reason": "午前休"}]
+    mock_cal = MagicMock()
+    mock_cal.is_holiday.return_value = (False, "")
+    mock_cal.get_leave_intervals.return_value = leave
+
+    result = calendar_check_node(_make_state(), calendar_service=mock_cal)
+    assert result["leave_intervals"] == leave
+
+    mock_cal.is_holiday.return_value = (True, "建国記念の日")
+    result = calendar_check_node(_make_state(), calendar_service=mock_cal)
+    assert result["leave_intervals"] == []
@@ -1,6 +1,18 @@
+import dataclasses
 import os
 import tempfile
-from services.config_loader import load_config
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from services.config_loader import (
+    DEFAULT_CONFIG,
+    ConfigError,
+    ConfigSnapshot,
+    as_snapshot,
+    load_config,
+)
 
 
 def test_load_config_defaults():
@@ -33,3 +45,72 @@ def test_load_config_file_not_found():
     config = load_config("nonexistent.yaml")
     assert "scheduler" in config
     assert config["scheduler"]["check_interval_minutes"] == 5
+
+
+def test_optional_features_off_by_default():
+    """config.yaml が無い既存環境の動作を変えないよう、追加機能は既定で無効なこと"""
+    config = load_config("nonexistent.yaml")
+    assert config["scheduler"]["event_driven"] is False
+    assert config["scheduler"]["sleep_off_hours"] is False
+    assert config["scheduler"]["dormant_on_holidays"] is False
+    assert config["slack"]["queue"]["enabled"] is False
+    assert config["calendar"]["cache"]["enabled"] is False
+    assert config["config_reload"]["enabled"] is False
+
+
+def test_repo_config_keeps_optional_features_off():
+    """同梱の config.yaml でも追加機能は無効のまま（既存環境の動作を変えない）"""
+    config = load_config(str(Path(__file__).resolve().parent.parent / "config.yaml"))
+    assert config["scheduler"]["event_driven"] is False
+    assert config["scheduler"]["sleep_off_hours"] is False
+    assert config["scheduler"]["dormant_on_holidays"] is False
+    assert config["slack"]["queue"]["enabled"] is False
+    assert config["calendar"]["cache"]["enabled"] is False
+    assert config["config_reload"]["enabled"] is False
+
+
+def test_load_config_does_not_share_defaults():
+    """読み込んだ設定を変更してもデフォルト設定や次の読み込みに漏れないこと"""
+    config = load_config("nonexistent.yaml")
+    config["working_state"]["window_minutes"] = 99
+    config["calendar"]["vacation_keywords"].append("特休")
+    assert DEFAULT_CONFIG["working_state"]["window_minutes"] == 15
+    assert "特休" not in load_config("nonexistent.yaml")["calendar"]["vacation_keywords"]
+
+
+def test_snapshot_typed_and_frozen():
+    """スナップショットは型付きの属性で引け、変更できないこと"""
+    snapshot = ConfigSnapshot.from_dict({"working_state": {"window_minutes": 20}})
+    assert snapshot.working_state.window_minutes == 20
+    assert snapshot.working_state.min_event_count == 2
+    assert snapshot.time_rules.cutoff_time == "22:00"
+    assert snapshot["browser"]["selectors"]["clock_in_button"] == "#clock-in"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.working_state.window_minutes = 5
+    with pytest.raises(TypeError):
+        snapshot["browser"]["headless"] = False
+
+
+@pytest.mark.parametrize(
+    "override",
+    [
+        {"working_state": {"window_minutes": 0}},
+        {"working_state": {"min_event_count": "2"}},
+        {"time_rules": {"cutoff_time": "25:00"}},
+        {"time_rules": {"clock_out_time": "22:30"}},
+        {"time_rules": {"clock_out_strategy": "sometimes"}},
+    ],
+)
+def test_snapshot_validation(override):
+    """不正な値は ConfigError になること"""
+    with pytest.raises(ConfigError):
+        ConfigSnapshot.from_dict(override)
+
+
+def test_as_snapshot():
+    """dict・スナップショット・current を持つもの・None を受け付けること"""
+    snapshot = ConfigSnapshot.from_dict({})
+    assert as_snapshot(snapshot) is snapshot
+    assert as_snapshot(SimpleNamespace(current=snapshot)) is snapshot
+    assert as_snapshot(None).time_rules == snapshot.time_rules
+    assert as_snapshot({"time_rules": {"cutoff_time": "21:00"}}).time_rules.cutoff_time == "21:00"
@@ -0,0 +1,57 @@
+# tests/test_config_watcher.py
+import os
+import time
+
+from services.config_watcher import ConfigWatcher
+
+
+def _write(path, window_minutes, mtime):
+    path.write_text(f"working_state:\n  window_minutes: {window_minutes}\n", encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_reload_swaps_snapshot(tmp_path):
+    """ファイルが更新されたら新しいスナップショットに差し替えて通知すること"""
+    path = tmp_path / "config.yaml"
+    _write(path, 15, 1_000_000_000)
+    watcher = ConfigWatcher(str(path))
+    received = []
+    watcher.subscribe(received.append)
+    before = watcher.current
+
+    assert watcher.check() is False  # 更新なし
+    _write(path, 20, 2_000_000_000)
+    assert watcher.check() is True
+    assert watcher.current.working_state.window_minutes == 20
+    assert received == [watcher.current]
+    assert before.working_state.window_minutes == 15  # 古いスナップショットは変わらない
+
+
+def test_invalid_config_keeps_previous_snapshot(tmp_path):
+    """不正な値や書きかけのYAMLでは変更前のスナップショットを使い続けること"""
+    path = tmp_path / "config.yaml"
+    _write(path, 15, 1_000_000_000)
+    watcher = ConfigWatcher(str(path))
+    before = watcher.current
+
+    _write(path, 0, 2_000_000_000)
+    assert watcher.check() is False
+    path.write_text("working_state: [\n", encoding="utf-8")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    assert watcher.check() is False
+    assert watcher.current is before
+
+
+def test_start_stop(tmp_path):
+    """監視スレッドを開始・停止できること"""
+    path = tmp_path / "config.yaml"
+    _write(path, 15, 1_000_000_000)
+    watcher = ConfigWatcher(str(path), interval_seconds=0.01)
+    watcher.start()
+    _write(path, 30, 2_000_000_000)
+    for _ in range(200):
+        if watcher.current.working_state.window_minutes == 30:
+            break
+        time.sleep(0.01)
+    watcher.stop()
+    assert watcher.current.working_state.window_minutes == 30
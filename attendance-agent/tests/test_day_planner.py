@@ -0,0 +1,81 @@
+# tests/test_day_planner.py
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+from schedulers.day_planner import DayPlanner
+from services.google_calendar import LocalCalendarService
+
+CONFIG = {"time_rules": {"clock_out_time": "18:00", "cutoff_time": "22:00"}}
+
+
+def test_sleeps_after_cutoff_until_next_business_day():
+    """打刻禁止時刻以降は次の営業日の0:00まで止めること（週末を飛ばす）"""
+    planner = DayPlanner(CONFIG, LocalCalendarService())
+    # 2026-02-27 は金曜日
+    assert planner.next_wake(datetime(2026, 2, 27, 22, 5)) == datetime(2026, 3, 2)
+    assert planner.next_wake(datetime(2026, 2, 27, 18, 30)) is None
+
+
+def test_sleeps_on_holiday():
+    """休日は次の営業日の0:00まで止めること"""
+    planner = DayPlanner(CONFIG, LocalCalendarService())
+    # 2026-02-23 は天皇誕生日（月曜日）
+    assert planner.next_wake(datetime(2026, 2, 23, 10, 0)) == datetime(2026, 2, 24)
+
+
+def test_sleeps_until_leave_ends():
+    """半休の時間帯は休暇が明けるまで止めること"""
+    calendar = MagicMock()
+    calendar.last_lookup_failed = False
+    calendar.is_holiday.return_value = (False, "")
+    calendar.get_leave_intervals.return_value = [
+        {"start": "00:00", "end": "13:00", "category": "am_off", "reason": "午前休"}
+    ]
+    planner = DayPlanner(CONFIG, calendar)
+    assert planner.next_wake(datetime(2026, 2, 24, 9, 0)) == datetime(2026, 2, 24, 13, 0)
+    assert planner.next_wake(datetime(2026, 2, 24, 13, 0)) is None
+    calendar.get_leave_intervals.assert_called_with(date(2026, 2, 24))
+
+
+def test_calendar_consulted_once_per_day():
+    """同じ日のうちはカレンダーに問い合わせ直さないこと"""
+    calendar = MagicMock()
+    calendar.last_lookup_failed = False
+    calendar.is_holiday.return_value = (False, "")
+    calendar.get_leave_intervals.return_value = []
+    planner = DayPlanner(CONFIG, calendar)
+    for hour in (9, 12, 18, 21):
+        planner.next_wake(datetime(2026, 2, 24, hour, 0))
+        planner.dormant_until(datetime(2026, 2, 24, hour, 0))
+    assert calendar.is_holiday.call_count == 1
+    assert calendar.get_leave_intervals.call_count == 1
+
+    planner.next_wake(datetime(2026, 2, 25, 9, 0))
+    assert calendar.is_holiday.call_count == 2
+
+
+def test_failed_lookup_is_not_cached():
+    """カレンダーの取得に失敗した日は、次のチェックで問い合わせ直すこと"""
+    calendar = MagicMock()
+    calendar.last_lookup_failed = True
+    calendar.is_holiday.return_value = (False, "")
+    calendar.get_leave_intervals.return_value = []
+    planner = DayPlanner(CONFIG, calendar)
+    planner.next_wake(datetime(2026, 2, 24, 9, 0))
+    planner.next_wake(datetime(2026, 2, 24, 9, 5))
+    assert calendar.is_holiday.call_count == 2
+
+    calendar.last_lookup_failed = False
+    planner.next_wake(datetime(2026, 2, 24, 9, 10))
+    planner.next_wake(datetime(2026, 2, 24, 9, 15))
+    assert calendar.is_holiday.call_count == 3
+
+
+def test_dormant_until_next_midnight_on_holiday():
+    """休日は翌日の0:00まで休眠し、営業日は休眠しないこと"""
+    planner = DayPlanner(CONFIG, LocalCalendarService(), wake_daily=True)
+    # 2026-02-28 は土曜日
+    assert planner.dormant_until(datetime(2026, 2, 28, 10, 0)) == datetime(2026, 3, 1)
+    assert planner.dormant_until(datetime(2026, 3, 2, 10, 0)) is None
+    # wake_daily では金曜の打刻禁止時刻以降も月曜まで飛ばさず翌日に起きる
+    assert planner.next_wake(datetime(2026, 2, 27, 22, 5)) == datetime(2026, 2, 28)
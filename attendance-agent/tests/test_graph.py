@@ -1,10 +1,16 @@
 # tests/test_graph.py
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from graph.checkpointer import LatestCheckpointSaver
 from graph.graph import (
     route_after_working_check,
     route_after_calendar_check,
     route_after_time_gate,
     build_graph,
 )
+from services.google_calendar import LocalCalendarService
+from services.stamper_interface import StampResult
 
 
 def _make_state(**overrides):
@@ -65,3 +71,124 @@ def test_build_graph():
     """グラフが正常にビルドできること"""
     graph = build_graph()
     assert graph is not None
+
+
+def test_route_working_check_clock_out_pending():
+    """非稼働でも退勤打刻待ちならcalendar_checkへ"""
+    state = _make_state(is_working=False, clock_out_pending=True)
+    assert route_after_working_check(state) == "calendar_check"
+
+
+async def test_compiled_graph_carries_state_per_thread(monkeypatch):
+    """コンパイル済みグラフを使い回し、同じthread_idでは打刻状態を引き継ぐこと"""
+    import graph.nodes.time_gate_node as time_gate_module
+    import graph.nodes.state_update_node as state_update_module
+    from services.dummy_stamper import DummyStamper
+    from services.google_calendar import LocalCalendarService
+
+    monkeypatch.setattr(time_gate_module, "_now", lambda: datetime(2026, 2, 24, 9, 30))
+    monkeypatch.setattr(state_update_module, "_today_str", lambda: "2026-02-24")
+
+    monitor = MagicMock()
+    monitor.is_working.return_value = True
+    monitor.get_recent_events.return_value = []
+    monitor.last_activity_time.return_value = datetime(2026, 2, 24, 9, 29)
+    notifier = MagicMock()
+    config = {
+        "working_state": {"window_minutes": 15, "min_event_count": 2},
+        "time_rules": {"clock_out_time": "18:00", "cutoff_time": "22:00"},
+    }
+    checkpointer = LatestCheckpointSaver()
+    store = MagicMock()
+    graph = build_graph(
+        monitor=monitor,
+        calendar_service=LocalCalendarService(),
+        browser=DummyStamper(),
+        notifier=notifier,
+        config=config,
+        store=store,
+        checkpointer=checkpointer,
+    )
+    thread = {"configurable": {"thread_id": "2026-02-24"}}
+
+    first = await graph.ainvoke(_make_state(today="2026-02-24"), thread)
+    assert first["action_taken"] == "clock_in"
+    assert first["clock_in_done"] is True
+    store.save.assert_called_once()
+
+    # 2回目はチェックごとの項目だけを渡す
+    second = await graph.ainvoke(
+        {"today": "2026-02-24", "action_taken": None, "error_message": None}, thread
+    )
+    assert second["action_taken"] == "skipped"
+    assert second["clock_in_time"] == first["clock_in_time"]
+    notifier.send.assert_called_once()
+    # 保持するのは最新のチェックポイントだけ
+    assert len(checkpointer.storage["2026-02-24"][""]) == 1
+    assert graph.get_state(thread).values["clock_in_done"] is True
+
+
+async def test_final_idle_clock_out_after_work_leaves_window(monkeypatch):
+    """final_idle: 退勤打刻後に作業し、操作が判定窓から外れた後のチェックで打ち直すこと"""
+    import graph.nodes.time_gate_node as time_gate_module
+    import graph.nodes.state_update_node as state_update_module
+
+    now = {"value": datetime(2026, 2, 24, 20, 10)}
+    monkeypatch.setattr(time_gate_module, "_now", lambda: now["value"])
+    monkeypatch.setattr(state_update_module, "_today_str", lambda: "2026-02-24")
+
+    monitor = MagicMock()
+    monitor.is_working.return_value = True
+    monitor.get_recent_events.return_value = [
+        datetime(2026, 2, 24, 20, 5), datetime(2026, 2, 24, 20, 9)
+    ]
+    monitor.last_activity_time.return_value = datetime(2026, 2, 24, 20, 9)
+    browser = MagicMock()
+    browser.clock_out = AsyncMock(
+        return_value=StampResult(success=True, timestamp="20:25", error=None)
+    )
+    config = {
+        "working_state": {"window_minutes": 10, "min_event_count": 2},
+        "time_rules": {
+            "clock_out_time": "18:00",
+            "cutoff_time": "22:00",
+            "clock_out_strategy": "final_idle",
+        },
+    }
+    graph = build_graph(
+        monitor=monitor,
+        calendar_service=LocalCalendarService(),
+        browser=browser,
+        notifier=MagicMock(),
+        config=config,
+        store=MagicMock(),
+        checkpointer=LatestCheckpointSaver(),
+    )
+    thread = {"configurable": {"thread_id": "2026-02-24"}}
+    per_check = {"today": "2026-02-24", "action_taken": None, "error_message": None}
+
+    first = await graph.ainvoke(
+        _make_state(
+            today="2026-02-24",
+            clock_in_done=True,
+            clock_in_time="09:00",
+            last_clock_out_time="19:15",
+            clock_out_pending=False,
+        ),
+        thread,
+    )
+    assert first["clock_out_pending"] is True
+    assert first["action_taken"] == "skipped"  # まだ作業中
+
+    # 作業終了から判定窓以上経ち、操作が窓から外れた
+    now["value"] = datetime(2026, 2, 24, 20, 25)
+    monitor.is_working.return_value = False
+    monitor.get_recent_events.return_value = []
+    second = await graph.ainvoke(per_check, thread)
+    assert second["action_taken"] == "clock_out"
+    assert second["last_clock_out_time"] == "20:25"
+    assert second["clock_out_pending"] is False
+
+    third = await graph.ainvoke(per_check, thread)
+    assert third["action_taken"] is None
+    browser.clock_out.assert_awaited_once()
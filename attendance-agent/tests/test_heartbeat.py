@@ -0,0 +1,127 @@
+# tests/test_heartbeat.py
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from graph.nodes.working_state_node import working_state_node
+from services.heartbeat import (
+    HeartbeatError,
+    HeartbeatReceiver,
+    HeartbeatSender,
+    RemoteMonitor,
+    decode_heartbeat,
+    encode_heartbeat,
+)
+
+NOW = 29_000_000  # UNIX時刻の分
+
+
+def test_encode_decode_roundtrip():
+    """パケットの往復で内容が変わらず、件数は255で頭打ちになること"""
+    packet = encode_heartbeat("田中", 7, NOW, [0, 3, 60, 300])
+    heartbeat = decode_heartbeat(packet)
+    assert heartbeat.user_id == "田中"
+    assert heartbeat.seq == 7
+    assert heartbeat.end_minute == NOW
+    assert list(heartbeat.counts) == [0, 3, 60, 255]
+    assert len(packet) == 14 + len("田中".encode()) + 4
+
+
+def test_signed_packets():
+    """secret 指定時は署名のない・改ざんされたパケットを拒否すること"""
+    secret = b"s3cret"
+    packet = encode_heartbeat("alice", 1, NOW, [5], secret=secret)
+    assert decode_heartbeat(packet, secret).counts == bytes([5])
+
+    with pytest.raises(HeartbeatError):
+        decode_heartbeat(encode_heartbeat("alice", 1, NOW, [5]), secret)
+    tampered = packet[:-9] + bytes([60]) + packet[-8:]
+    with pytest.raises(HeartbeatError):
+        decode_heartbeat(tampered, secret)
+
+
+def test_malformed_packets_rejected():
+    """壊れたパケットは数えて捨てること"""
+    remote = RemoteMonitor()
+    assert remote.ingest(b"KH\x01") is False
+    assert remote.ingest(encode_heartbeat("alice", 1, NOW, [1, 2])[:-1]) is False
+    assert remote.rejected == 2
+    assert remote.users() == []
+
+
+def test_redundancy_covers_lost_packets():
+    """途中のパケットが落ちても次のパケットで件数が埋まること"""
+    remote = RemoteMonitor()
+    history = [10, 20, 30, 40, 50]
+    # 毎分、直近3分を送る。NOW-1 のパケットは届かなかった
+    for end in (NOW - 2, NOW):
+        counts = history[end - NOW + 2:end - NOW + 5]
+        remote.ingest(encode_heartbeat("alice", end, end, counts))
+    # 古いパケットが遅れて届いても結果は変わらない
+    remote.ingest(encode_heartbeat("alice", 0, NOW - 2, history[:3]))
+
+    user = remote.for_user("alice")
+    with patch("services.heartbeat._now_minute", return_value=NOW):
+        assert user.count_recent_events(5) == sum(history)
+        assert user.count_recent_events(2) == 40 + 50
+
+
+def test_remote_monitor_drives_working_state_node():
+    """RemoteMonitor のユーザー表示で working_state_node が判定できること"""
+    remote = RemoteMonitor()
+    remote.record("alice", NOW - 20, bytes([30]))   # 窓の外
+    remote.record("alice", NOW, bytes([1, 0, 2, 0]))
+    config = {"working_state": {"window_minutes": 15, "min_event_count": 3}}
+
+    with patch("services.heartbeat._now_minute", return_value=NOW):
+        result = working_state_node({}, monitor=remote.for_user("alice"), config=config)
+        idle = working_state_node({}, monitor=remote.for_user("bob"), config=config)
+
+    assert result["is_working"] is True
+    assert len(result["operation_log"]) == 3
+    assert result["last_activity_time"] == time.strftime("%H:%M", time.localtime((NOW - 1) * 60))
+    assert idle["is_working"] is False
+    assert idle["last_activity_time"] is None
+
+
+def test_sender_to_receiver_over_udp():
+    """コレクタの送信をサーバーが受信して取り込むこと（操作がなければ送らない）"""
+    remote = RemoteMonitor(secret=b"k")
+    receiver = HeartbeatReceiver(remote, host="127.0.0.1", port=0)
+    receiver.start()
+    monitor = MagicMock()
+    sender = HeartbeatSender(
+        monitor, "alice", receiver.address, redundancy_minutes=3, secret=b"k"
+    )
+    try:
+        monitor.minute_counts.return_value = [0, 0, 0]
+        assert sender.send_once() is False
+
+        monitor.minute_counts.return_value = [0, 4, 2]
+        with patch("services.heartbeat._now_minute", return_value=NOW):
+            assert sender.send_once() is True
+            deadline = time.monotonic() + 2
+            while not remote.users() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert remote.for_user("alice").count_recent_events(15) == 6
+    finally:
+        sender.stop()
+        receiver.stop()
+
+
+def test_unsigned_receiver_binds_loopback_only():
+    """署名なしでは 0.0.0.0 を指定しても 127.0.0.1 でだけ待ち受けること"""
+    receiver = HeartbeatReceiver(RemoteMonitor(), host="0.0.0.0", port=0)
+    receiver.start()
+    try:
+        assert receiver.address[0] == "127.0.0.1"
+    finally:
+        receiver.stop()
+
+    receiver = HeartbeatReceiver(RemoteMonitor(secret=b"k"), host="0.0.0.0", port=0)
+    receiver.start()
+    try:
+        assert receiver.address[0] == "0.0.0.0"
+    finally:
+        receiver.stop()
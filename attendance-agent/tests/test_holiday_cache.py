@@ -0,0 +1,132 @@
+# tests/test_holiday_cache.py
+from datetime import date
+from unittest.mock import patch
+
+from services.google_calendar import GoogleCalendarService
+from services.holiday_cache import HolidayCache
+
+
+def test_put_and_get(tmp_path):
+    """保存した判定結果を判定元を指定して取り出せること"""
+    cache = HolidayCache(str(tmp_path / "holidays.db"), ["有給"])
+    cache.put(date(2026, 1, 1), "jpholiday", (True, "元日"))
+
+    assert cache.get(date(2026, 1, 1), "weekend", "jpholiday") == (True, "元日")
+    assert cache.get(date(2026, 1, 1), "google") is None
+    assert cache.get(date(2026, 1, 2), "jpholiday") is None
+
+
+def test_shared_across_instances(tmp_path):
+    """別インスタンス（別プロセス相当）から同じ結果を読めること"""
+    path = str(tmp_path / "holidays.db")
+    writer = HolidayCache(path, ["有給"])
+    reader = HolidayCache(path, ["有給"])
+    writer.put(date(2026, 3, 2), "google", (True, "有給休暇"))
+
+    assert reader.get(date(2026, 3, 2), "google") == (True, "有給休暇")
+
+
+def test_ttl_expiry(tmp_path):
+    """有効期限を過ぎた結果は返さず、土日は期限なしであること"""
+    cache = HolidayCache(str(tmp_path / "holidays.db"), ["有給"], ttl_hours={"google": 1})
+    with patch("services.holiday_cache._now", return_value=1000.0):
+        cache.put(date(2026, 3, 2), "google", (False, ""))
+        cache.put(date(2026, 3, 7), "weekend", (True, "土曜日"))
+
+    with patch("services.holiday_cache._now", return_value=1000.0 + 3599):
+        assert cache.get(date(2026, 3, 2), "google") == (False, "")
+    with patch("services.holiday_cache._now", return_value=1000.0 + 3601):
+        assert cache.get(date(2026, 3, 2), "google") is None
+        assert cache.get(date(2026, 3, 7), "weekend") == (True, "土曜日")
+        cache.purge_expired()
+        assert cache.get(date(2026, 3, 7), "weekend") == (True, "土曜日")
+
+
+def test_keyword_change_invalidates_google_results(tmp_path):
+    """有給キーワードが変わったらgoogle由来の結果だけを破棄すること"""
+    path = str(tmp_path / "holidays.db")
+    old = HolidayCache(path, ["有給"])
+    old.put(date(2026, 3, 2), "google", (False, ""))
+    old.put(date(2026, 1, 1), "jpholiday", (True, "元日"))
+    old.close()
+
+    same = HolidayCache(path, ["有給"])
+    assert same.get(date(2026, 3, 2), "google") == (False, "")
+    same.close()
+
+    changed = HolidayCache(path, ["有給", "リフレッシュ"])
+    assert changed.get(date(2026, 3, 2), "google") is None
+    assert changed.get(date(2026, 1, 1), "jpholiday") == (True, "元日")
+
+
+def test_lazy_open(tmp_path):
+    """生成時にはファイルを開かないこと"""
+    path = tmp_path / "holidays.db"
+    cache = HolidayCache(str(path), ["有給"])
+    assert not path.exists()
+    cache.get(date(2026, 1, 1), "jpholiday")
+    assert path.exists()
+
+
+def test_unusable_path_disables_cache(tmp_path):
+    """開けないパスでも判定を妨げないこと"""
+    blocker = tmp_path / "file"
+    blocker.write_text("x")
+    cache = HolidayCache(str(blocker / "holidays.db"), ["有給"])
+
+    cache.put(date(2026, 1, 1), "jpholiday", (True, "元日"))
+    assert cache.get(date(2026, 1, 1), "jpholiday") is None
+
+
+def test_google_calendar_reads_disk_cache(tmp_path):
+    """未同期の日付はディスクの有給判定を使いAPIを呼ばないこと"""
+    cache = HolidayCache(str(tmp_path / "holidays.db"), ["有給"])
+    cache.put(date(2026, 3, 2), "google", (True, "有給"))
+    service = GoogleCalendarService(
+        credentials_path="nonexistent.json",
+        token_path="nonexistent.json",
+        vacation_keywords=["有給"],
+        holiday_cache=cache,
+    )
+    service._service = object()
+    with patch.object(GoogleCalendarService, "_check_google_calendar") as check, \
+         patch.object(GoogleCalendarService, "_ensure_synced") as ensure_synced:
+        assert service.is_holiday(date(2026, 3, 2)) == (True, "有給")
+        check.assert_not_called()
+        # 先読み・差分同期はディスクキャッシュで答えた後もバックグラウンドで始まる
+        service._sync_thread.join(timeout=1)
+        ensure_synced.assert_called_once()
+
+
+def test_scopes_are_isolated(tmp_path):
+    """同じファイルでも別ユーザー・別カレンダーの結果は返さないこと"""
+    path = str(tmp_path / "holidays.db")
+    tanaka = HolidayCache(path, ["有給"], scope="tanaka:ja.japanese#holiday")
+    suzuki = HolidayCache(path, ["有給", "リフレッシュ"], scope="suzuki:ja.japanese#holiday")
+    tanaka.put(date(2026, 3, 2), "google", (True, "有給"))
+
+    assert suzuki.get(date(2026, 3, 2), "google") is None
+    suzuki.put(date(2026, 3, 2), "google", (False, ""))
+    assert tanaka.get(date(2026, 3, 2), "google") == (True, "有給")
+    assert suzuki.get(date(2026, 3, 2), "google") == (False, "")
+
+
+def test_legacy_schema_is_rebuilt(tmp_path):
+    """scope 列の無い旧形式のファイルは作り直して使えること"""
+    import sqlite3
+
+    path = str(tmp_path / "holidays.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE holidays (day TEXT NOT NULL, source TEXT NOT NULL,"
+        " is_holiday INTEGER NOT NULL, reason TEXT NOT NULL, expires_at REAL,"
+        " PRIMARY KEY (day, source)) WITHOUT ROWID"
+    )
+    conn.execute("INSERT INTO holidays VALUES ('2026-03-02', 'google', 1, '有給', NULL)")
+    conn.commit()
+    conn.close()
+
+    cache = HolidayCache(path, ["有給"], scope="tanaka:")
+    assert cache.get(date(2026, 3, 2), "google") is None
+    cache.put(date(2026, 3, 2), "google", (False, ""))
+    assert cache.get(date(2026, 3, 2), "google") == (False, "")
@@ -0,0 +1,273 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock
+
+import pytest
+from services.http_stamper import HttpStamper
+from services.stamper_interface import StampResult
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """ログインと打刻APIだけを持つスタンドインの勤怠システム"""
+
+    password = "secret"
+    stamps: list = []
+    logins: list = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/login":
+            self._reply(200, b"<form>login</form>")
+        else:
+            self._reply(200, b"attendance")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        if self.path == "/login":
+            self.logins.append(body)
+            if f"password={self.password}" in body:
+                self._reply(302, headers={
+                    "Location": "/", "Set-Cookie": "sid=ok; Path=/",
+                })
+            else:
+                self._reply(302, headers={"Location": "/login"})
+        elif self.path.startswith("/stamp"):
+            if "sid=ok" not in self.headers.get("Cookie", ""):
+                self._reply(302, headers={"Location": "/login"})
+                return
+            self.stamps.append(self.path)
+            self._reply(200, "打刻しました".encode())
+        else:
+            self._reply(404)
+
+
+@pytest.fixture
+def site():
+    handler = type("Handler", (_StandInHandler,), {"stamps": [], "logins": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    host, port = server.server_address
+    yield handler, f"http://{host}:{port}"
+    server.shutdown()
+
+
+def _config(tmp_path, **http):
+    return {
+        "browser": {
+            "headless": True,
+            "retry_count": 1,
+            "session_storage_path": str(tmp_path / "session.json"),
+            "http": {"success_text": "打刻しました", **http},
+            "selectors": {},
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_http_clock_in_logs_in_and_stamps(site, tmp_path):
+    """未ログイン時はログインしてから打刻すること"""
+    handler, base_url = site
+    stamper = HttpStamper(base_url, "user", "secret", _config(tmp_path))
+    try:
+        result = await stamper.clock_in()
+    finally:
+        await stamper.close()
+
+    assert result.success is True
+    assert result.timestamp != ""
+    assert handler.stamps == ["/stamp?kind=in"]
+    assert len(handler.logins) == 1
+    # Cookieがstorage_state形式で保存されること
+    state = json.loads((tmp_path / "session.json").read_text(encoding="utf-8"))
+    assert [c["name"] for c in state["cookies"]] == ["sid"]
+
+
+@pytest.mark.asyncio
+async def test_http_reuses_saved_cookies(site, tmp_path):
+    """保存済みCookieを再利用し、再ログインしないこと"""
+    handler, base_url = site
+    first = HttpStamper(base_url, "user", "secret", _config(tmp_path))
+    await first.clock_in()
+    await first.close()
+
+    second = HttpStamper(base_url, "user", "secret", _config(tmp_path))
+    try:
+        result = await second.clock_out()
+        result2 = await second.clock_out()
+    finally:
+        await second.close()
+
+    assert result.success is True and result2.success is True
+    assert handler.stamps == ["/stamp?kind=in", "/stamp?kind=out", "/stamp?kind=out"]
+    assert len(handler.logins) == 1
+
+
+@pytest.mark.asyncio
+async def test_http_login_rejected_without_fallback(site, tmp_path):
+    """ログイン拒否時はエラーを返すこと"""
+    handler, base_url = site
+    stamper = HttpStamper(base_url, "user", "wrong", _config(tmp_path))
+    try:
+        result = await stamper.clock_in()
+    finally:
+        await stamper.close()
+
+    assert result.success is False
+    assert "ログイン" in result.error
+    assert handler.stamps == []
+
+
+@pytest.mark.asyncio
+async def test_http_falls_back_to_browser(site, tmp_path):
+    """HTTP打刻に失敗したらフォールバックで打刻すること"""
+    handler, base_url = site
+    fallback = AsyncMock()
+    fallback.clock_in.return_value = StampResult(success=True, timestamp="09:00", error=None)
+    stamper = HttpStamper(
+        base_url, "user", "secret", _config(tmp_path, clock_in_path="/missing"),
+        fallback=fallback,
+    )
+    try:
+        result = await stamper.clock_in()
+    finally:
+        await stamper.close()
+
+    assert result.success is True
+    assert result.timestamp == "09:00"
+    fallback.clock_in.assert_awaited_once()
+    fallback.close.assert_awaited_once()
+
+
+class _ExpiredSessionHandler(_StandInHandler):
+    """セッション切れでも 200 でログイン画面を返すシステム"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/login":
+            self.logins.append("")
+        self._reply(200, b'<form><input type="password" name="password"></form>')
+
+
+@pytest.mark.asyncio
+async def test_http_login_page_with_200_is_not_success(tmp_path):
+    """200 でもログイン画面が返ったら成功とせず、フォールバックで打刻すること"""
+    handler = type("Handler", (_ExpiredSessionHandler,), {"stamps": [], "logins": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    ).start()
+    host, port = server.server_address
+    fallback = AsyncMock()
+    fallback.clock_in.return_value = StampResult(success=True, timestamp="09:00", error=None)
+    stamper = HttpStamper(
+        f"http://{host}:{port}", "user", "secret", _config(tmp_path), fallback=fallback
+    )
+    try:
+        result = await stamper.clock_in()
+    finally:
+        await stamper.close()
+        server.shutdown()
+
+    assert result.timestamp == "09:00"
+    fallback.clock_in.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_http_requires_success_text(site, tmp_path):
+    """success_text が未設定なら 2xx でも成功とみなさないこと"""
+    handler, base_url = site
+    stamper = HttpStamper(base_url, "user", "secret", _config(tmp_path, success_text=""))
+    try:
+        result = await stamper.clock_in()
+    finally:
+        await stamper.close()
+
+    assert result.success is False
+    assert "success_text" in result.error
+    assert handler.stamps == []
+
+
+class _RedirectAfterStampHandler(_StandInHandler):
+    """打刻後に完了画面へリダイレクトする（Post/Redirect/Get）システム"""
+
+    def do_GET(self):
+        if self.path == "/done":
+            self._reply(200, "打刻しました".encode())
+        else:
+            super().do_GET()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.stamps.append(self.path)
+        self._reply(303, headers={"Location": "/done"})
+
+
+class _SlowStampHandler(_StandInHandler):
+    """打刻は受け付けるが応答が返る前にタイムアウトするシステム"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.stamps.append(self.path)
+        time.sleep(0.5)
+        self._reply(200, "打刻しました".encode())
+
+
+def _serve(handler_class):
+    handler = type("Handler", (handler_class,), {"stamps": [], "logins": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    ).start()
+    host, port = server.server_address
+    return server, handler, f"http://{host}:{port}"
+
+
+@pytest.mark.asyncio
+async def test_http_follows_redirect_after_stamp(tmp_path):
+    """打刻後のリダイレクト先で確認メッセージを確かめ、ブラウザで打ち直さないこと"""
+    server, handler, base_url = _serve(_RedirectAfterStampHandler)
+    fallback = AsyncMock()
+    stamper = HttpStamper(base_url, "user", "secret", _config(tmp_path), fallback=fallback)
+    try:
+        result = await stamper.clock_in()
+    finally:
+        await stamper.close()
+        server.shutdown()
+
+    assert result.success is True
+    assert handler.stamps == ["/stamp?kind=in"]
+    fallback.clock_in.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_http_timeout_after_send_does_not_fall_back(tmp_path):
+    """打刻POSTの応答待ちでタイムアウトしたら、失敗を返しブラウザで打ち直さないこと"""
+    server, handler, base_url = _serve(_SlowStampHandler)
+    fallback = AsyncMock()
+    stamper = HttpStamper(
+        base_url, "user", "secret", _config(tmp_path, timeout_seconds=0.1), fallback=fallback
+    )
+    try:
+        result = await stamper.clock_in()
+    finally:
+        await stamper.close()
+        server.shutdown()
+
+    assert result.success is False
+    assert handler.stamps == ["/stamp?kind=in"]
+    fallback.clock_in.assert_not_awaited()
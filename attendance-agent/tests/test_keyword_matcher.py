@@ -0,0 +1,65 @@
+# tests/test_keyword_matcher.py
+from services.google_calendar import GoogleCalendarService
+from services.keyword_matcher import FULL_DAY, KeywordMatcher
+
+TAXONOMY = {
+    "full_day": ["有給", "休暇", "特別休暇"],
+    "am_off": ["午前休", "午前半休", "AM休"],
+    "pm_off": ["午後半休"],
+    "half_day": ["半休"],
+}
+
+
+def test_find_all_overlapping():
+    """重なり合うキーワードをすべて列挙できること"""
+    matcher = KeywordMatcher({"x": ["he", "she", "his", "hers"]})
+    assert matcher.find_all("ushers") == [(1, "she", "x"), (2, "he", "x"), (2, "hers", "x")]
+
+
+def test_longest_match_wins():
+    """最も長いキーワードの分類が採用されること"""
+    matcher = KeywordMatcher(TAXONOMY)
+    assert matcher.search("午前半休") == (0, "午前半休", "am_off")
+    assert matcher.search("明日は特別休暇") == (3, "特別休暇", "full_day")
+    assert matcher.search("半休") == (0, "半休", "half_day")
+    assert matcher.search("定例会議") is None
+
+
+def test_normalizes_width_and_case():
+    """全角/半角・大文字/小文字を区別しないこと"""
+    matcher = KeywordMatcher(TAXONOMY)
+    assert matcher.search("ａｍ休")[2] == "am_off"
+    assert matcher.search("am休")[2] == "am_off"
+
+
+def test_match_event_fields_in_order():
+    """件名→説明→場所の順に照合すること"""
+    matcher = KeywordMatcher(TAXONOMY)
+    match = matcher.match_event({"summary": "不在", "description": "午後半休です", "location": "有給"})
+    assert (match.category, match.field, match.keyword) == ("pm_off", "description", "午後半休")
+    assert matcher.match_event({"summary": "打ち合わせ"}) is None
+
+
+def test_from_config_merges_vacation_keywords():
+    """vacation_keywords が終日休として取り込まれること"""
+    matcher = KeywordMatcher.from_config({
+        "vacation_keywords": ["年休"],
+        "leave_categories": {"full_day": ["振休"], "am_off": ["午前休"]},
+        "match_fields": ["summary"],
+    })
+    assert matcher.search("年休")[2] == FULL_DAY
+    assert matcher.search("振休")[2] == FULL_DAY
+    assert matcher.match_event({"description": "年休"}) is None
+    assert "fields:summary" in matcher.signature()
+
+
+def test_google_calendar_only_full_day_is_holiday():
+    """終日休だけを休日とし、半休は休日としないこと"""
+    service = GoogleCalendarService(
+        credentials_path="nonexistent.json",
+        token_path="nonexistent.json",
+        matcher=KeywordMatcher(TAXONOMY),
+    )
+    assert service._match_vacation({"summary": "特別休暇"}) == "特別休暇"
+    assert service._match_vacation({"summary": "不在", "location": "有給"}) == "不在"
+    assert service._match_vacation({"summary": "午前半休"}) is None
@@ -0,0 +1,125 @@
+# tests/test_notification_queue.py
+import json
+import threading
+import time
+
+from services.notification_queue import QueuedNotifier
+from services.retry_policy import PermanentError, RetryPolicy
+from services.slack_client import SlackRateLimited
+
+
+class FakeNotifier:
+    """deliver の結果を順に返すフェイク（例外を並べると送出する）"""
+
+    def __init__(self, outcomes=None, delay=0.0):
+        self.outcomes = list(outcomes or [])
+        self.delay = delay
+        self.delivered = []
+        self.calls = 0
+        self.done = threading.Event()
+
+    def deliver(self, message, coalesce_key=None):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.outcomes:
+            outcome = self.outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+        self.delivered.append(message)
+        self.done.set()
+
+
+def _policy(max_attempts=3):
+    return RetryPolicy(max_attempts=max_attempts, base_delay=0.01, max_delay=0.01, jitter=0)
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "タイムアウト"
+        time.sleep(0.005)
+
+
+def test_send_returns_without_waiting(tmp_path):
+    """Slackが遅くてもsendは即座に返ること"""
+    fake = FakeNotifier(delay=0.5)
+    notifier = QueuedNotifier(fake, str(tmp_path / "spool.jsonl"), _policy())
+    notifier.start()
+    try:
+        started = time.perf_counter()
+        assert notifier.send("出勤しました") is True
+        assert time.perf_counter() - started < 0.05
+        assert fake.done.wait(2.0)
+        assert fake.delivered == ["出勤しました"]
+    finally:
+        notifier.stop()
+
+
+def test_retries_transient_errors(tmp_path):
+    """一時的なエラーは再送して届けること"""
+    fake = FakeNotifier([ConnectionError("down"), ConnectionError("down")])
+    notifier = QueuedNotifier(fake, str(tmp_path / "spool.jsonl"), _policy())
+    notifier.start()
+    try:
+        notifier.send("退勤しました")
+        assert fake.done.wait(2.0)
+        assert fake.calls == 3
+    finally:
+        notifier.stop()
+
+
+def test_rate_limit_waits_retry_after(tmp_path):
+    """HTTP 429 では Retry-After だけ待って再送すること"""
+    fake = FakeNotifier([SlackRateLimited(0.2)])
+    notifier = QueuedNotifier(fake, str(tmp_path / "spool.jsonl"), _policy())
+    notifier.start()
+    try:
+        started = time.monotonic()
+        notifier.send("出勤しました")
+        assert fake.done.wait(2.0)
+        assert time.monotonic() - started >= 0.2
+    finally:
+        notifier.stop()
+
+
+def test_undeliverable_spooled_and_replayed(tmp_path):
+    """届かなかった通知を保存し、次回起動時に再送すること"""
+    spool = tmp_path / "spool.jsonl"
+    failing = FakeNotifier([ConnectionError("down")] * 2 + [PermanentError("channel_not_found")])
+    notifier = QueuedNotifier(failing, str(spool), _policy(max_attempts=2))
+    notifier.start()
+    notifier.send("1件目")
+    notifier.send("2件目")
+    _wait_for(lambda: spool.exists() and len(spool.read_text().splitlines()) == 2)
+    notifier.stop()
+    assert [json.loads(l)["message"] for l in spool.read_text().splitlines()] == ["1件目", "2件目"]
+
+    fake = FakeNotifier()
+    replay = QueuedNotifier(fake, str(spool), _policy())
+    replay.start()
+    try:
+        _wait_for(lambda: len(fake.delivered) == 2)
+        assert fake.delivered == ["1件目", "2件目"]
+        assert not spool.exists()
+    finally:
+        replay.stop()
+
+
+def test_stop_spools_pending(tmp_path):
+    """停止時に未送信の通知を保存すること"""
+    spool = tmp_path / "spool.jsonl"
+    notifier = QueuedNotifier(FakeNotifier(), str(spool), _policy())
+    notifier.send("未送信")   # start前なので送信されない
+    notifier.stop()
+    assert json.loads(spool.read_text())["message"] == "未送信"
+
+
+def test_full_queue_spools_instead_of_blocking(tmp_path):
+    """キューが溢れた通知は待たずに保存すること"""
+    spool = tmp_path / "spool.jsonl"
+    notifier = QueuedNotifier(FakeNotifier(), str(spool), _policy(), max_queue=1)
+    notifier.send("1件目")
+    notifier.send("2件目")
+    assert json.loads(spool.read_text())["message"] == "2件目"
+    assert notifier.pending_count() == 1
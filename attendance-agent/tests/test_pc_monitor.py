@@ -38,13 +38,51 @@ def test_is_working_false_too_few_events():
 def test_old_events_purged():
     """古いイベントがフィルタされること"""
     monitor = PCMonitor()
-    old_time = datetime.now() - timedelta(minutes=20)
-    monitor._events.append(old_time)
-    monitor._record_event()  # 現在のイベント追加
-    events = monitor.get_recent_events(15)
+    with patch("services.pc_monitor._monotonic", return_value=10_000.0):
+        monitor._record_event()  # 20分前のイベント
+    with patch("services.pc_monitor._monotonic", return_value=11_200.0):
+        monitor._record_event()  # 現在のイベント追加
+        events = monitor.get_recent_events(15)
     assert len(events) == 1  # 古いものはフィルタされる
 
 
+def test_dedup_ignores_events_within_one_second():
+    """1秒以内の連続イベントは1件として記録されること"""
+    monitor = PCMonitor()
+    with patch("services.pc_monitor._monotonic", return_value=500.2):
+        monitor._on_mouse_move(0, 0)
+        monitor._on_mouse_move(1, 1)
+    with patch("services.pc_monitor._monotonic", return_value=500.9):
+        monitor._on_key_press("a")
+    with patch("services.pc_monitor._monotonic", return_value=501.5):
+        monitor._on_key_press("b")
+        assert monitor.count_recent_events(15) == 2
+
+
+def test_ring_buffer_memory_is_constant():
+    """長時間稼働してもバッファサイズが一定であること"""
+    monitor = PCMonitor(bucket_seconds=1, retention_minutes=15)
+    for sec in range(0, 3 * 3600, 7):
+        with patch("services.pc_monitor._monotonic", return_value=float(sec)):
+            monitor._record_event()
+    assert len(monitor._counts) == 15 * 60
+    with patch("services.pc_monitor._monotonic", return_value=float(3 * 3600)):
+        # 直近900バケットに入る7秒間隔のイベントのみ数える
+        expected = sum(1 for sec in range(0, 3 * 3600, 7) if sec > 3 * 3600 - 900)
+        assert monitor.count_recent_events(15) == expected
+
+
+def test_bucket_resolution():
+    """バケット解像度を粗くしても件数が集計されること"""
+    monitor = PCMonitor(bucket_seconds=10, retention_minutes=15)
+    for sec in (1000.0, 1003.0, 1009.0):
+        with patch("services.pc_monitor._monotonic", return_value=sec):
+            monitor._record_event()
+    with patch("services.pc_monitor._monotonic", return_value=1009.0):
+        assert monitor.count_recent_events(15) == 3
+        assert monitor.is_working(threshold_minutes=15, min_count=3) is True
+
+
 def test_start_stop():
     """start/stopでリスナーが開始・停止されること"""
     monitor = PCMonitor()
@@ -59,6 +97,115 @@ def test_start_stop():
         mock_mouse_inst.start.assert_called_once()
         mock_kb_inst.start.assert_called_once()
 
+        assert monitor.listening
+
         monitor.stop()
         mock_mouse_inst.stop.assert_called_once()
         mock_kb_inst.stop.assert_called_once()
+        assert not monitor.listening
+
+        # 停止後も start() で監視を再開できる
+        monitor.start()
+        assert monitor.listening
+        assert mock_mouse.call_count == 2
+
+
+def test_dedup_fast_path_skips_lock():
+    """同一秒内のイベントはロックを取得せずに破棄されること"""
+    monitor = PCMonitor()
+    with patch("services.pc_monitor._monotonic", return_value=700.1):
+        monitor._on_mouse_move(0, 0)
+        mock_lock = MagicMock()
+        monitor._lock = mock_lock
+        monitor._on_mouse_move(1, 1)
+        monitor._on_key_press("a")
+    mock_lock.__enter__.assert_not_called()
+
+
+def test_watch_activity_became_active():
+    """min_count回目の操作で即座にactive遷移が通知されること"""
+    monitor = PCMonitor()
+    on_change = MagicMock()
+    monitor.watch_activity(window_minutes=15, min_count=2, on_change=on_change)
+
+    with patch("services.pc_monitor._monotonic", return_value=1000.0):
+        monitor._on_mouse_move(0, 0)
+    on_change.assert_not_called()
+    with patch("services.pc_monitor._monotonic", return_value=1001.0):
+        monitor._on_mouse_move(1, 1)
+    on_change.assert_called_once_with(True)
+    with patch("services.pc_monitor._monotonic", return_value=1002.0):
+        monitor._on_key_press("a")
+    on_change.assert_called_once()  # 稼働中は再通知しない
+
+
+def test_refresh_activity_became_idle():
+    """操作が途絶えるとrefresh_activityでidle遷移が通知されること"""
+    monitor = PCMonitor()
+    on_change = MagicMock()
+    monitor.watch_activity(window_minutes=15, min_count=2, on_change=on_change)
+    for sec in (1000.0, 1001.0):
+        with patch("services.pc_monitor._monotonic", return_value=sec):
+            monitor._on_mouse_move(0, 0)
+    on_change.reset_mock()
+
+    with patch("services.pc_monitor._monotonic", return_value=1500.0):
+        assert monitor.refresh_activity() is True
+    on_change.assert_not_called()
+    with patch("services.pc_monitor._monotonic", return_value=1000.0 + 16 * 60):
+        assert monitor.refresh_activity() is False
+    on_change.assert_called_once_with(False)
+
+
+def test_first_event_recorded():
+    """最初の操作イベントの記録時刻が取得できること"""
+    monitor = PCMonitor()
+    assert monitor.wait_for_first_event(timeout=0) is None
+    with patch("services.pc_monitor._monotonic", return_value=42.5):
+        monitor._on_key_press("a")
+    assert monitor.wait_for_first_event(timeout=0) == 42.5
+
+
+def test_last_activity_time():
+    """最後の操作時刻を壁時計の時刻で返すこと"""
+    monitor = PCMonitor()
+    assert monitor.last_activity_time() is None
+    with patch("services.pc_monitor._monotonic", return_value=1000.0):
+        monitor._on_key_press("a")
+    with patch("services.pc_monitor._monotonic", return_value=1600.0):
+        last = monitor.last_activity_time()
+    assert abs((datetime.now() - timedelta(minutes=10) - last).total_seconds()) < 1
+
+
+def test_minute_counts():
+    """直近N分の件数を1分ごとに古い順で返すこと"""
+    monitor = PCMonitor()
+    for mono in (6_000.0, 6_001.0, 6_100.0, 6_170.0, 6_179.0):
+        with patch("services.pc_monitor._monotonic", return_value=mono):
+            monitor._record_event()
+    with patch("services.pc_monitor._monotonic", return_value=6_185.0), \
+         patch("services.pc_monitor._wall", return_value=6_185.0):
+        # 分の区切り: 6000〜6059 / 6060〜6119 / 6120〜6179 / 6180〜
+        assert monitor.minute_counts(5) == [0, 2, 1, 2, 0]
+    # 単調増加時刻とUNIX時刻がずれていても、UNIX時刻の分で区切ること
+    # （UNIX時刻 = 単調増加時刻 + 30秒: 6179 の操作は UNIX時刻 6209 で 6180〜 の分）
+    with patch("services.pc_monitor._monotonic", return_value=6_185.0), \
+         patch("services.pc_monitor._wall", return_value=6_215.0):
+        assert monitor.minute_counts(4, end_minute=6_215 // 60) == [2, 0, 1, 2]
+
+
+def test_ensure_retention_grows_ring():
+    """保持期間を広げると、記録済みの件数を残したまま長い窓で数えられること"""
+    monitor = PCMonitor(retention_minutes=15)
+    with patch("services.pc_monitor._monotonic", return_value=10_000.0):
+        monitor._record_event()
+        monitor._record_event()
+    with patch("services.pc_monitor._monotonic", return_value=10_000.0 + 10 * 60):
+        assert monitor.count_recent_events(30) == 2
+        monitor.ensure_retention(60)
+        assert monitor.count_recent_events(30) == 2
+    with patch("services.pc_monitor._monotonic", return_value=10_000.0 + 20 * 60):
+        monitor._record_event()
+        # 20分前の操作も30分の窓で数えられる（15分のリングでは切り捨てられていた）
+        assert monitor.count_recent_events(30) == 3
+        assert monitor.is_working(threshold_minutes=30, min_count=3) is True
@@ -0,0 +1,100 @@
+import asyncio
+import random
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from services.retry_policy import PermanentError, RetryPolicy, TransientError
+
+
+def test_delay_exponential_backoff():
+    """待機時間が指数的に増え、上限で頭打ちになること"""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, multiplier=2.0, jitter=0)
+    assert [policy.delay_for(n) for n in (1, 2, 3, 4)] == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_delay_jitter_range():
+    """ジッターが指定割合の範囲に収まること"""
+    policy = RetryPolicy(base_delay=2.0, jitter=0.5, rng=random.Random(0))
+    delays = [policy.delay_for(1) for _ in range(100)]
+    assert all(1.0 <= d <= 3.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.asyncio
+async def test_run_retries_transient_errors():
+    """一時的なエラーは間隔を空けて再試行されること"""
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, jitter=0)
+    func = AsyncMock(side_effect=[TransientError("通信断"), TransientError("通信断"), "ok"])
+
+    with patch("services.retry_policy._sleep", AsyncMock()) as mock_sleep:
+        outcome = await policy.run(func)
+
+    assert outcome.success is True
+    assert outcome.value == "ok"
+    assert outcome.attempts == 3
+    assert [c.args[0] for c in mock_sleep.await_args_list] == [1.0, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_run_permanent_error_fails_fast():
+    """恒久的なエラーは再試行せず即座に失敗すること"""
+    policy = RetryPolicy(max_attempts=5)
+    func = AsyncMock(side_effect=PermanentError("ログイン拒否"))
+
+    with patch("services.retry_policy._sleep", AsyncMock()) as mock_sleep:
+        outcome = await policy.run(func)
+
+    assert outcome.success is False
+    assert isinstance(outcome.error, PermanentError)
+    assert outcome.attempts == 1
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_gives_up_after_max_attempts():
+    """最大試行回数で打ち切り、最後のエラーを返すこと"""
+    policy = RetryPolicy(max_attempts=2, jitter=0)
+    func = AsyncMock(side_effect=[ValueError("1回目"), ValueError("2回目")])
+
+    with patch("services.retry_policy._sleep", AsyncMock()):
+        outcome = await policy.run(func)
+
+    assert outcome.attempts == 2
+    assert str(outcome.error) == "2回目"
+
+
+@pytest.mark.asyncio
+async def test_run_respects_deadline():
+    """全体期限を超える待機は行わず打ち切ること"""
+    policy = RetryPolicy(max_attempts=10, base_delay=5.0, jitter=0, deadline=1.0)
+    func = AsyncMock(side_effect=TransientError("通信断"))
+
+    with patch("services.retry_policy._sleep", AsyncMock()) as mock_sleep:
+        outcome = await policy.run(func)
+
+    assert outcome.attempts == 1
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_deadline_cancels_slow_attempt():
+    """期限を過ぎた試行は打ち切られること"""
+    policy = RetryPolicy(max_attempts=3, base_delay=0, jitter=0, deadline=0.05)
+
+    async def slow(attempt):
+        await asyncio.sleep(1)
+
+    outcome = await policy.run(slow)
+    assert outcome.success is False
+    assert isinstance(outcome.error, asyncio.TimeoutError)
+
+
+def test_from_config():
+    """設定値から生成できること"""
+    policy = RetryPolicy.from_config(
+        4, {"base_delay_seconds": 2, "max_delay_seconds": 10, "deadline_seconds": 60}
+    )
+    assert policy.max_attempts == 4
+    assert policy.base_delay == 2
+    assert policy.max_delay == 10
+    assert policy.deadline == 60
@@ -24,3 +24,61 @@ def test_scheduler_start_stop():
     with patch.object(scheduler._scheduler, "shutdown") as mock_shutdown:
         scheduler.stop()
         mock_shutdown.assert_called_once()
+
+
+def test_scheduler_trigger_now():
+    """trigger_nowで次回実行が即時に前倒しされること"""
+    scheduler = AttendanceScheduler(interval_minutes=5, job_func=MagicMock())
+
+    with patch.object(scheduler._scheduler, "modify_job") as mock_modify:
+        scheduler.trigger_now()
+    mock_modify.assert_called_once()
+    assert "next_run_time" in mock_modify.call_args.kwargs
+
+
+def test_scheduler_idle_heartbeat():
+    """非稼働中はハートビート間隔に切り替わること"""
+    scheduler = AttendanceScheduler(
+        interval_minutes=5, job_func=MagicMock(), idle_interval_minutes=30
+    )
+
+    with patch.object(scheduler._scheduler, "reschedule_job") as mock_reschedule:
+        scheduler.set_idle(True)
+        scheduler.set_idle(True)  # 変化なしなら再設定しない
+        scheduler.set_idle(False)
+    assert mock_reschedule.call_count == 2
+    idle_trigger = mock_reschedule.call_args_list[0].kwargs["trigger"]
+    active_trigger = mock_reschedule.call_args_list[1].kwargs["trigger"]
+    assert idle_trigger.interval.total_seconds() == 30 * 60
+    assert active_trigger.interval.total_seconds() == 5 * 60
+
+
+def test_scheduler_without_heartbeat_ignores_idle():
+    """ハートビート未設定時は間隔を変更しないこと"""
+    scheduler = AttendanceScheduler(interval_minutes=5, job_func=MagicMock())
+
+    with patch.object(scheduler._scheduler, "reschedule_job") as mock_reschedule:
+        scheduler.set_idle(True)
+    mock_reschedule.assert_not_called()
+
+
+def test_scheduler_sleep_until():
+    """sleep_until中は指定時刻から再開し、trigger_nowを無視すること"""
+    from datetime import datetime, timedelta
+
+    scheduler = AttendanceScheduler(interval_minutes=5, job_func=MagicMock())
+    wake = datetime.now() + timedelta(hours=8)
+
+    with patch.object(scheduler._scheduler, "reschedule_job") as mock_reschedule, \
+            patch.object(scheduler._scheduler, "modify_job") as mock_modify:
+        scheduler.sleep_until(wake)
+        scheduler.sleep_until(wake)  # 同じ時刻なら再設定しない
+        scheduler.trigger_now()
+        scheduler.sleep_until(None)
+        scheduler.trigger_now()
+
+    assert mock_reschedule.call_count == 2
+    sleep_trigger = mock_reschedule.call_args_list[0].kwargs["trigger"]
+    assert sleep_trigger.start_date.replace(tzinfo=None) == wake
+    assert mock_reschedule.call_args_list[1].kwargs["trigger"].interval.total_seconds() == 300
+    mock_modify.assert_called_once()
@@ -0,0 +1,114 @@
+# tests/test_server.py
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import graph.nodes.state_update_node as state_update_module
+import graph.nodes.time_gate_node as time_gate_module
+from server import UserAccount, UserNotifier, create_user_agents, load_users, run_user_checks
+from services.google_calendar import LocalCalendarService
+from services.state_store import StateStore
+from services.stamper_interface import StamperInterface, StampResult
+
+
+class _Stamper(StamperInterface):
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    async def clock_in(self):
+        if self.fail:
+            raise RuntimeError("接続できません")
+        return StampResult(success=True, timestamp="09:01", error=None)
+
+    async def clock_out(self):
+        return StampResult(success=True, timestamp="18:00", error=None)
+
+    async def close(self):
+        pass
+
+
+class _Pool:
+    def __init__(self, failing=()):
+        self._failing = failing
+
+    def stamper(self, user_id, user, password):
+        return _Stamper(fail=user_id in self._failing)
+
+
+def _monitor():
+    monitor = MagicMock()
+    monitor.is_working.return_value = True
+    monitor.get_recent_events.return_value = []
+    monitor.last_activity_time.return_value = datetime(2026, 2, 24, 9, 0)
+    return monitor
+
+
+def test_load_users(tmp_path, monkeypatch):
+    """パスワードは環境変数からも読み込めること"""
+    monkeypatch.setenv("PASS_BOB", "secret")
+    path = tmp_path / "users.yaml"
+    path.write_text(
+        "users:\n"
+        "  - id: alice\n"
+        "    password: pw\n"
+        "  - id: bob\n"
+        "    user: bob@example.com\n"
+        "    password_env: PASS_BOB\n",
+        encoding="utf-8",
+    )
+    assert load_users(str(path)) == [
+        UserAccount("alice", "alice", "pw"),
+        UserAccount("bob", "bob@example.com", "secret"),
+    ]
+
+
+def test_user_notifier_prefixes_user():
+    """通知とまとめ送信のキーにユーザーを付けること"""
+    notifier = MagicMock()
+    UserNotifier(notifier, "alice").send("退勤打刻", coalesce_key="clock_out:2026-02-24")
+    notifier.send.assert_called_once_with(
+        "[alice] 退勤打刻", coalesce_key="alice:clock_out:2026-02-24"
+    )
+
+
+async def test_run_user_checks_isolates_users(tmp_path, monkeypatch):
+    """ユーザーごとに打刻状態を保存し、1人のエラーで他を止めないこと"""
+    monkeypatch.setattr(time_gate_module, "_now", lambda: datetime(2026, 2, 24, 9, 1))
+    monkeypatch.setattr(state_update_module, "_today_str", lambda: "2026-02-24")
+
+    store = StateStore(str(tmp_path / "state.db"))
+    notifier = MagicMock()
+    accounts = [UserAccount(u, u, "pw") for u in ("alice", "bob", "carol")]
+    agents = create_user_agents(
+        accounts,
+        {
+            "working_state": {"window_minutes": 15, "min_event_count": 2},
+            "time_rules": {"clock_out_time": "18:00", "cutoff_time": "22:00"},
+        },
+        _Pool(failing={"bob"}),
+        store,
+        LocalCalendarService(),
+        notifier,
+        lambda user_id: _monitor(),
+    )
+
+    states = await run_user_checks(agents, "2026-02-24", notifier=notifier)
+
+    assert set(states) == {"alice", "carol"}
+    assert states["alice"]["clock_in_done"] is True
+    assert store.for_user("carol").load("2026-02-24")["clock_in_time"] == "09:01"
+    assert store.for_user("bob").load("2026-02-24")["clock_in_done"] is False
+    notifier.send_error.assert_called_once()
+    store.close()
+
+
+def test_server_calendar_is_local_only():
+    """サーバーモードの休日判定は Google カレンダーを使わないこと"""
+    from server import create_local_calendar_service
+    from services.config_loader import load_config
+
+    config = load_config("nonexistent.yaml")
+    config["calendar"]["company_closures"] = [{"name": "創立記念日", "start": "2026-02-25"}]
+    calendar = create_local_calendar_service(config)
+    assert isinstance(calendar, LocalCalendarService)
+    assert calendar.is_holiday(datetime(2026, 2, 25).date())[0] is True
+    assert calendar.get_leave_intervals(datetime(2026, 2, 24).date()) == []
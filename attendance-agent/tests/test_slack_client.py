@@ -52,3 +52,105 @@ def test_slack_notifier_fallback():
     with patch("builtins.print") as mock_print:
         result = notifier.send("フォールバックテスト")
     assert result is True
+
+
+def _api_error(status, headers=None):
+    from slack_sdk.errors import SlackApiError
+    response = MagicMock(status_code=status, headers=headers or {})
+    return SlackApiError("error", response)
+
+
+def test_slack_notifier_deliver_classifies_errors():
+    """deliverがレート制限・恒久エラーを区別して送出すること"""
+    from services.retry_policy import PermanentError
+    from services.slack_client import SlackRateLimited
+    import pytest
+
+    notifier = SlackNotifier(token="xoxb-test", channel="C12345")
+    notifier._client = MagicMock()
+
+    notifier._client.chat_postMessage.side_effect = _api_error(429, {"Retry-After": "7"})
+    with pytest.raises(SlackRateLimited) as exc:
+        notifier.deliver("テスト通知")
+    assert exc.value.retry_after == 7.0
+
+    notifier._client.chat_postMessage.side_effect = _api_error(404)
+    with pytest.raises(PermanentError):
+        notifier.deliver("テスト通知")
+
+    notifier._client.chat_postMessage.side_effect = ConnectionError("down")
+    with pytest.raises(ConnectionError):
+        notifier.deliver("テスト通知")
+
+
+def test_slack_notifier_coalesces_with_chat_update():
+    """窓内の同じキーの通知は chat_update で書き換えること"""
+    notifier = SlackNotifier(token="xoxb-test", channel="U123", coalesce_window_minutes=30)
+    notifier._client = MagicMock()
+    notifier._client.chat_postMessage.return_value = {"ok": True, "channel": "D999", "ts": "1.0"}
+
+    with patch("services.slack_client._monotonic", return_value=0.0):
+        notifier.send("退勤 18:00", coalesce_key="clock_out")
+    with patch("services.slack_client._monotonic", return_value=25 * 60.0):
+        notifier.send("退勤 18:25", coalesce_key="clock_out")
+    with patch("services.slack_client._monotonic", return_value=50 * 60.0):
+        notifier.send("退勤 18:50", coalesce_key="clock_out")
+
+    notifier._client.chat_postMessage.assert_called_once()
+    assert notifier._client.chat_update.call_count == 2
+    notifier._client.chat_update.assert_called_with(channel="D999", ts="1.0", text="退勤 18:50")
+
+    # 窓を過ぎたら新規投稿
+    with patch("services.slack_client._monotonic", return_value=90 * 60.0):
+        notifier.send("退勤 19:30", coalesce_key="clock_out")
+    assert notifier._client.chat_postMessage.call_count == 2
+
+
+def test_slack_notifier_reposts_when_message_deleted():
+    """書き換え対象が消えていたら新規投稿すること"""
+    notifier = SlackNotifier(token="xoxb-test", channel="C1", coalesce_window_minutes=30)
+    notifier._client = MagicMock()
+    notifier._client.chat_postMessage.return_value = {"ok": True, "channel": "C1", "ts": "1.0"}
+    error = _api_error(200)
+    error.response.get.return_value = "message_not_found"
+    notifier._client.chat_update.side_effect = error
+
+    with patch("services.slack_client._monotonic", return_value=0.0):
+        notifier.send("退勤 18:00", coalesce_key="clock_out")
+        assert notifier.send("退勤 18:05", coalesce_key="clock_out") is True
+    assert notifier._client.chat_postMessage.call_count == 2
+
+
+def test_slack_notifier_permanent_api_error_code():
+    """HTTP 200 の ok:false でも恒久エラーを PermanentError にすること"""
+    from services.retry_policy import PermanentError
+    import pytest
+
+    notifier = SlackNotifier(token="xoxb-test", channel="C1")
+    notifier._client = MagicMock()
+    error = _api_error(200)
+    error.response.get.return_value = "channel_not_found"
+    notifier._client.chat_postMessage.side_effect = error
+    with pytest.raises(PermanentError):
+        notifier.deliver("テスト通知")
+
+
+def test_digest_notifier_batches_keyed_messages():
+    """キー付き通知を溜めて1日の終わりに1件で送ること"""
+    from services.slack_client import DigestNotifier
+
+    inner = MagicMock()
+    notifier = DigestNotifier(inner)
+    notifier.send("出勤 09:00")
+    for t in ("18:00", "18:05", "18:10"):
+        notifier.send(f"退勤 {t}", coalesce_key="clock_out")
+
+    inner.send.assert_called_once_with("出勤 09:00")
+    notifier.flush_digest()
+    digest = inner.send.call_args[0][0]
+    assert "退勤 18:10（3件をまとめました）" in digest
+    assert "18:05" not in digest
+
+    inner.send.reset_mock()
+    notifier.flush_digest()
+    inner.send.assert_not_called()
@@ -67,3 +67,11 @@ def test_notify_skipped_no_message():
 
     mock_notifier.send.assert_not_called()
     mock_notifier.send_error.assert_not_called()
+
+
+def test_notify_clock_out_coalesce_key():
+    """退勤時刻の更新は日付ごとのキーでまとめること"""
+    mock_notifier = MagicMock()
+    state = _make_state(action_taken="clock_out", last_clock_out_time="18:30")
+    slack_notify_node(state, notifier=mock_notifier)
+    assert mock_notifier.send.call_args[1]["coalesce_key"] == "clock_out:2026-02-22"
@@ -20,7 +20,7 @@ def test_stamp_result_failure():
 
 
 @pytest.mark.asyncio
-async def test_clock_in_success():
+async def test_clock_in_success(capsys):
     """出勤打刻が成功すること（モック）"""
     config = {
         "browser": {
@@ -46,6 +46,7 @@ async def test_clock_in_success():
     )
 
     mock_page = AsyncMock()
+    mock_page.url = "https://example.com/attendance"
     mock_page.query_selector.return_value = MagicMock()  # success element found
     mock_page.inner_text = AsyncMock(return_value="打刻完了")
 
@@ -53,6 +54,8 @@ async def test_clock_in_success():
         result = await browser.clock_in()
 
     assert result.success is True
+    # コールド打刻の所要時間が出力されること
+    assert "[AttendanceBrowser] clock_in cold" in capsys.readouterr().out
 
 
 @pytest.mark.asyncio
@@ -90,3 +93,319 @@ async def test_clock_in_retry_on_failure():
 
     assert result.success is False
     assert result.error is not None
+
+
+def _warm_config():
+    return {
+        "browser": {
+            "headless": True,
+            "retry_count": 1,
+            "session_storage_path": ".session",
+            "warm_page": {"enabled": True, "refresh_times": ["08:30"]},
+            "selectors": {
+                "login_url": "https://example.com/login",
+                "username_field": "#username",
+                "password_field": "#password",
+                "login_button": "#login-btn",
+                "clock_in_button": "#clock-in",
+                "clock_out_button": "#clock-out",
+                "success_message": ".success-msg",
+            },
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_warm_page_used_for_stamp():
+    """ウォームページがあればログイン処理なしで打刻すること"""
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="test", config=_warm_config()
+    )
+    warm_page = AsyncMock()
+    warm_page.is_closed = MagicMock(return_value=False)
+    warm_page.url = "https://example.com/attendance"
+    warm_page.query_selector.return_value = MagicMock()
+
+    with patch.object(browser, "_get_page", return_value=warm_page), \
+         patch.object(browser, "_save_session", AsyncMock()):
+        assert await browser.warm_up() is True
+
+    with patch.object(browser, "_get_page", AsyncMock()) as mock_get_page, \
+         patch.object(browser, "ensure_logged_in", AsyncMock(return_value=True)) as mock_login, \
+         patch.object(browser, "_save_session", AsyncMock()):
+        result = await browser.clock_in()
+        mock_get_page.assert_not_called()
+        mock_login.assert_not_called()
+        warm_page.click.assert_awaited_once_with("#clock-in")
+        await browser._rewarm_task  # 打刻後は勤怠画面に戻して再待機
+    assert result.success is True
+    assert result.warm is True
+    assert result.elapsed_ms >= 0
+    assert browser._warm_page is warm_page
+
+
+@pytest.mark.asyncio
+async def test_stale_warm_page_falls_back_to_cold():
+    """ウォームページに打刻ボタンが無ければ捨てて、開き直したページで打刻すること"""
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="test", config=_warm_config()
+    )
+    browser._warm_enabled = False
+    stale = AsyncMock()
+    stale.is_closed = MagicMock(return_value=False)
+    stale.query_selector.return_value = None
+    browser._warm_page = stale
+    cold = AsyncMock()
+    cold.url = "https://example.com/attendance"
+    cold.query_selector.return_value = MagicMock()
+
+    with patch.object(browser, "_get_page", AsyncMock(return_value=cold)), \
+         patch.object(browser, "_save_session", AsyncMock()):
+        result = await browser.clock_in()
+
+    assert result.success is True
+    assert result.warm is False
+    assert result.attempts == 1
+    stale.close.assert_awaited_once()
+    stale.click.assert_not_called()
+    cold.click.assert_awaited_once_with("#clock-in")
+
+
+@pytest.mark.asyncio
+async def test_cold_stamp_without_warm_page():
+    """ウォームページが無い場合は通常どおりページを開いて打刻すること"""
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="test", config=_warm_config()
+    )
+    browser._warm_enabled = False
+    page = AsyncMock()
+    page.url = "https://example.com/attendance"
+    page.query_selector.return_value = MagicMock()
+
+    with patch.object(browser, "_get_page", return_value=page) as mock_get_page, \
+         patch.object(browser, "_save_session", AsyncMock()):
+        result = await browser.clock_out()
+
+    mock_get_page.assert_called_once()
+    page.close.assert_awaited_once()
+    assert result.success is True
+    assert result.warm is False
+
+
+@pytest.mark.asyncio
+async def test_selector_readiness_waits_for_success_message():
+    """既定ではnetworkidleを待たずsuccess_messageの表示を待つこと"""
+    config = _warm_config()
+    config["browser"]["timeouts"] = {"success_ms": 3000}
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="test", config=config
+    )
+    browser._warm_enabled = False
+    page = AsyncMock()
+    page.url = "https://example.com/attendance"
+
+    with patch.object(browser, "_get_page", return_value=page), \
+         patch.object(browser, "_save_session", AsyncMock()):
+        result = await browser.clock_in()
+
+    assert result.success is True
+    page.wait_for_load_state.assert_not_called()
+    page.wait_for_selector.assert_any_await(
+        ".success-msg", state="visible", timeout=3000
+    )
+
+
+@pytest.mark.asyncio
+async def test_clock_out_waits_for_clock_out_button():
+    """退勤打刻ではログイン前後とも退勤ボタンの表示を待つこと"""
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="test", config=_warm_config()
+    )
+    browser._warm_enabled = False
+    page = AsyncMock()
+    page.url = "https://example.com/login"
+
+    with patch.object(browser, "_get_page", return_value=page), \
+         patch.object(browser, "_save_session", AsyncMock()):
+        result = await browser.clock_out()
+
+    assert result.success is True
+    waited = [c.args[0] for c in page.wait_for_selector.await_args_list]
+    assert waited[:2] == ["#clock-out, #username", "#clock-out"]
+    assert not any("#clock-in" in selector for selector in waited)
+
+
+@pytest.mark.asyncio
+async def test_selector_readiness_timeout_fails():
+    """success_messageが表示されなければ失敗すること"""
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="test", config=_warm_config()
+    )
+    browser._warm_enabled = False
+    page = AsyncMock()
+    page.url = "https://example.com/attendance"
+    page.wait_for_selector = AsyncMock(side_effect=Exception("Timeout 10000ms exceeded"))
+
+    with patch.object(browser, "_get_page", return_value=page):
+        result = await browser.clock_in()
+
+    assert result.success is False
+    assert "Timeout" in result.error
+
+
+@pytest.mark.asyncio
+async def test_networkidle_strategy_opt_in():
+    """wait_strategy=networkidleで従来どおり通信完了を待つこと"""
+    config = _warm_config()
+    config["browser"]["wait_strategy"] = "networkidle"
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="test", config=config
+    )
+    browser._warm_enabled = False
+    page = AsyncMock()
+    page.url = "https://example.com/attendance"
+    page.query_selector.return_value = MagicMock()
+
+    with patch.object(browser, "_get_page", return_value=page), \
+         patch.object(browser, "_save_session", AsyncMock()):
+        result = await browser.clock_in()
+
+    assert result.success is True
+    page.wait_for_load_state.assert_any_await("networkidle", timeout=10000)
+    page.wait_for_selector.assert_not_called()
+
+
+def _lean_browser(**lean):
+    config = _warm_config()
+    config["browser"]["lean_profile"] = {"enabled": True, **lean}
+    return AttendanceBrowser(
+        url="https://kintai.example.com/", user="test", password="test", config=config
+    )
+
+
+def test_lean_profile_blocks_resource_types():
+    """軽量プロファイルで画像・メディア・フォントを遮断すること"""
+    browser = _lean_browser()
+    assert browser._should_block("image", "https://kintai.example.com/a.png") is True
+    assert browser._should_block("media", "https://kintai.example.com/a.mp4") is True
+    assert browser._should_block("font", "https://kintai.example.com/a.woff2") is True
+    assert browser._should_block("document", "https://kintai.example.com/") is False
+    assert browser._should_block("script", "https://kintai.example.com/app.js") is False
+
+
+def test_lean_profile_host_lists():
+    """allow/denyリストでサードパーティ通信を遮断すること"""
+    browser = _lean_browser()
+    # allow_hosts未指定時は勤怠システムとログインURLのホストのみ許可
+    assert browser._should_block("script", "https://example.com/login") is False
+    assert browser._should_block("script", "https://cdn.tracker.example.net/t.js") is True
+
+    browser = _lean_browser(
+        allow_hosts=["example.com"], deny_hosts=["analytics.example.com"]
+    )
+    assert browser._should_block("script", "https://kintai.example.com/app.js") is False
+    assert browser._should_block("xhr", "https://analytics.example.com/beacon") is True
+
+
+@pytest.mark.asyncio
+async def test_lean_profile_route_request():
+    """遮断対象はabort、それ以外はcontinueされること"""
+    browser = _lean_browser()
+    route = AsyncMock()
+    route.request = MagicMock(resource_type="image", url="https://kintai.example.com/a.png")
+    await browser._route_request(route)
+    route.abort.assert_awaited_once()
+    route.continue_.assert_not_called()
+
+    route = AsyncMock()
+    route.request = MagicMock(resource_type="document", url="https://kintai.example.com/")
+    await browser._route_request(route)
+    route.continue_.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_fails_fast():
+    """ログイン拒否は再試行せず1回で失敗すること"""
+    config = _warm_config()
+    config["browser"]["retry_count"] = 3
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="wrong", config=config
+    )
+    page = AsyncMock()
+    page.url = "https://example.com/login"
+    # ログインフォームは表示されるが、ログイン後の打刻ボタンが現れない
+    page.wait_for_selector = AsyncMock(side_effect=[MagicMock(), Exception("Timeout")])
+
+    with patch.object(browser, "_get_page", return_value=page), \
+         patch("services.retry_policy._sleep", AsyncMock()) as mock_sleep:
+        result = await browser.clock_in()
+
+    assert result.success is False
+    assert result.attempts == 1
+    assert "ログイン" in result.error
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_transient_error_retried_with_backoff():
+    """一時的なエラーはバックオフ後に再試行され、試行回数が記録されること"""
+    config = _warm_config()
+    config["browser"]["retry_count"] = 3
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="test", config=config
+    )
+    browser._warm_enabled = False
+    page = AsyncMock()
+    page.url = "https://example.com/attendance"
+    page.query_selector.return_value = MagicMock()
+    page.goto = AsyncMock(side_effect=[Exception("net::ERR_CONNECTION_RESET"), None])
+
+    with patch.object(browser, "_get_page", return_value=page), \
+         patch.object(browser, "_save_session", AsyncMock()), \
+         patch("services.retry_policy._sleep", AsyncMock()) as mock_sleep:
+        result = await browser.clock_in()
+
+    assert result.success is True
+    assert result.attempts == 2
+    mock_sleep.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_no_retry_after_click():
+    """クリック後に確認メッセージを待てなくても、ボタンを押し直さないこと"""
+    config = _warm_config()
+    config["browser"]["retry_count"] = 3
+    browser = AttendanceBrowser(
+        url="https://example.com", user="test", password="test", config=config
+    )
+    browser._warm_enabled = False
+    page = AsyncMock()
+    page.url = "https://example.com/attendance"
+    page.query_selector.return_value = MagicMock()
+    page.wait_for_selector = AsyncMock(
+        side_effect=[MagicMock(), Exception("Timeout 10000ms exceeded")]
+    )
+
+    with patch.object(browser, "_get_page", return_value=page), \
+         patch("services.retry_policy._sleep", AsyncMock()) as mock_sleep:
+        result = await browser.clock_in()
+
+    assert result.success is False
+    assert result.attempts == 1
+    assert "Timeout" in result.error
+    page.click.assert_awaited_once_with("#clock-in")
+    mock_sleep.assert_not_called()
+
+
+def test_apply_config_updates_selectors():
+    """再読み込みした設定のセレクタ・タイムアウトに切り替わること"""
+    from services.config_loader import ConfigSnapshot
+
+    browser = _lean_browser()
+    snapshot = ConfigSnapshot.from_dict(
+        {"browser": {"selectors": {"clock_in_button": "#new-clock-in"}, "timeouts": {"ready_ms": 3000}}}
+    )
+    browser.apply_config(snapshot)
+    assert browser._selectors["clock_in_button"] == "#new-clock-in"
+    assert browser._selectors["login_button"] == "#login-btn"
+    assert browser._timeouts["ready_ms"] == 3000
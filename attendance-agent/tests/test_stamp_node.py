@@ -51,6 +51,7 @@ async def test_stamp_clock_out_success():
     result = await stamp_node(state, browser=mock_browser)
 
     assert result["last_clock_out_time"] == "18:05"
+    assert result["clock_out_pending"] is False
     assert result["action_taken"] == "clock_out"
 
 
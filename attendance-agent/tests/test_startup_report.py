@@ -0,0 +1,19 @@
+from services.startup_report import StartupReport
+
+
+def test_startup_report_marks():
+    """各段階の累積経過時間が記録されること"""
+    report = StartupReport(enabled=True, origin=100.0)
+    report.mark("config loaded", at=100.010)
+    report.mark("monitor started", at=100.050)
+    assert round(report.elapsed_ms("monitor started")) == 50
+    text = report.format()
+    assert "config loaded" in text
+    assert "monitor started" in text
+
+
+def test_startup_report_disabled():
+    """無効時は何も記録しないこと"""
+    report = StartupReport(enabled=False)
+    report.mark("config loaded")
+    assert report.elapsed_ms("config loaded") is None
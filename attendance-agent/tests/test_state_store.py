@@ -0,0 +1,85 @@
+# tests/test_state_store.py
+from unittest.mock import patch
+
+from graph.nodes.state_update_node import state_update_node
+from services.state_store import StateStore
+
+
+def test_load_default_state(tmp_path):
+    """保存がなければ初期状態を返すこと"""
+    store = StateStore(str(tmp_path / "state.db"))
+    assert store.load("2026-03-02") == {
+        "clock_in_done": False,
+        "clock_in_time": None,
+        "last_clock_out_time": None,
+    }
+
+
+def test_state_survives_restart(tmp_path):
+    """再起動後（別インスタンス）も当日の状態を復元できること"""
+    path = str(tmp_path / "state.db")
+    store = StateStore(path)
+    store.save("2026-03-02", {"clock_in_done": True, "clock_in_time": "09:05", "extra": {}})
+    store.close()
+
+    restarted = StateStore(path)
+    state = restarted.load("2026-03-02")
+    assert state["clock_in_done"] is True
+    assert state["clock_in_time"] == "09:05"
+    assert restarted.load("2026-03-03")["clock_in_done"] is False
+
+
+def test_users_are_separate(tmp_path):
+    """ユーザーごとに状態を分けて保存すること"""
+    path = str(tmp_path / "state.db")
+    StateStore(path, user_id="alice").save("2026-03-02", {"clock_in_done": True})
+    assert StateStore(path, user_id="bob").load("2026-03-02")["clock_in_done"] is False
+
+
+def test_compacts_old_days(tmp_path):
+    """新しい日付の保存時に保持期間より古い日を削除すること"""
+    path = str(tmp_path / "state.db")
+    store = StateStore(path, retention_days=30)
+    store.save("2026-01-01", {"clock_in_done": True})
+    store.save("2026-01-31", {"clock_in_done": True})
+    store.save("2026-02-15", {"clock_in_done": True})
+    store.close()
+
+    reopened = StateStore(path, retention_days=30)
+    assert reopened.load("2026-01-01")["clock_in_done"] is False
+    assert reopened.load("2026-01-31")["clock_in_done"] is True
+
+
+def test_state_update_node_writes_through(tmp_path):
+    """state_update_node が更新後の状態を保存すること"""
+    path = str(tmp_path / "state.db")
+    store = StateStore(path)
+    state = {
+        "today": "2026-03-02",
+        "clock_in_done": True,
+        "clock_in_time": "09:00",
+        "last_clock_out_time": "18:10",
+        "error_message": None,
+    }
+    with patch("graph.nodes.state_update_node._today_str", return_value="2026-03-02"):
+        state_update_node(state, state_store=store)
+    store.close()
+
+    assert StateStore(path).load("2026-03-02")["last_clock_out_time"] == "18:10"
+
+
+def test_for_user_shares_connection(tmp_path):
+    """for_user() のストアは接続を共有しつつユーザーごとに状態を分けること"""
+    path = str(tmp_path / "state.db")
+    store = StateStore(path)
+    alice = store.for_user("alice")
+    bob = alice.for_user("bob")
+    alice.save("2026-03-02", {"clock_in_done": True, "clock_in_time": "08:55"})
+    bob.save("2026-03-02", {"clock_in_done": False})
+
+    assert alice._open() is store._open() is bob._open()
+    assert bob.load("2026-03-02")["clock_in_done"] is False
+    bob.close()  # 接続は閉じない
+    store.close()
+
+    assert StateStore(path, user_id="alice").load("2026-03-02")["clock_in_time"] == "08:55"
@@ -68,3 +68,85 @@ def test_after_cutoff():
         state = _make_state(clock_in_done=False)
         result = time_gate_node(state, config=DEFAULT_CONFIG)
     assert result["action_taken"] == "skipped"
+
+
+def test_morning_leave_suppresses_clock_in():
+    """午前休の間は出勤打刻せず、明けたら出勤打刻すること"""
+    leave = [{"start": "00:00", "end": "13:00", "category": "am_off", "reason": "午前休"}]
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(10, 0)):
+        result = time_gate_node(_make_state(leave_intervals=leave), config=DEFAULT_CONFIG)
+    assert result["action_taken"] == "skipped"
+
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(13, 0)):
+        result = time_gate_node(_make_state(leave_intervals=leave), config=DEFAULT_CONFIG)
+    assert result["action_taken"] == "clock_in"
+
+
+def test_afternoon_leave_moves_clock_out_earlier():
+    """午後休の開始時刻以降は退勤打刻になること"""
+    leave = [{"start": "13:00", "end": "24:00", "category": "pm_off", "reason": "午後休"}]
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(12, 30)):
+        result = time_gate_node(
+            _make_state(clock_in_done=True, leave_intervals=leave), config=DEFAULT_CONFIG
+        )
+    assert result["action_taken"] == "skipped"
+
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(13, 10)):
+        result = time_gate_node(
+            _make_state(clock_in_done=True, leave_intervals=leave), config=DEFAULT_CONFIG
+        )
+    assert result["action_taken"] == "clock_out"
+
+
+def test_midday_leave_skips_only_during_leave():
+    """日中の時間休は休暇中だけスキップすること"""
+    leave = [{"start": "10:00", "end": "12:00", "category": "half_day", "reason": "時間休"}]
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(9, 0)):
+        result = time_gate_node(_make_state(leave_intervals=leave), config=DEFAULT_CONFIG)
+    assert result["action_taken"] == "clock_in"
+
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(11, 0)):
+        result = time_gate_node(_make_state(leave_intervals=leave), config=DEFAULT_CONFIG)
+    assert result["action_taken"] == "skipped"
+
+
+def _strategy_config(strategy, **rules):
+    return {"time_rules": {**DEFAULT_CONFIG["time_rules"], "clock_out_strategy": strategy, **rules}}
+
+
+def test_min_interval_skips_recent_restamp():
+    """min_interval: 前回の退勤打刻から間もなければ打ち直さないこと"""
+    config = _strategy_config("min_interval", min_restamp_minutes=30)
+    state = _make_state(clock_in_done=True, last_clock_out_time="18:30")
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(18, 55)):
+        assert time_gate_node(state, config=config)["action_taken"] == "skipped"
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(19, 0)):
+        assert time_gate_node(state, config=config)["action_taken"] == "clock_out"
+
+
+def test_final_idle_defers_while_working():
+    """final_idle: 作業中は退勤打刻せず、非稼働になったら打刻すること"""
+    config = _strategy_config("final_idle", final_margin_minutes=10)
+    working = _make_state(clock_in_done=True, is_working=True, clock_out_pending=True)
+    idle = _make_state(clock_in_done=True, is_working=False, clock_out_pending=True)
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(19, 0)):
+        assert time_gate_node(working, config=config)["action_taken"] == "skipped"
+        assert time_gate_node(idle, config=config)["action_taken"] == "clock_out"
+
+
+def test_final_idle_stamps_before_cutoff():
+    """final_idle: 作業中でも打刻禁止時刻の直前には打刻すること"""
+    config = _strategy_config("final_idle", final_margin_minutes=10)
+    state = _make_state(clock_in_done=True, is_working=True, clock_out_pending=True)
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(21, 50)):
+        assert time_gate_node(state, config=config)["action_taken"] == "clock_out"
+
+
+def test_final_idle_skips_without_new_activity():
+    """final_idle: 前回の退勤打刻後に操作がなければ打ち直さないこと"""
+    config = _strategy_config("final_idle")
+    state = _make_state(
+        clock_in_done=True, is_working=False, last_clock_out_time="19:10", clock_out_pending=False
+    )
+    with patch("graph.nodes.time_gate_node._now", return_value=_mock_time(19, 40)):
+        assert time_gate_node(state, config=config)["action_taken"] == "skipped"
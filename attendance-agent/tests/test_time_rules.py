@@ -0,0 +1,61 @@
+# tests/test_time_rules.py
+from datetime import date, datetime
+
+from services.time_rules import (
+    ZONE_CLOCK_IN,
+    ZONE_CLOCK_OUT,
+    ZONE_CLOSED,
+    ZONE_LEAVE,
+    DailyTimeline,
+    timeline_for,
+)
+
+DAY = date(2026, 2, 24)
+RULES = {"clock_out_time": "18:00", "cutoff_time": "22:00"}
+
+
+def _at(hour, minute=0):
+    return datetime(2026, 2, 24, hour, minute)
+
+
+def test_zones_without_leave():
+    """退勤時刻・打刻禁止時刻で区切られること"""
+    timeline = DailyTimeline(DAY, "18:00", "22:00")
+    assert timeline.segments() == [
+        ("00:00", ZONE_CLOCK_IN),
+        ("18:00", ZONE_CLOCK_OUT),
+        ("22:00", ZONE_CLOSED),
+    ]
+    assert timeline.zone(_at(17, 59)) == ZONE_CLOCK_IN
+    assert timeline.zone(_at(18, 0)) == ZONE_CLOCK_OUT
+    assert timeline.zone(_at(23, 30)) == ZONE_CLOSED
+
+
+def test_next_transition():
+    """次にゾーンが変わる時刻を返し、当日中になければNoneを返すこと"""
+    timeline = DailyTimeline(DAY, "18:00", "22:00")
+    assert timeline.next_transition(_at(9, 0)) == _at(18, 0)
+    assert timeline.next_transition(_at(18, 0)) == _at(22, 0)
+    assert timeline.next_transition(_at(22, 30)) is None
+
+
+def test_leave_intervals():
+    """午前休は休暇ゾーン、退勤時刻を跨ぐ午後休は開始時刻で退勤ゾーンになること"""
+    morning = DailyTimeline(DAY, "18:00", "22:00", (("00:00", "13:00"),))
+    assert morning.zone(_at(10, 0)) == ZONE_LEAVE
+    assert morning.zone(_at(13, 0)) == ZONE_CLOCK_IN
+    assert morning.next_transition(_at(10, 0)) == _at(13, 0)
+
+    afternoon = DailyTimeline(DAY, "18:00", "22:00", (("13:00", "24:00"),))
+    assert afternoon.clock_out == 13 * 60
+    assert afternoon.zone(_at(14, 0)) == ZONE_CLOCK_OUT
+    assert afternoon.zone(_at(22, 0)) == ZONE_CLOSED
+
+
+def test_timeline_for_reuses_compiled_timeline():
+    """同じ日付・設定・休暇なら同じ区間表を使い回し、変われば作り直すこと"""
+    leave = [{"start": "00:00", "end": "13:00", "category": "am_off", "reason": "午前休"}]
+    first = timeline_for(DAY, RULES, leave)
+    assert timeline_for(DAY, dict(RULES), [dict(leave[0])]) is first
+    assert timeline_for(DAY, {**RULES, "cutoff_time": "21:00"}, leave) is not first
+    assert timeline_for(date(2026, 2, 25), RULES, leave) is not first
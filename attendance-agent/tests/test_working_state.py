@@ -47,3 +47,70 @@ def test_working_state_node_inactive():
         "working_state": {"window_minutes": 15, "min_event_count": 2}
     })
     assert result["is_working"] is False
+
+
+def test_working_state_node_clock_out_pending():
+    """final_idle: 最終退勤打刻後の操作があれば clock_out_pending を立てること"""
+    mock_monitor = MagicMock()
+    mock_monitor.is_working.return_value = True
+    mock_monitor.get_recent_events.return_value = [
+        datetime(2026, 2, 22, 19, 15), datetime(2026, 2, 22, 19, 20)
+    ]
+    mock_monitor.last_activity_time.return_value = datetime(2026, 2, 22, 19, 20)
+    config = {
+        "working_state": {"window_minutes": 15, "min_event_count": 2},
+        "time_rules": {"clock_out_strategy": "final_idle"},
+    }
+
+    state = _make_state(clock_in_done=True, last_clock_out_time="19:00")
+    result = working_state_node(state, monitor=mock_monitor, config=config)
+    assert result["last_activity_time"] == "19:20"
+    assert result["clock_out_pending"] is True
+
+    state = _make_state(clock_in_done=True, last_clock_out_time="19:30")
+    result = working_state_node(state, monitor=mock_monitor, config=config)
+    assert result["clock_out_pending"] is False
+
+
+def test_clock_out_pending_survives_idle():
+    """final_idle: 操作が判定窓から外れて非稼働になっても退勤打刻待ちを保つこと"""
+    mock_monitor = MagicMock()
+    mock_monitor.is_working.return_value = False
+    mock_monitor.get_recent_events.return_value = []
+    mock_monitor.last_activity_time.return_value = datetime(2026, 2, 22, 20, 14)
+    config = {
+        "working_state": {"window_minutes": 10, "min_event_count": 2},
+        "time_rules": {"clock_out_strategy": "final_idle"},
+    }
+
+    state = _make_state(
+        clock_in_done=True, last_clock_out_time="19:15", clock_out_pending=True
+    )
+    result = working_state_node(state, monitor=mock_monitor, config=config)
+    assert result["is_working"] is False
+    assert result["clock_out_pending"] is True
+
+    state = _make_state(
+        clock_in_done=True, last_clock_out_time="20:25", clock_out_pending=False
+    )
+    result = working_state_node(state, monitor=mock_monitor, config=config)
+    assert result["clock_out_pending"] is False
+
+
+def test_stray_event_after_clock_out_is_not_pending():
+    """final_idle: 退勤打刻後の操作が min_event_count 回に満たなければ打ち直さないこと"""
+    mock_monitor = MagicMock()
+    mock_monitor.is_working.return_value = True
+    mock_monitor.get_recent_events.return_value = [
+        datetime(2026, 2, 22, 18, 55), datetime(2026, 2, 22, 18, 58),
+        datetime(2026, 2, 22, 19, 5),
+    ]
+    mock_monitor.last_activity_time.return_value = datetime(2026, 2, 22, 19, 5)
+    config = {
+        "working_state": {"window_minutes": 15, "min_event_count": 2},
+        "time_rules": {"clock_out_strategy": "final_idle"},
+    }
+
+    state = _make_state(clock_in_done=True, last_clock_out_time="19:00")
+    result = working_state_node(state, monitor=mock_monitor, config=config)
+    assert result["clock_out_pending"] is False